@@ -0,0 +1,81 @@
+import importlib.util
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from io_tabelas import ler_tabela
+from registro_artefatos import RegistroArtefatos
+from servico_embeddings import MODELO_PADRAO, ServicoEmbeddings, onnx_disponivel
+
+TAMANHO_AMOSTRA = 3_000      # None = todos os trechos limpos
+PROCESSOS = os.cpu_count() or 1
+
+
+def medir(nome, codificar, trechos, referencia=None):
+    """Frases/s de `codificar(trechos)` e, se houver referência, a menor similaridade de cosseno com ela."""
+    codificar(trechos[:256])  # Aquecimento (carrega pesos, compila kernels)
+    inicio = time.perf_counter()
+    vetores = np.asarray(codificar(trechos), dtype=np.float32)
+    tempo = time.perf_counter() - inicio
+    linha = f"   {nome:<34} {len(trechos) / tempo:9.1f} frases/s  ({tempo:7.2f} s)"
+    if referencia is not None:
+        a = vetores / np.linalg.norm(vetores, axis=1, keepdims=True)
+        b = referencia / np.linalg.norm(referencia, axis=1, keepdims=True)
+        linha += f"   cos mín. vs atual: {np.min(np.sum(a * b, axis=1)):.4f}"
+    print(linha)
+    return vetores, len(trechos) / tempo
+
+
+def main():
+    print("="*70)
+    print("⏱️  BENCHMARK DE EMBEDDINGS (CPU)")
+    print("="*70)
+
+    if importlib.util.find_spec('sentence_transformers') is None:
+        print("❌ sentence-transformers não está instalado.")
+        return
+
+    arquivo = RegistroArtefatos().caminho('trechos_limpos')
+    trechos = ler_tabela(arquivo, colunas=['letra'])['letra'].dropna().astype(str).tolist()
+    if TAMANHO_AMOSTRA:
+        trechos = trechos[:TAMANHO_AMOSTRA]
+    print(f"📂 {os.path.basename(arquivo)}: {len(trechos):,} trechos, {PROCESSOS} núcleos")
+    print()
+
+    from sentence_transformers import SentenceTransformer
+    atual = SentenceTransformer(MODELO_PADRAO)
+    referencia, base = medir("atual (SentenceTransformer padrão)", atual.encode, trechos)
+    resultados = {"atual": base}
+
+    with ServicoEmbeddings(MODELO_PADRAO, backend="torch") as servico:
+        por_lote = servico.ajustar_tamanho_lote(trechos[:1_000])
+        print("   lote ajustado: " + ", ".join(f"{t}={v:.0f}/s" for t, v in por_lote.items())
+              + f" -> {servico.tamanho_lote}")
+        _, resultados["torch, lote ajustado"] = medir("torch, lote ajustado", servico.encode, trechos, referencia)
+        tamanho_lote = servico.tamanho_lote
+
+    backends = ["torch"] + (["onnx-int8"] if onnx_disponivel() else [])
+    for backend in backends:
+        if backend != "torch":
+            with ServicoEmbeddings(MODELO_PADRAO, backend=backend, tamanho_lote=tamanho_lote) as servico:
+                _, resultados[backend] = medir(backend, servico.encode, trechos, referencia)
+        if PROCESSOS > 1:
+            nome = f"{backend}, {PROCESSOS} processos"
+            with ServicoEmbeddings(MODELO_PADRAO, backend=backend, tamanho_lote=tamanho_lote,
+                                   processos=PROCESSOS) as servico:
+                _, resultados[nome] = medir(nome, servico.encode, trechos, referencia)
+    if not onnx_disponivel():
+        print("   (onnx-int8 pulado: pip install 'sentence-transformers[onnx]')")
+
+    print()
+    melhor = max(resultados, key=resultados.get)
+    print(f"🏆 Mais rápido: {melhor} ({resultados[melhor] / base:.1f}x o caminho atual)")
+    print("   Ajuste BACKEND_PADRAO / PROCESSOS_PADRAO / TAMANHO_LOTE_PADRAO em servico_embeddings.py")
+    print("="*70)
+
+
+if __name__ == "__main__":
+    main()
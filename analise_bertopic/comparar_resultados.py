@@ -1,8 +1,15 @@
 import pandas as pd
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from io_tabelas import ler_tabela
+from registro_artefatos import RegistroArtefatos
 
 # Carregar os dois resultados
-df_baseline = pd.read_csv('resultados_bertopic_baseline.csv')
-df_stopwords = pd.read_csv('resultados_bertopic_com_stopwords.csv')
+registro = RegistroArtefatos()
+df_baseline = ler_tabela(registro.caminho('topicos_bertopic_baseline'), colunas=['Topic', 'Count', 'Name'])
+df_stopwords = ler_tabela(registro.caminho('topicos_bertopic'), colunas=['Topic', 'Count', 'Name'])
 
 print("="*80)
 print("COMPARAÇÃO: BASELINE (SEM STOPWORDS) vs COM STOPWORDS")
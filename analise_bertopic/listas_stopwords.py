@@ -0,0 +1,26 @@
+# Listas de stopwords usadas nas representações (c-TF-IDF) do BERTopic.
+# rodar_bertopic.py usa a combinação 'pt+interjeicoes'; a varredura testa todas.
+
+# Lista de interjeições e "lixo" que você identificou no Tópico 13
+INTERJEICOES = [
+    'oh', 'uou', 'ah', 'ooh', 'uô', 'oi', 'iê', 'ha', 'eh', 'uôu',
+    'nanana', 'ererê', 'uh', 'hmm', 'hey', 'laia'
+]
+
+# Stopwords comuns do português (incluindo as vistas no Tópico -1)
+STOPWORDS_PT = [
+        'ser','sou','é','era','foi','estou','tô','ta','tá','tava','estar','vamos','vou','ia','ir','ver','vi','vendo', 'tipo',
+        'dizer','disse','fala','falar','falou','diz','quer','querer','quero','pode','poder','podia','deve','dever', 'qual', 'está',
+        'tem','têm','tenho','tinha','ter','ficar','fica','ficou','ficando','deixar','deixa','deixou', 'nóis', 'eu', 'demais', 'alguém',
+        'pra','pro','pros','q','pq','porque','que','se','me','te','lhe','ela','ele','elas','eles','cê','você','vocês','tb', 'oi',
+        'iê','ê','ô','ah','oh','ei','uai','oxe','porra','pá','opa','oba','aê','ae','yeah','la','lá', 'aí', 'ai', 'não', 'todo',
+        'a','o','as','os','de','do','da','dos','das','em','no','na','nos','nas','por','para','com','sem','sobre','entre'
+]
+
+# Nome -> lista (None = sem stopwords, como no baseline)
+LISTAS_STOPWORDS = {
+    'nenhuma': None,
+    'interjeicoes': sorted(set(INTERJEICOES)),
+    'pt': sorted(set(STOPWORDS_PT)),
+    'pt+interjeicoes': sorted(set(INTERJEICOES + STOPWORDS_PT)),
+}
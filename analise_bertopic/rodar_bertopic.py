@@ -1,15 +1,33 @@
 import pandas as pd
 from bertopic import BERTopic
-from sentence_transformers import SentenceTransformer
+from bertopic.cluster import BaseCluster
+from bertopic.dimensionality import BaseDimensionalityReduction
 # Importação necessária para stopwords
 from sklearn.feature_extraction.text import CountVectorizer 
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from io_tabelas import ler_tabela, salvar_tabela
+from registro_artefatos import RegistroArtefatos
+from cache_embeddings import CacheEmbeddings, embeddings_com_cache
+from servico_embeddings import BACKEND_PADRAO, ServicoEmbeddings, nome_cache
+from listas_stopwords import LISTAS_STOPWORDS
+
+# Entrada pelo registro de artefatos (o arquivo limpo mais recente), saída ao lado do script
+registro = RegistroArtefatos()
+ARQUIVO_TRECHOS = registro.caminho('trechos_limpos')
+ARQUIVO_SAIDA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resultados_bertopic_com_stopwords.csv")
+ARQUIVO_ATRIBUICOES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "atribuicoes_bertopic.csv")
+MODELO_EMBEDDING = "paraphrase-multilingual-MiniLM-L12-v2"
 
 print("--- Iniciando o pipeline BERTopic (com Stopwords) ---")
 
 # --- 1. Carregar os Dados ---
 try:
     # Carrega o dataset de trechos pré-processados
-    df = pd.read_csv("../pre_processamento/musicas_por_trechos_limpo_20251116_112423.csv")
+    # Só a coluna usada (no Parquet, as demais nem são lidas do disco)
+    df = ler_tabela(ARQUIVO_TRECHOS, colunas=['letra'])
     
     # Usa a coluna 'letra' que contém os trechos das músicas
     trechos = df['letra'].dropna().astype(str).tolist()
@@ -18,7 +36,7 @@ try:
     print(f"Exemplo do primeiro trecho: {trechos[0]}")
 except FileNotFoundError:
     print("Erro: Arquivo CSV não encontrado.")
-    print("Verifique se o arquivo está em '../pre_processamento/musicas_por_trechos_limpo_20251116_112423.csv'")
+    print(f"Verifique o artefato 'trechos_limpos' no registro: {ARQUIVO_TRECHOS}")
     exit()
 except KeyError:
     print("Erro: A coluna 'letra' não foi encontrada no CSV.")
@@ -28,32 +46,49 @@ except Exception as e:
     print(f"Ocorreu um erro inesperado ao carregar os dados: {e}")
     exit()
 
+# Mesmos trechos, mesmo script e mesmas stopwords da última execução: nada a refazer
+entradas = {'trechos_limpos': ARQUIVO_TRECHOS, 'codigo': __file__,
+            'stopwords': os.path.join(os.path.dirname(os.path.abspath(__file__)), "listas_stopwords.py")}
+parametros = {'modelo_embedding': MODELO_EMBEDDING, 'backend_embedding': BACKEND_PADRAO}
+if registro.atualizado('topicos_bertopic', 'rodar_bertopic', entradas, parametros):
+    print("\n⏭️  Trechos e configuração sem mudança desde a última execução. Tópicos já calculados:")
+    print(ler_tabela(registro.caminho('topicos_bertopic')))
+    exit()
+
+# Só as stopwords mudaram: o agrupamento salvo (trecho -> tópico) continua valendo e
+# basta refazer o CountVectorizer + c-TF-IDF, sem encoder, UMAP nem HDBSCAN
+entradas_agrupamento = {'trechos_limpos': ARQUIVO_TRECHOS, 'codigo': __file__}
+so_representacao = registro.atualizado('atribuicoes_bertopic', 'rodar_bertopic', entradas_agrupamento, parametros)
+
 # --- 2. Configurar o Modelo de Embedding ---
-print("Carregando modelo de embedding (isso pode levar um momento)...")
-# Este é um bom modelo multilíngue que entende bem o português.
-embedding_model = SentenceTransformer("paraphrase-multilingual-MiniLM-L12-v2")
+if so_representacao:
+    atribuicoes = ler_tabela(ARQUIVO_ATRIBUICOES, colunas=['letra', 'Topic'])
+    trechos = atribuicoes['letra'].astype(str).tolist()
+    topicos_salvos = atribuicoes['Topic'].astype(int).tolist()
+    print(f"\n♻️  Reaproveitando o agrupamento salvo ({len(set(topicos_salvos))} tópicos): "
+          "recalculando só as palavras dos tópicos")
+    # Os embeddings desses trechos já estão no cache; o modelo só seria carregado se faltasse algum
+    embeddings = CacheEmbeddings(nome_cache(MODELO_EMBEDDING, BACKEND_PADRAO)).obter(
+        trechos, lambda novos: ServicoEmbeddings(MODELO_EMBEDDING).encode(novos)
+    )
+    embedding_model = None
+else:
+    print("Carregando modelo de embedding (isso pode levar um momento)...")
+    # Este é um bom modelo multilíngue que entende bem o português.
+    # Backend, lote e processos configurados em servico_embeddings.py
+    servico = ServicoEmbeddings(MODELO_EMBEDDING)
+    embedding_model = servico.modelo
+
+    # Embeddings pelo cache persistente: só os trechos nunca vistos passam pelo encoder,
+    # então mudar stopwords ou parâmetros do BERTopic custa apenas o agrupamento
+    embeddings = embeddings_com_cache(trechos, servico, servico.nome, show_progress_bar=True)
+    servico.fechar()
 
 # --- 3. Definir Stopwords e Vectorizer ---
 print("Configurando o Vectorizer com stopwords...")
 
-# Lista de interjeições e "lixo" que você identificou no Tópico 13
-interjeicoes = [
-    'oh', 'uou', 'ah', 'ooh', 'uô', 'oi', 'iê', 'ha', 'eh', 'uôu', 
-    'nanana', 'ererê', 'uh', 'hmm', 'hey', 'laia'
-]
-
-# Stopwords comuns do português (incluindo as vistas no Tópico -1)
-stopwords_pt = [
-        'ser','sou','é','era','foi','estou','tô','ta','tá','tava','estar','vamos','vou','ia','ir','ver','vi','vendo', 'tipo',
-        'dizer','disse','fala','falar','falou','diz','quer','querer','quero','pode','poder','podia','deve','dever', 'qual', 'está',
-        'tem','têm','tenho','tinha','ter','ficar','fica','ficou','ficando','deixar','deixa','deixou', 'nóis', 'eu', 'demais', 'alguém',
-        'pra','pro','pros','q','pq','porque','que','se','me','te','lhe','ela','ele','elas','eles','cê','você','vocês','tb', 'oi',
-        'iê','ê','ô','ah','oh','ei','uai','oxe','porra','pá','opa','oba','aê','ae','yeah','la','lá', 'aí', 'ai', 'não', 'todo',
-        'a','o','as','os','de','do','da','dos','das','em','no','na','nos','nas','por','para','com','sem','sobre','entre'
-]
-
-# Combinar as duas listas (usando 'set' para garantir palavras únicas)
-lista_final_stopwords = list(set(interjeicoes + stopwords_pt))
+# Listas em listas_stopwords.py (as mesmas usadas pela varredura de parâmetros)
+lista_final_stopwords = LISTAS_STOPWORDS['pt+interjeicoes']
 
 # Criar um modelo de vetorização que USA essa lista de stopwords
 # min_df=2 significa que a palavra deve aparecer em pelo menos 2 documentos
@@ -62,16 +97,32 @@ vectorizer_model = CountVectorizer(stop_words=lista_final_stopwords, min_df=2)
 
 
 # --- 4. Instanciar e Treinar o BERTopic ---
-print("Instanciando o modelo BERTopic...")
-topic_model = BERTopic(
-    embedding_model=embedding_model,
-    language="multilingual",    # Ajuda o modelo a processar melhor o português
-    verbose=True,               # Mostra o progresso
-    vectorizer_model=vectorizer_model # Passa o vectorizer customizado
-)
+if so_representacao:
+    # Modo manual do BERTopic: redução identidade e os tópicos salvos como rótulos
+    topic_model = BERTopic(
+        language="multilingual",
+        verbose=True,
+        vectorizer_model=vectorizer_model,
+        umap_model=BaseDimensionalityReduction(),
+        hdbscan_model=BaseCluster()
+    )
+    print("Recalculando as representações dos tópicos (c-TF-IDF)...")
+    topics, probabilities = topic_model.fit_transform(trechos, embeddings=embeddings, y=topicos_salvos)
+else:
+    print("Instanciando o modelo BERTopic...")
+    topic_model = BERTopic(
+        embedding_model=embedding_model,
+        language="multilingual",    # Ajuda o modelo a processar melhor o português
+        verbose=True,               # Mostra o progresso
+        vectorizer_model=vectorizer_model # Passa o vectorizer customizado
+    )
+
+    print("Iniciando o treinamento do modelo... (Isso pode levar vários minutos)")
+    topics, probabilities = topic_model.fit_transform(trechos, embeddings=embeddings)
 
-print("Iniciando o treinamento do modelo... (Isso pode levar vários minutos)")
-topics, probabilities = topic_model.fit_transform(trechos)
+    # Guarda trecho -> tópico para as próximas mudanças de stopwords
+    salvar_tabela(pd.DataFrame({'letra': trechos, 'Topic': topics}), ARQUIVO_ATRIBUICOES)
+    registro.registrar('atribuicoes_bertopic', ARQUIVO_ATRIBUICOES, 'rodar_bertopic', entradas_agrupamento, parametros)
 
 # --- 5. Visualizar os Resultados ---
 print("\n--- TÓPICOS ENCONTRADOS (BERTopic com Stopwords) ---")
@@ -79,7 +130,8 @@ topic_info = topic_model.get_topic_info()
 print(topic_info)
 
 # Salva os resultados para análise posterior
-topic_info.to_csv("resultados_bertopic_com_stopwords.csv", index=False)
+salvar_tabela(topic_info, ARQUIVO_SAIDA)
+registro.registrar('topicos_bertopic', ARQUIVO_SAIDA, 'rodar_bertopic', entradas, parametros)
 
 print("\n--- Detalhes dos 5 Tópicos Mais Frequentes ---")
 # Mostra as palavras-chave dos 5 tópicos principais (sem contar o -1, que são outliers)
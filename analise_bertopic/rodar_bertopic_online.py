@@ -0,0 +1,203 @@
+import hashlib
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from io_tabelas import ler_tabela_em_lotes, salvar_tabela
+from registro_artefatos import RegistroArtefatos
+from cache_embeddings import CacheEmbeddings, normalizar_texto
+from servico_embeddings import BACKEND_PADRAO, MODELO_PADRAO, ServicoEmbeddings, nome_cache
+from listas_stopwords import LISTAS_STOPWORDS
+
+PASTA = os.path.dirname(os.path.abspath(__file__))
+PASTA_MODELO = os.path.join(PASTA, "modelo_bertopic_online")     # Modelo + estado, para retomar
+ARQUIVO_MODELO = os.path.join(PASTA_MODELO, "modelo.pkl")
+ARQUIVO_ESTADO = os.path.join(PASTA_MODELO, "estado.json")
+ARQUIVO_ABSORVIDOS = os.path.join(PASTA_MODELO, "absorvidos.npy")  # Chaves dos trechos já no modelo
+ARQUIVO_STOPWORDS = os.path.join(PASTA, "listas_stopwords.py")
+ARQUIVO_SAIDA = os.path.join(PASTA, "resultados_bertopic_online.csv")
+
+TAMANHO_LOTE = 5_000        # Trechos por mini-lote: a memória depende disto, não do tamanho do corpus
+N_COMPONENTES = 5           # IncrementalPCA no lugar do UMAP (mesmo número de dimensões)
+N_TOPICOS = 50              # MiniBatchKMeans tem número fixo de grupos e não gera outliers (-1)
+DECAIMENTO = 0.01           # OnlineCountVectorizer: contagens antigas perdem 1% a cada lote...
+FREQUENCIA_MINIMA = 2       # ...e palavras que caem abaixo disso saem do vocabulário
+SALVAR_A_CADA = 10          # Lotes entre gravações do modelo
+STOPWORDS = LISTAS_STOPWORDS['pt+interjeicoes']
+
+PARAMETROS = {
+    'modelo_embedding': MODELO_PADRAO, 'backend_embedding': BACKEND_PADRAO, 'tamanho_lote': TAMANHO_LOTE,
+    'n_componentes': N_COMPONENTES, 'n_topicos': N_TOPICOS,
+    'decaimento': DECAIMENTO, 'frequencia_minima': FREQUENCIA_MINIMA,
+    # O conteúdo da lista, não só o nome: editar listas_stopwords.py recomeça o modelo
+    'stopwords': hashlib.sha1('\n'.join(STOPWORDS).encode('utf-8')).hexdigest(),
+}
+
+
+def criar_modelo():
+    """BERTopic com etapas que aceitam partial_fit: IncrementalPCA, MiniBatchKMeans e OnlineCountVectorizer."""
+    from bertopic import BERTopic
+    from bertopic.vectorizers import OnlineCountVectorizer
+    from sklearn.cluster import MiniBatchKMeans
+    from sklearn.decomposition import IncrementalPCA
+
+    return BERTopic(
+        umap_model=IncrementalPCA(n_components=N_COMPONENTES),
+        hdbscan_model=MiniBatchKMeans(n_clusters=N_TOPICOS, random_state=42),
+        vectorizer_model=OnlineCountVectorizer(stop_words=STOPWORDS, decay=DECAIMENTO,
+                                               delete_min_df=FREQUENCIA_MINIMA),
+        language="multilingual",
+    )
+
+
+def carregar_ou_criar():
+    """Modelo, estado e chaves absorvidas salvos (se os parâmetros forem os mesmos) ou um modelo novo."""
+    if all(os.path.exists(caminho) for caminho in (ARQUIVO_MODELO, ARQUIVO_ESTADO, ARQUIVO_ABSORVIDOS)):
+        with open(ARQUIVO_ESTADO, 'r', encoding='utf-8') as f:
+            estado = json.load(f)
+        if estado.get('parametros') == PARAMETROS:
+            from bertopic import BERTopic
+            return BERTopic.load(ARQUIVO_MODELO), estado, np.load(ARQUIVO_ABSORVIDOS)
+        print("⚠️  Parâmetros mudaram desde o modelo salvo: começando um modelo novo")
+    return (criar_modelo(), {'parametros': PARAMETROS, 'lotes': 0, 'trechos': 0, 'contagens': {}},
+            np.empty(0, dtype='S20'))
+
+
+def _gravar(caminho, gravar):
+    temporario = caminho + '.tmp'
+    with open(temporario, 'wb') as f:
+        gravar(f)
+    os.replace(temporario, caminho)
+
+
+def salvar(topic_model, estado, absorvidos):
+    # Modelo antes das chaves: se parar no meio, no pior caso alguns trechos são absorvidos de novo,
+    # nunca marcados como absorvidos sem estar no modelo
+    os.makedirs(PASTA_MODELO, exist_ok=True)
+    # Temporário + os.replace também no modelo: um modelo.pkl cortado impediria retomar
+    topic_model.save(ARQUIVO_MODELO + '.tmp', serialization="pickle", save_embedding_model=False)
+    os.replace(ARQUIVO_MODELO + '.tmp', ARQUIVO_MODELO)
+    _gravar(ARQUIVO_ABSORVIDOS, lambda f: np.save(f, absorvidos))
+    _gravar(ARQUIVO_ESTADO, lambda f: f.write(json.dumps(estado, ensure_ascii=False, indent=2).encode('utf-8')))
+
+
+def chave_trecho(artista, titulo, letra):
+    """sha1 de (artista, título, verso): estável entre coletas, ao contrário de tag_musica/tag_trecho."""
+    texto = f"{normalizar_texto(artista)}\0{normalizar_texto(titulo)}\0{normalizar_texto(letra)}"
+    return hashlib.sha1(texto.encode('utf-8')).digest()
+
+
+def trechos_novos(arquivo, absorvidos):
+    """(chaves, trechos) de cada pedaço do CSV, só com os trechos que o modelo ainda não viu."""
+    vistos_nesta_execucao = set()
+    for df in ler_tabela_em_lotes(arquivo, colunas=['titulo', 'artista', 'letra'], tamanho_lote=TAMANHO_LOTE):
+        df = df.dropna(subset=['letra'])
+        letras = df['letra'].astype(str).tolist()
+        chaves = np.array([chave_trecho(artista, titulo, letra) for artista, titulo, letra in
+                           zip(df['artista'].astype(str), df['titulo'].astype(str), letras)], dtype='S20')
+        ja_absorvidos = np.isin(chaves, absorvidos)
+        novos = []
+        for i, chave in enumerate(chaves):
+            if not ja_absorvidos[i] and chave not in vistos_nesta_execucao:
+                vistos_nesta_execucao.add(chave)
+                novos.append(i)
+        yield chaves[novos], [letras[i] for i in novos]
+
+
+def main():
+    print("="*70)
+    print("🌊 BERTOPIC ONLINE (MINI-LOTES, MEMÓRIA LIMITADA)")
+    print("="*70)
+
+    registro = RegistroArtefatos()
+    arquivo_trechos = registro.caminho('trechos_limpos')
+    if not arquivo_trechos or not os.path.exists(arquivo_trechos):
+        print(f"❌ Erro: Trechos não encontrados no registro: {arquivo_trechos}")
+        return
+
+    topic_model, estado, absorvidos = carregar_ou_criar()
+    estado.setdefault('contagens', {})  # Estados gravados antes da contagem acumulada
+    print(f"📂 {os.path.basename(arquivo_trechos)}")
+    print(f"🧠 Modelo atual: {estado['lotes']} lotes, {estado['trechos']:,} trechos absorvidos")
+    print()
+
+    # Embeddings pelo cache (memory map); o encoder só é carregado se faltar algum trecho
+    cache = CacheEmbeddings(nome_cache(MODELO_PADRAO, BACKEND_PADRAO))
+    servico = None
+
+    def codificar(novos):
+        nonlocal servico
+        if servico is None:
+            servico = ServicoEmbeddings(MODELO_PADRAO)
+        return servico.encode(novos)
+
+    def absorver(chaves, trechos):
+        nonlocal absorvidos
+        topic_model.partial_fit(trechos, embeddings=cache.obter(trechos, codificar))
+        # topics_ (e o Count de get_topic_info) só cobre o último lote: o total vai no estado
+        for topico, quantidade in zip(*np.unique(topic_model.topics_, return_counts=True)):
+            chave = str(int(topico))
+            estado['contagens'][chave] = estado['contagens'].get(chave, 0) + int(quantidade)
+        absorvidos = np.union1d(absorvidos, chaves)
+        estado['lotes'] += 1
+        estado['trechos'] += len(trechos)
+        print(f"   Lote {estado['lotes']}: +{len(trechos):,} trechos ({time.perf_counter() - inicio:.0f} s)")
+
+    # O arquivo inteiro é lido em pedaços, mas só os trechos nunca vistos vão para o modelo;
+    # eles se acumulam até formar um lote completo
+    inicio = time.perf_counter()
+    lotes_novos = 0
+    buffer_chaves, buffer_trechos = [], []
+    for chaves, trechos in trechos_novos(arquivo_trechos, absorvidos):
+        buffer_chaves.extend(chaves)
+        buffer_trechos.extend(trechos)
+        while len(buffer_trechos) >= TAMANHO_LOTE:
+            absorver(np.array(buffer_chaves[:TAMANHO_LOTE], dtype='S20'), buffer_trechos[:TAMANHO_LOTE])
+            del buffer_chaves[:TAMANHO_LOTE], buffer_trechos[:TAMANHO_LOTE]
+            lotes_novos += 1
+            if lotes_novos % SALVAR_A_CADA == 0:
+                salvar(topic_model, estado, absorvidos)
+
+    # Sobra final: a IncrementalPCA precisa de N_COMPONENTES trechos por lote e o primeiro
+    # lote do MiniBatchKMeans de N_TOPICOS; com menos, os trechos esperam a próxima execução
+    minimo = N_TOPICOS if estado['lotes'] == 0 else N_COMPONENTES
+    if len(buffer_trechos) >= max(minimo, N_COMPONENTES):
+        absorver(np.array(buffer_chaves, dtype='S20'), buffer_trechos)
+        lotes_novos += 1
+    elif buffer_trechos:
+        print(f"   ⏸️  {len(buffer_trechos)} trechos novos ficam para a próxima execução "
+              f"(mínimo de {max(minimo, N_COMPONENTES)} por lote)")
+
+    if servico is not None:
+        servico.fechar()
+    if lotes_novos == 0:
+        print("⏭️  Nenhum lote novo para absorver: modelo sem mudança.")
+        return
+
+    salvar(topic_model, estado, absorvidos)
+    topic_info = topic_model.get_topic_info()
+    topic_info['Count'] = [estado['contagens'].get(str(topico), 0) for topico in topic_info['Topic']]
+    topic_info = topic_info.sort_values('Count', ascending=False, kind='stable').reset_index(drop=True)
+    salvar_tabela(topic_info, ARQUIVO_SAIDA)
+    registro.registrar('topicos_bertopic_online', ARQUIVO_SAIDA, 'rodar_bertopic_online',
+                       {'trechos_limpos': arquivo_trechos, 'codigo': __file__, 'stopwords': ARQUIVO_STOPWORDS},
+                       PARAMETROS)
+
+    print()
+    print("="*70)
+    print("📊 TÓPICOS (MODELO ONLINE)")
+    print("="*70)
+    print(topic_info[['Topic', 'Count', 'Name']].head(15).to_string())
+    print()
+    print(f"✅ {lotes_novos} lotes novos em {time.perf_counter() - inicio:.0f} s")
+    print(f"📂 Modelo: {ARQUIVO_MODELO}")
+    print(f"📂 Tópicos: {ARQUIVO_SAIDA}")
+    print("="*70)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+import hashlib
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from io_tabelas import ler_tabela, salvar_tabela
+from registro_artefatos import RegistroArtefatos
+from cache_embeddings import PASTA_CACHE_PADRAO, embeddings_com_cache
+from servico_embeddings import MODELO_PADRAO, ServicoEmbeddings
+from listas_stopwords import LISTAS_STOPWORDS
+
+PASTA = os.path.dirname(os.path.abspath(__file__))
+ARQUIVO_SAIDA = os.path.join(PASTA, "resultados_varredura_bertopic.csv")
+ARQUIVO_STOPWORDS = os.path.join(PASTA, "listas_stopwords.py")
+PASTA_REDUCOES = os.path.join(PASTA_CACHE_PADRAO, "reducoes_umap")
+PROCESSOS = os.cpu_count() or 1
+PALAVRAS_COERENCIA = 10     # Palavras de cada tópico usadas no NPMI
+
+# Grade de parâmetros, separada pelas etapas do BERTopic. Cada etapa só é refeita
+# quando muda algo nela ou antes dela:
+#   UMAP (1x por combinação, em disco) -> HDBSCAN (1x por processo) -> CountVectorizer + c-TF-IDF
+GRADE_UMAP = {
+    'n_neighbors': [15],
+    'n_components': [5],
+}
+GRADE_HDBSCAN = {
+    'min_topic_size': [10, 20, 40],
+    'min_samples': [None, 5],
+    'cluster_selection_method': ['eom', 'leaf'],
+}
+GRADE_VECTORIZER = {
+    'stopwords': ['nenhuma', 'pt+interjeicoes'],
+    'min_df': [1, 2],
+    'ngram_range': [(1, 1), (1, 2)],
+}
+
+_trechos_processo = None
+
+
+def combinacoes(grade):
+    return [dict(zip(grade, valores)) for valores in itertools.product(*grade.values())]
+
+
+def reducao_umap(embeddings, parametros, chave_corpus):
+    """
+    Embeddings reduzidos pelo UMAP (mesmos padrões do BERTopic, semente fixa),
+    gravados em PASTA_REDUCOES. Retorna o caminho do .npy.
+    """
+    chave = hashlib.sha1(json.dumps({'corpus': chave_corpus, **parametros}, sort_keys=True).encode('utf-8'))
+    caminho = os.path.join(PASTA_REDUCOES, f"umap_{chave.hexdigest()[:16]}.npy")
+    if os.path.exists(caminho):
+        print(f"   ⏭️  UMAP {parametros}: redução já em cache")
+        return caminho
+
+    from umap import UMAP
+    inicio = time.perf_counter()
+    reduzido = UMAP(n_neighbors=parametros['n_neighbors'], n_components=parametros['n_components'],
+                    min_dist=0.0, metric='cosine', low_memory=False, random_state=42).fit_transform(embeddings)
+    os.makedirs(PASTA_REDUCOES, exist_ok=True)
+    with open(caminho + '.tmp', 'wb') as f:
+        np.save(f, reduzido.astype(np.float32))
+    os.replace(caminho + '.tmp', caminho)
+    print(f"   🗺️  UMAP {parametros}: {time.perf_counter() - inicio:.1f} s")
+    return caminho
+
+
+def coerencia_npmi(documentos, palavras_por_topico, vectorizer):
+    """
+    NPMI médio entre pares das palavras principais de cada tópico, com a coocorrência
+    contada por documento (trecho) e a mesma tokenização do vectorizer da configuração.
+    Pares que nunca aparecem juntos valem -1. Retorna a média sobre os tópicos.
+    """
+    from sklearn.feature_extraction.text import CountVectorizer
+
+    palavras_por_topico = [palavras[:PALAVRAS_COERENCIA] for palavras in palavras_por_topico if len(palavras) > 1]
+    vocabulario = sorted({palavra for palavras in palavras_por_topico for palavra in palavras})
+    if not vocabulario:
+        return np.nan
+    presenca = CountVectorizer(vocabulary=vocabulario, binary=True, ngram_range=vectorizer.ngram_range,
+                               stop_words=vectorizer.stop_words).fit_transform(documentos)
+    conjunta = (presenca.T @ presenca).toarray() / presenca.shape[0]
+    marginal = np.diag(conjunta)
+    indice = {palavra: i for i, palavra in enumerate(vocabulario)}
+
+    notas = []
+    for palavras in palavras_por_topico:
+        ids = [indice[palavra] for palavra in palavras]
+        pares = np.triu_indices(len(ids), k=1)
+        p_ij = conjunta[np.ix_(ids, ids)][pares]
+        p_i_p_j = np.outer(marginal[ids], marginal[ids])[pares]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            npmi = np.log(p_ij / p_i_p_j) / -np.log(p_ij)
+        npmi = np.where(p_ij == 0, -1.0, np.where(p_ij >= 1, 1.0, npmi))
+        notas.append(npmi.mean())
+    return float(np.mean(notas))
+
+
+def _iniciar_processo(trechos):
+    global _trechos_processo
+    _trechos_processo = trechos
+
+
+def _rodar_agrupamento(caminho_reducao, parametros_umap, parametros_hdbscan, configuracoes_vectorizer):
+    """
+    Um HDBSCAN sobre a redução em cache e, com os mesmos rótulos, só o c-TF-IDF
+    (BERTopic em modo manual) para cada configuração do vectorizer.
+    """
+    from bertopic import BERTopic
+    from bertopic.cluster import BaseCluster
+    from bertopic.dimensionality import BaseDimensionalityReduction
+    from hdbscan import HDBSCAN
+    from sklearn.feature_extraction.text import CountVectorizer
+
+    reduzido = np.load(caminho_reducao)
+    inicio = time.perf_counter()
+    rotulos = HDBSCAN(min_cluster_size=parametros_hdbscan['min_topic_size'],
+                      min_samples=parametros_hdbscan['min_samples'],
+                      cluster_selection_method=parametros_hdbscan['cluster_selection_method'],
+                      metric='euclidean').fit(reduzido).labels_
+    tempo_agrupamento = time.perf_counter() - inicio
+    outliers = int((rotulos == -1).sum())
+
+    linhas = []
+    for configuracao in configuracoes_vectorizer:
+        inicio = time.perf_counter()
+        vectorizer = CountVectorizer(stop_words=LISTAS_STOPWORDS[configuracao['stopwords']],
+                                     min_df=configuracao['min_df'], ngram_range=configuracao['ngram_range'])
+        topic_model = BERTopic(umap_model=BaseDimensionalityReduction(), hdbscan_model=BaseCluster(),
+                               vectorizer_model=vectorizer)
+        topic_model.fit(_trechos_processo, embeddings=reduzido, y=rotulos)
+        palavras = [[palavra for palavra, _ in representacao if palavra]
+                    for topico, representacao in topic_model.get_topics().items() if topico != -1]
+        linhas.append({
+            **parametros_umap, **parametros_hdbscan, **configuracao,
+            'ngram_range': str(configuracao['ngram_range']),
+            'n_topicos': len(palavras),
+            'outliers': outliers,
+            'proporcao_outliers': round(outliers / len(rotulos), 4),
+            'coerencia_npmi': round(coerencia_npmi(_trechos_processo, palavras, vectorizer), 4),
+            'tempo_s': round(tempo_agrupamento / len(configuracoes_vectorizer) + time.perf_counter() - inicio, 2),
+        })
+    return linhas
+
+
+def main():
+    print("="*70)
+    print("🔬 VARREDURA DE PARÂMETROS DO BERTOPIC")
+    print("="*70)
+
+    registro = RegistroArtefatos()
+    arquivo_trechos = registro.caminho('trechos_limpos')
+    entradas = {'trechos_limpos': arquivo_trechos, 'codigo': __file__, 'stopwords': ARQUIVO_STOPWORDS}
+    parametros = {'umap': GRADE_UMAP, 'hdbscan': GRADE_HDBSCAN, 'vectorizer': GRADE_VECTORIZER,
+                  'modelo_embedding': MODELO_PADRAO}
+    if registro.atualizado('varredura_bertopic', 'varredura_bertopic', entradas, parametros):
+        print("⏭️  Trechos e grade sem mudança desde a última execução. Resultado já calculado:")
+        print(ler_tabela(ARQUIVO_SAIDA).head(15).to_string())
+        return
+
+    trechos = ler_tabela(arquivo_trechos, colunas=['letra'])['letra'].dropna().astype(str).tolist()
+    grade_umap = combinacoes(GRADE_UMAP)
+    grade_hdbscan = combinacoes(GRADE_HDBSCAN)
+    grade_vectorizer = combinacoes(GRADE_VECTORIZER)
+    total = len(grade_umap) * len(grade_hdbscan) * len(grade_vectorizer)
+    print(f"📂 {os.path.basename(arquivo_trechos)}: {len(trechos):,} trechos")
+    print(f"🧮 {total} configurações = {len(grade_umap)} UMAP x {len(grade_hdbscan)} HDBSCAN x "
+          f"{len(grade_vectorizer)} vectorizer, em {PROCESSOS} processos")
+    print()
+
+    # --- 1. Embeddings: uma vez para todas as configurações (e do cache, se já calculados) ---
+    with ServicoEmbeddings(MODELO_PADRAO) as servico:
+        embeddings = embeddings_com_cache(trechos, servico, servico.nome, show_progress_bar=True)
+        chave_corpus = hashlib.sha1(('\n'.join([servico.nome] + trechos)).encode('utf-8')).hexdigest()
+
+    # --- 2. UMAP: uma redução por combinação, compartilhada pelas configurações seguintes ---
+    print("\n🗺️  Reduções UMAP...")
+    reducoes = [(reducao_umap(embeddings, parametros_umap, chave_corpus), parametros_umap)
+                for parametros_umap in grade_umap]
+    del embeddings
+
+    # --- 3. HDBSCAN + c-TF-IDF em paralelo: uma tarefa por agrupamento ---
+    print(f"\n🧩 Agrupamentos e representações...")
+    tarefas = [(caminho, parametros_umap, parametros_hdbscan, grade_vectorizer)
+               for caminho, parametros_umap in reducoes for parametros_hdbscan in grade_hdbscan]
+    linhas = []
+    inicio = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=min(PROCESSOS, len(tarefas)),
+                             initializer=_iniciar_processo, initargs=(trechos,)) as pool:
+        futuros = [pool.submit(_rodar_agrupamento, *tarefa) for tarefa in tarefas]
+        for numero, futuro in enumerate(as_completed(futuros), start=1):
+            linhas.extend(futuro.result())
+            print(f"   {numero}/{len(tarefas)} agrupamentos ({len(linhas)}/{total} configurações) "
+                  f"- {time.perf_counter() - inicio:.0f} s")
+
+    # --- 4. Tabela comparativa ---
+    df = pd.DataFrame(linhas).sort_values('coerencia_npmi', ascending=False, ignore_index=True)
+    salvar_tabela(df, ARQUIVO_SAIDA)
+    registro.registrar('varredura_bertopic', ARQUIVO_SAIDA, 'varredura_bertopic', entradas, parametros)
+
+    print()
+    print("="*70)
+    print("📊 MELHORES CONFIGURAÇÕES (POR COERÊNCIA NPMI)")
+    print("="*70)
+    print(df.head(15).to_string())
+    print()
+    print(f"✅ {total} configurações em {time.perf_counter() - inicio:.0f} s (sem contar embeddings e UMAP)")
+    print(f"📂 Tabela completa: {ARQUIVO_SAIDA}")
+    print("="*70)
+
+
+if __name__ == "__main__":
+    main()
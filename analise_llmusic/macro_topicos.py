@@ -3,12 +3,19 @@ import requests
 import time
 import numpy as np
 from statistics import mode, StatisticsError
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from io_tabelas import ler_tabela, salvar_tabela
+from registro_artefatos import RegistroArtefatos
 
 print("--- ETAPA 2: Classificação com Autoconsistência (LLMusic) ---")
 
 # --- 1. CONFIGURAÇÃO ---
-ARQUIVO_TRECHOS = "../pre_processamento/musicas_por_trechos_limpo_20251116_112423.csv"
-ARQUIVO_SAIDA = "resultado_classificacao_autoconsistencia.csv"
+registro = RegistroArtefatos()
+ARQUIVO_TRECHOS = registro.caminho('trechos_limpos')
+ARQUIVO_SAIDA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resultado_classificacao_autoconsistencia.csv")
 
 # Definindo os Macro-Tópicos (Baseado na sua análise e na Dissertação)
 TOPICOS_ALVO = {
@@ -28,7 +35,7 @@ TEMPERATURAS = [0.1, 0.4, 0.7, 0.9, 1.0] # Variação para testar robustez (se N
 # --- 2. CARREGAR DADOS ---
 try:
     # Vamos pegar uma AMOSTRA para não demorar dias rodando localmente
-    df = pd.read_csv(ARQUIVO_TRECHOS)
+    df = ler_tabela(ARQUIVO_TRECHOS, colunas=['letra'])
     # PEGA APENAS 50 TRECHOS ALEATÓRIOS PARA TESTE INICIAL
     df_amostra = df.sample(50, random_state=42).reset_index(drop=True) 
     trechos = df_amostra['letra'].astype(str).tolist()
@@ -76,6 +83,13 @@ def classificar_trecho(trecho, topico, temperatura):
     except:
         return None
 
+# Mesma amostra de trechos e mesmo script (tópicos, prompt, temperaturas): nada a refazer
+entradas = {'trechos_limpos': ARQUIVO_TRECHOS, 'codigo': __file__}
+if registro.atualizado('classificacao_autoconsistencia', 'macro_topicos', entradas):
+    print("\n⏭️  Trechos e configuração sem mudança desde a última execução. Resultados já calculados:")
+    print(ler_tabela(ARQUIVO_SAIDA).head())
+    exit()
+
 # --- 4. LOOP PRINCIPAL (Self-Consistency) ---
 resultados = []
 
@@ -137,7 +151,8 @@ for i, trecho in enumerate(trechos):
 
 # --- 5. EXPORTAÇÃO ---
 df_resultados = pd.DataFrame(resultados)
-df_resultados.to_csv(ARQUIVO_SAIDA, index=False)
+salvar_tabela(df_resultados, ARQUIVO_SAIDA)
+registro.registrar('classificacao_autoconsistencia', ARQUIVO_SAIDA, 'macro_topicos', entradas)
 
 print(f"\n--- Concluído em {round(time.time() - start_time, 2)} segundos ---")
 print(f"Resultados salvos em: {ARQUIVO_SAIDA}")
@@ -1,17 +1,25 @@
 import pandas as pd
 import re
 from bertopic import BERTopic
-from sentence_transformers import SentenceTransformer
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from io_tabelas import ler_tabela, salvar_tabela
+from registro_artefatos import RegistroArtefatos
+from cache_embeddings import embeddings_com_cache
+from servico_embeddings import ServicoEmbeddings
 
 print("--- Iniciando Refinamento de Tópicos ---")
 
 # --- 1. Carregar os dados brutos (A Matéria-Prima) ---
-arquivo_entrada = "temas_gerados_llmusic_local.csv"
-arquivo_saida = "resultados_llmusic_refinado_final.csv" # NOME DO NOVO ARQUIVO
+registro = RegistroArtefatos()
+arquivo_entrada = registro.caminho('temas_llmusic')  # Temas gerados por rodar_llmusic.py
+arquivo_saida = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resultados_llmusic_refinado_final.csv") # NOME DO NOVO ARQUIVO
 
 try:
     print(f"Lendo arquivo original: {arquivo_entrada}...")
-    df = pd.read_csv(arquivo_entrada)
+    df = ler_tabela(arquivo_entrada, colunas=['tema'])
     # Garante que estamos pegando todas as linhas, convertendo para string
     temas_brutos = df['tema'].dropna().astype(str).tolist()
     print(f"-> Total de temas brutos carregados: {len(temas_brutos)}")
@@ -59,12 +67,25 @@ print(f"\nExemplos de lixo removido (primeiros 10):")
 for exemplo in temas_removidos[:10]:
     print(f"  - '{exemplo}'")
 
+# Mesmos temas e mesmo script (filtros incluídos) da última execução: nada a refazer
+entradas = {'temas_llmusic': arquivo_entrada, 'codigo': __file__}
+if registro.atualizado('topicos_llmusic_refinados', 'refinamento_dos_resultados_llmusic', entradas):
+    print("\n⏭️  Temas e filtros sem mudança desde a última execução. Tópicos já refinados:")
+    print(ler_tabela(arquivo_saida, colunas=['Topic', 'Count', 'Name']).head(11))
+    exit()
+
 # --- 4. Re-Agrupamento com BERTopic ---
 # Agora rodamos o modelo na lista limpa. Ele vai agrupar "sofrimento" com "sofrimento"
 # e somar automaticamente na coluna 'Count'.
 print("\nRe-calculando tópicos e contagens com BERTopic...")
 
-embedding_model = SentenceTransformer("paraphrase-multilingual-MiniLM-L12-v2")
+MODELO_EMBEDDING = "paraphrase-multilingual-MiniLM-L12-v2"
+# Backend, lote e processos configurados em servico_embeddings.py
+servico = ServicoEmbeddings(MODELO_EMBEDDING)
+embedding_model = servico.modelo
+# Mesmo cache de rodar_llmusic.py: os temas limpos que coincidem com os brutos já têm embedding
+embeddings = embeddings_com_cache(temas_filtrados, servico, servico.nome, show_progress_bar=True)
+servico.fechar()
 # min_topic_size maior ajuda a evitar micro-tópicos repetidos
 topic_model = BERTopic(
     embedding_model=embedding_model, 
@@ -73,12 +94,13 @@ topic_model = BERTopic(
     verbose=True
 )
 
-topics, probs = topic_model.fit_transform(temas_filtrados)
+topics, probs = topic_model.fit_transform(temas_filtrados, embeddings=embeddings)
 topic_info = topic_model.get_topic_info()
 
 # --- 5. Salvar o NOVO arquivo ---
 print(f"\nSalvando resultados em: {arquivo_saida}")
-topic_info.to_csv(arquivo_saida, index=False)
+salvar_tabela(topic_info, arquivo_saida)
+registro.registrar('topicos_llmusic_refinados', arquivo_saida, 'refinamento_dos_resultados_llmusic', entradas)
 
 print("\n--- AMOSTRA DOS TOP 10 TÓPICOS CONSOLIDADOS ---")
 print(topic_info[['Topic', 'Count', 'Name']].head(11))
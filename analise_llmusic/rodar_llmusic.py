@@ -4,18 +4,33 @@ import json
 import time
 import random
 from bertopic import BERTopic
-from sentence_transformers import SentenceTransformer
 # A biblioteca do Google NÃO é mais necessária aqui
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from io_tabelas import ler_tabela, salvar_tabela
+from registro_artefatos import RegistroArtefatos
+from cache_embeddings import embeddings_com_cache
+from servico_embeddings import ServicoEmbeddings
+
+# Entrada pelo registro de artefatos, saídas ao lado do script
+registro = RegistroArtefatos()
+PASTA = os.path.dirname(os.path.abspath(__file__))
+ARQUIVO_TRECHOS = registro.caminho('trechos_limpos')
+ARQUIVO_TEMAS = os.path.join(PASTA, "temas_gerados_llmusic_local.csv")
+ARQUIVO_TOPICOS = os.path.join(PASTA, "resultados_llmusic_pipeline_local.csv")
+MODELO_EMBEDDING = "paraphrase-multilingual-MiniLM-L12-v2"
 
 print("--- Iniciando o pipeline LLMusic (Versão Local com Ollama) ---")
 
 # --- 1. Carregar os Dados ---
 try:
-    df = pd.read_csv("../pre_processamento/musicas_por_trechos_limpo_20251116_112423.csv")
+    df = ler_tabela(ARQUIVO_TRECHOS, colunas=['letra'])
     trechos = df['letra'].dropna().astype(str).tolist()
     print(f"Carregados {len(trechos)} trechos únicos.")
 except FileNotFoundError:
-    print("Erro: Arquivo não encontrado em '../pre_processamento/musicas_por_trechos_limpo_20251116_112423.csv'")
+    print(f"Erro: Arquivo não encontrado (artefato 'trechos_limpos' no registro): {ARQUIVO_TRECHOS}")
     exit()
 
 # --- 2. Etapa 1: Geração de Temas (com LLM Local) ---
@@ -26,66 +41,87 @@ N_ITERACOES = 10
 TRECHOS_POR_LOTE = 20
 TEMAS_POR_LOTE = 5
 
-lista_de_temas_gerados = []
-url_ollama = "http://localhost:11434/api/generate" # API local do Ollama
-
-for i in range(N_ITERACOES):
-    print(f"\nIniciando Iteração {i + 1}/{N_ITERACOES}...")
-    random.shuffle(trechos)
-    lotes = [trechos[j:j + TRECHOS_POR_LOTE] for j in range(0, len(trechos), TRECHOS_POR_LOTE)]
-    print(f"Processando {len(lotes)} lotes...")
-
-    for count, lote in enumerate(lotes):
-        trechos_formatados = "\n".join([f"{idx+1}. {trecho}" for idx, trecho in enumerate(lote)])
+# A geração é a parte cara (milhares de chamadas ao LLM): só refaz se os trechos ou o script mudaram
+entradas_temas = {'trechos_limpos': ARQUIVO_TRECHOS, 'codigo': __file__}
+parametros_temas = {'n_iteracoes': N_ITERACOES, 'trechos_por_lote': TRECHOS_POR_LOTE, 'temas_por_lote': TEMAS_POR_LOTE}
+
+if registro.atualizado('temas_llmusic', 'rodar_llmusic', entradas_temas, parametros_temas):
+    print("⏭️  Trechos e configuração sem mudança: reaproveitando os temas já gerados.")
+    lista_de_temas_gerados = ler_tabela(ARQUIVO_TEMAS, colunas=['tema'])['tema'].fillna('').astype(str).tolist()
+    print(f"Total de temas carregados: {len(lista_de_temas_gerados)}")
+else:
+    lista_de_temas_gerados = []
+    url_ollama = "http://localhost:11434/api/generate" # API local do Ollama
+
+    for i in range(N_ITERACOES):
+        print(f"\nIniciando Iteração {i + 1}/{N_ITERACOES}...")
+        random.shuffle(trechos)
+        lotes = [trechos[j:j + TRECHOS_POR_LOTE] for j in range(0, len(trechos), TRECHOS_POR_LOTE)]
+        print(f"Processando {len(lotes)} lotes...")
+
+        for count, lote in enumerate(lotes):
+            trechos_formatados = "\n".join([f"{idx+1}. {trecho}" for idx, trecho in enumerate(lote)])
         
-        prompt = (
-            f"dado os seguintes trechos de música, "
-            f"sugira {TEMAS_POR_LOTE} tópicos que descrevem os assuntos abordados:\n\n"
-            f"{trechos_formatados}\n\n"
-            f"REGRAS:\n"
-            f"- Responda APENAS com os tópicos, um por linha.\n"
-            f"- Não inclua números na sua resposta.\n"
-            f"- Gere temas curtos e conceituais (ex: 'Sofrimento por amor', 'Festa e bebida')."
-        )
+            prompt = (
+                f"dado os seguintes trechos de música, "
+                f"sugira {TEMAS_POR_LOTE} tópicos que descrevem os assuntos abordados:\n\n"
+                f"{trechos_formatados}\n\n"
+                f"REGRAS:\n"
+                f"- Responda APENAS com os tópicos, um por linha.\n"
+                f"- Não inclua números na sua resposta.\n"
+                f"- Gere temas curtos e conceituais (ex: 'Sofrimento por amor', 'Festa e bebida')."
+            )
         
-        # Estrutura de dados que o Ollama espera
-        data = {
-            "model": "llama3:8b", # O modelo que baixamos
-            "prompt": prompt,
-            "stream": False,
-            "options": {
-                "temperature": 0.7
+            # Estrutura de dados que o Ollama espera
+            data = {
+                "model": "llama3:8b", # O modelo que baixamos
+                "prompt": prompt,
+                "stream": False,
+                "options": {
+                    "temperature": 0.7
+                }
             }
-        }
         
-        try:
-            # Envia a requisição para a sua máquina local
-            response = requests.post(url_ollama, json=data)
-            response_json = response.json()
+            try:
+                # Envia a requisição para a sua máquina local
+                response = requests.post(url_ollama, json=data)
+                response_json = response.json()
             
-            temas = response_json.get('response', '').strip().split('\n')
-            lista_de_temas_gerados.extend(temas)
+                temas = response_json.get('response', '').strip().split('\n')
+                lista_de_temas_gerados.extend(temas)
             
-            if (count + 1) % 50 == 0:
-                print(f"  ...lote {count + 1}/{len(lotes)} processado.")
+                if (count + 1) % 50 == 0:
+                    print(f"  ...lote {count + 1}/{len(lotes)} processado.")
 
-        except requests.exceptions.ConnectionError:
-            print("ERRO DE CONEXÃO: O Ollama não está rodando. Inicie o Ollama e tente novamente.")
-            exit()
-        except Exception as e:
-            print(f"  Erro inesperado no lote {count + 1}: {e}. Pulando.")
-            time.sleep(1)
+            except requests.exceptions.ConnectionError:
+                print("ERRO DE CONEXÃO: O Ollama não está rodando. Inicie o Ollama e tente novamente.")
+                exit()
+            except Exception as e:
+                print(f"  Erro inesperado no lote {count + 1}: {e}. Pulando.")
+                time.sleep(1)
 
-print(f"\n--- Geração de Temas Concluída ---")
-print(f"Total de temas gerados: {len(lista_de_temas_gerados)}")
+    print(f"\n--- Geração de Temas Concluída ---")
+    print(f"Total de temas gerados: {len(lista_de_temas_gerados)}")
 
-pd.DataFrame(lista_de_temas_gerados, columns=["tema"]).to_csv("temas_gerados_llmusic_local.csv", index=False)
+    salvar_tabela(pd.DataFrame(lista_de_temas_gerados, columns=["tema"]), ARQUIVO_TEMAS)
+    registro.registrar('temas_llmusic', ARQUIVO_TEMAS, 'rodar_llmusic', entradas_temas, parametros_temas)
 
 # --- 3. Etapa 2: Agrupamento de Temas (BERTopic) ---
 print("\n--- ETAPA 2: Agrupando temas com BERTopic ---")
 
+entradas_topicos = {'temas_llmusic': ARQUIVO_TEMAS, 'codigo': __file__}
+if registro.atualizado('topicos_llmusic', 'rodar_llmusic', entradas_topicos):
+    print("⏭️  Temas sem mudança desde a última execução. Tópicos já calculados:")
+    print(ler_tabela(ARQUIVO_TOPICOS))
+    exit()
+
 print("Carregando modelo de embedding...")
-embedding_model = SentenceTransformer("paraphrase-multilingual-MiniLM-L12-v2")
+# Backend, lote e processos configurados em servico_embeddings.py
+servico = ServicoEmbeddings(MODELO_EMBEDDING)
+embedding_model = servico.modelo
+# Temas repetidos (e os já vistos em execuções anteriores) saem do cache sem passar pelo encoder
+embeddings = embeddings_com_cache(lista_de_temas_gerados, servico, servico.nome, show_progress_bar=True)
+servico.fechar()
 
 print("Instanciando o modelo BERTopic...")
 topic_model_llmusic = BERTopic(
@@ -95,13 +131,14 @@ topic_model_llmusic = BERTopic(
 )
 
 print("Iniciando o treinamento do modelo nos temas gerados...")
-topics, probabilities = topic_model_llmusic.fit_transform(lista_de_temas_gerados)
+topics, probabilities = topic_model_llmusic.fit_transform(lista_de_temas_gerados, embeddings=embeddings)
 
 # --- 4. Visualizar os Resultados ---
 print("\n--- TÓPICOS ENCONTRADOS (Pipeline LLMusic - Local) ---")
 topic_info_llmusic = topic_model_llmusic.get_topic_info()
 print(topic_info_llmusic)
 
-topic_info_llmusic.to_csv("resultados_llmusic_pipeline_local.csv", index=False)
+salvar_tabela(topic_info_llmusic, ARQUIVO_TOPICOS)
+registro.registrar('topicos_llmusic', ARQUIVO_TOPICOS, 'rodar_llmusic', entradas_topicos)
 
 print("\n--- Script Concluído ---")
\ No newline at end of file
@@ -0,0 +1,133 @@
+# ================================================================================
+# CACHE PERSISTENTE DE EMBEDDINGS
+# Vetores em .npy (memory-mapped) indexados pelo hash de (modelo, texto normalizado)
+# ================================================================================
+
+import glob
+import hashlib
+import os
+import re
+import unicodedata
+
+import numpy as np
+
+RAIZ_PROJETO = os.path.dirname(os.path.abspath(__file__))
+PASTA_CACHE_PADRAO = os.path.join(RAIZ_PROJETO, "base_de_dados", "cache_embeddings")
+
+_ESPACOS = re.compile(r'\s+')
+
+def normalizar_texto(texto):
+    """Mesmo texto, mesma chave: Unicode NFC e espaços colapsados (maiúsculas e acentos ficam)."""
+    return _ESPACOS.sub(' ', unicodedata.normalize('NFC', str(texto))).strip()
+
+def chave_texto(modelo, texto):
+    """sha1 de (modelo, texto normalizado), 20 bytes."""
+    return hashlib.sha1(f"{modelo}\0{normalizar_texto(texto)}".encode('utf-8')).digest()
+
+def _nome_pasta(modelo):
+    return re.sub(r'[^\w.-]+', '_', modelo)
+
+class CacheEmbeddings:
+    """
+    Embeddings já calculados de um modelo, guardados em segmentos
+    `parte_NNNN.npy` (vetores) + `parte_NNNN_chaves.npy` (sha1 de cada linha).
+    Os segmentos são abertos com memory map: só as linhas usadas vão para a memória.
+    Textos novos viram um segmento novo; nada é reescrito.
+    """
+
+    def __init__(self, modelo, pasta=PASTA_CACHE_PADRAO, dtype='float32'):
+        self.modelo = modelo
+        self.pasta = os.path.join(pasta, _nome_pasta(modelo))
+        self.dtype = np.dtype(dtype)
+        os.makedirs(self.pasta, exist_ok=True)
+        self._segmentos = []   # vetores (memmap) de cada parte
+        self._indice = {}      # chave -> (segmento, linha)
+        for caminho_chaves in sorted(glob.glob(os.path.join(self.pasta, "parte_*_chaves.npy"))):
+            self._carregar_segmento(caminho_chaves.replace('_chaves.npy', '.npy'), caminho_chaves)
+
+    def __len__(self):
+        return len(self._indice)
+
+    @property
+    def dimensao(self):
+        return self._segmentos[0].shape[1] if self._segmentos else None
+
+    def _carregar_segmento(self, caminho_vetores, caminho_chaves):
+        if not os.path.exists(caminho_vetores):
+            return  # Segmento incompleto (gravação interrompida): ignorado
+        numero = len(self._segmentos)
+        self._segmentos.append(np.load(caminho_vetores, mmap_mode='r'))
+        for linha, chave in enumerate(np.load(caminho_chaves)):
+            self._indice.setdefault(chave.tobytes(), (numero, linha))
+
+    def _gravar_segmento(self, chaves, vetores):
+        existentes = glob.glob(os.path.join(self.pasta, "parte_*_chaves.npy"))
+        numero = max((int(os.path.basename(c)[6:10]) for c in existentes), default=0) + 1
+        base = os.path.join(self.pasta, f"parte_{numero:04d}")
+        # Vetores primeiro, chaves por último: o segmento só "existe" quando as chaves aparecem
+        for caminho, dados in ((base + '.npy', vetores.astype(self.dtype)),
+                               (base + '_chaves.npy', np.frombuffer(b''.join(chaves), dtype='S20'))):
+            temporario = caminho + '.tmp'
+            with open(temporario, 'wb') as f:
+                np.save(f, dados)
+            os.replace(temporario, caminho)
+        self._carregar_segmento(base + '.npy', base + '_chaves.npy')
+
+    def obter(self, textos, codificar):
+        """
+        Matriz (len(textos), dim) float32 na ordem de `textos`. Só os textos ainda
+        não vistos (sem repetição) passam por `codificar(lista) -> array`; o
+        resultado é gravado no cache antes de retornar.
+        """
+        chaves = [chave_texto(self.modelo, texto) for texto in textos]
+
+        faltantes = {}
+        for chave, texto in zip(chaves, textos):
+            if chave not in self._indice and chave not in faltantes:
+                faltantes[chave] = texto
+        if faltantes:
+            vetores = np.asarray(codificar(list(faltantes.values())))
+            self._gravar_segmento(list(faltantes), vetores)
+
+        if not chaves:
+            return np.empty((0, self.dimensao or 0), dtype=np.float32)
+        saida = np.empty((len(chaves), self.dimensao), dtype=np.float32)
+        posicoes = np.array([self._indice[chave] for chave in chaves])
+        for numero, segmento in enumerate(self._segmentos):
+            linhas = np.flatnonzero(posicoes[:, 0] == numero)
+            if len(linhas):
+                saida[linhas] = segmento[posicoes[linhas, 1]]
+        return saida
+
+    def compactar(self):
+        """Junta todos os segmentos num só (útil depois de muitas execuções pequenas)."""
+        if len(self._segmentos) <= 1:
+            return
+        chaves = list(self._indice)
+        vetores = np.empty((len(chaves), self.dimensao), dtype=self.dtype)
+        for i, chave in enumerate(chaves):
+            numero, linha = self._indice[chave]
+            vetores[i] = self._segmentos[numero][linha]
+        antigos = sorted(glob.glob(os.path.join(self.pasta, "parte_*.npy")))
+        # O segmento novo fica completo em disco (temporário + os.replace) antes de qualquer
+        # remoção: se parar no meio, sobram segmentos repetidos, nunca um cache incompleto
+        self._gravar_segmento(chaves, vetores)
+        self._segmentos, self._indice = [], {}  # Solta os memory maps antes de apagar os arquivos
+        # Chaves antes dos vetores: um segmento pela metade sem chaves é só ignorado na leitura
+        for caminho in sorted(antigos, key=lambda c: not c.endswith('_chaves.npy')):
+            os.remove(caminho)
+        for caminho_chaves in sorted(glob.glob(os.path.join(self.pasta, "parte_*_chaves.npy"))):
+            self._carregar_segmento(caminho_chaves.replace('_chaves.npy', '.npy'), caminho_chaves)
+
+def embeddings_com_cache(textos, modelo_embedding, nome_modelo, pasta=PASTA_CACHE_PADRAO, **opcoes_encode):
+    """
+    Embeddings de `textos` com o SentenceTransformer `modelo_embedding`, passando pelo
+    cache: só os textos novos são codificados. O resultado vai direto para
+    `BERTopic.fit_transform(textos, embeddings=...)`.
+    """
+    cache = CacheEmbeddings(nome_modelo, pasta)
+    total_antes = len(cache)
+    embeddings = cache.obter(textos, lambda novos: modelo_embedding.encode(novos, **opcoes_encode))
+    novos = len(cache) - total_antes
+    print(f"🧠 Embeddings: {len(textos) - novos} do cache, {novos} calculados ({nome_modelo})")
+    return embeddings
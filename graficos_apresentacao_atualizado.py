@@ -2,10 +2,14 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import os
 
-# Caminhos
-base_dir = r"G:\Meu Drive\Mestrado\KDD\Anotacoes de aula\Trabalho pratico\projeto_funk"
-arquivo_original = os.path.join(base_dir, "base_de_dados", "sertanejo_parcial_20251027_180724_pos600.csv")
-arquivo_trechos = os.path.join(base_dir, "pre_processamento", "musicas_por_trechos_20251116_110519.csv")
+from io_tabelas import ler_tabela
+from registro_artefatos import RegistroArtefatos
+
+# Caminhos, pelo registro de artefatos (trechos antes da limpeza; se ainda não gerados, os limpos)
+base_dir = os.path.dirname(os.path.abspath(__file__))  # Os gráficos ficam na raiz do projeto
+registro = RegistroArtefatos()
+arquivo_original = registro.caminho('musicas')
+arquivo_trechos = registro.caminho('trechos') or registro.caminho('trechos_limpos')
 
 print("="*70)
 print("📊 ANÁLISE COMPLETA DOS DADOS COLETADOS")
@@ -13,7 +17,7 @@ print("="*70)
 print()
 
 # Carregar dados originais
-df_original = pd.read_csv(arquivo_original)
+df_original = ler_tabela(arquivo_original, colunas=['artista', 'ano'])
 print("📂 ARQUIVO ORIGINAL (base_de_dados)")
 print("-"*70)
 print(f"   Total de músicas coletadas: {len(df_original)}")
@@ -22,7 +26,7 @@ print(f"   Período: {int(df_original['ano'].min())} - {int(df_original['ano'].m
 print()
 
 # Carregar dados processados
-df_trechos = pd.read_csv(arquivo_trechos)
+df_trechos = ler_tabela(arquivo_trechos, colunas=['tag_musica', 'ano'])
 print("📂 ARQUIVO PROCESSADO (pre_processamento)")
 print("-"*70)
 print(f"   Total de trechos gerados: {len(df_trechos):,}")
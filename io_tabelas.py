@@ -0,0 +1,128 @@
+# ================================================================================
+# LEITURA E GRAVAÇÃO DAS TABELAS DO PROJETO (CSV + ESPELHO PARQUET)
+# Tipos fixos por coluna, leitura só das colunas pedidas e cópia colunar em Parquet
+# ================================================================================
+
+import importlib.util
+import os
+
+import pandas as pd
+
+# Tipos das colunas conhecidas; as demais ficam como o pandas inferir
+TIPOS_COLUNAS = {
+    'artista': 'category',
+    'tag_musica': 'category',
+    'genero': 'category',
+    'fonte': 'category',
+    'ano': 'Int64',
+    'ranking_posicao': 'Int64',
+    'contagem_palavras': 'Int64',
+    'contagem_linhas': 'Int64',
+}
+
+# Colunas que o CSV guarda como float ("2019.0"), como o scraper sempre gravou
+COLUNAS_FLOAT_NO_CSV = ['ano']
+
+def parquet_disponivel():
+    """True se houver um motor Parquet instalado (pyarrow ou fastparquet)."""
+    return any(importlib.util.find_spec(motor) for motor in ('pyarrow', 'fastparquet'))
+
+def caminho_parquet(caminho_csv):
+    """Espelho Parquet de um CSV: mesmo nome, extensão .parquet."""
+    return os.path.splitext(caminho_csv)[0] + '.parquet'
+
+def _espelho_atualizado(caminho_csv):
+    espelho = caminho_parquet(caminho_csv)
+    if not os.path.exists(espelho):
+        return False
+    if not os.path.exists(caminho_csv):
+        return True
+    return os.path.getmtime(espelho) >= os.path.getmtime(caminho_csv)
+
+def tipar_colunas(df):
+    """Aplica TIPOS_COLUNAS às colunas presentes no DataFrame."""
+    tipos = {coluna: tipo for coluna, tipo in TIPOS_COLUNAS.items() if coluna in df.columns}
+    for coluna, tipo in tipos.items():
+        if tipo == 'Int64' and not pd.api.types.is_integer_dtype(df[coluna]):
+            # '2019.0' vira 2019; pd.to_numeric aceita float e vazio
+            df[coluna] = pd.to_numeric(df[coluna]).round().astype('Int64')
+        elif str(df[coluna].dtype) != tipo:
+            df[coluna] = df[coluna].astype(tipo)
+    return df
+
+def _ler_csv(caminho_csv, colunas=None):
+    tipos_csv = {coluna: tipo for coluna, tipo in TIPOS_COLUNAS.items() if tipo == 'category'}
+    df = pd.read_csv(caminho_csv, usecols=colunas, dtype=tipos_csv)
+    return tipar_colunas(df)
+
+def ler_tabela(caminho_csv, colunas=None):
+    """
+    Lê uma tabela do projeto pelo caminho do CSV. Se existir um espelho Parquet
+    atualizado (e um motor Parquet instalado), lê dele só as `colunas` pedidas;
+    senão lê o CSV (também só as `colunas`) com os mesmos tipos.
+    Ler nunca grava: o espelho nasce em salvar_tabela, atualizar_espelho ou
+    converter_para_parquet (para tabelas que vieram de fora).
+    """
+    if parquet_disponivel() and _espelho_atualizado(caminho_csv):
+        df = pd.read_parquet(caminho_parquet(caminho_csv), columns=colunas)
+        return tipar_colunas(df)
+    return _ler_csv(caminho_csv, colunas)
+
+def ler_tabela_em_lotes(caminho_csv, colunas=None, tamanho_lote=50_000, pular=0):
+    """
+    Lê a tabela em pedaços de até `tamanho_lote` linhas (gerador de DataFrames),
+    depois de pular as `pular` primeiras, para arquivos que não cabem na memória.
+    Usa o espelho Parquet só se ele já estiver atualizado (criá-lo leria tudo de uma vez).
+    """
+    if importlib.util.find_spec('pyarrow') and _espelho_atualizado(caminho_csv):
+        import pyarrow.parquet as pq
+        for lote in pq.ParquetFile(caminho_parquet(caminho_csv)).iter_batches(batch_size=tamanho_lote, columns=colunas):
+            if pular >= lote.num_rows:
+                pular -= lote.num_rows
+                continue
+            yield tipar_colunas(lote.slice(pular).to_pandas())
+            pular = 0
+        return
+
+    # `pular` conta registros, não linhas físicas (um campo entre aspas pode ter \n):
+    # os pedaços são lidos e descartados inteiros, como no ramo Parquet
+    tipos_csv = {coluna: tipo for coluna, tipo in TIPOS_COLUNAS.items() if tipo == 'category'}
+    for df in pd.read_csv(caminho_csv, usecols=colunas, dtype=tipos_csv, chunksize=tamanho_lote):
+        if pular >= len(df):
+            pular -= len(df)
+            continue
+        yield tipar_colunas(df.iloc[pular:].copy() if pular else df)
+        pular = 0
+
+def converter_para_parquet(caminho_csv):
+    """Grava (ou regrava) o espelho Parquet de um CSV. Retorna o caminho do espelho."""
+    df = _ler_csv(caminho_csv)
+    espelho = caminho_parquet(caminho_csv)
+    df.to_parquet(espelho, index=False)
+    return espelho
+
+def atualizar_espelho(caminho_csv):
+    """
+    Para CSVs gravados fora de `salvar_tabela` (em fluxo): regrava o espelho Parquet
+    ou, sem motor Parquet, apaga o espelho antigo para ninguém ler dados velhos.
+    """
+    if parquet_disponivel():
+        return converter_para_parquet(caminho_csv)
+    if os.path.exists(caminho_parquet(caminho_csv)):
+        os.remove(caminho_parquet(caminho_csv))
+    return None
+
+def salvar_tabela(df, caminho_csv):
+    """
+    Grava o CSV (formato de troca, com `ano` como float igual ao scraper) e,
+    se houver motor Parquet, o espelho colunar tipado ao lado dele.
+    """
+    df_csv = df.copy(deep=False)
+    for coluna in COLUNAS_FLOAT_NO_CSV:
+        if coluna in df_csv.columns:
+            df_csv[coluna] = pd.to_numeric(df_csv[coluna]).astype('float64')
+    df_csv.to_csv(caminho_csv, index=False, encoding='utf-8')
+
+    if parquet_disponivel():
+        tipar_colunas(df.copy(deep=False)).to_parquet(caminho_parquet(caminho_csv), index=False)
+    return caminho_csv
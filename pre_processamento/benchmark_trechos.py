@@ -0,0 +1,227 @@
+import pandas as pd
+import contextlib
+import filecmp
+import hashlib
+import io
+import os
+import random
+import re
+import tempfile
+import time
+
+from limpar_trechos_duplicados import limpar_trechos_duplicados, renumerar_trechos
+from pipeline_trechos import pipeline_trechos
+from processar_trechos import processar_letras_em_trechos, quebrar_em_trechos
+
+ARQUIVO_BASE = os.path.join("..", "base_de_dados", "sertanejo_parcial_20251027_180724_pos600.csv")
+TAMANHO_CORPUS_SINTETICO = 100_000
+MUSICAS_POR_BLOCO = 10_000     # O loop antigo monta um dict por verso: em blocos para caber na memória
+MUSICAS_RENUMERACAO = [557, 2_000, 5_000]   # A renumeração antiga é quadrática: tamanhos menores
+ARQUIVO_LIMPO_REFERENCIA = "musicas_por_trechos_limpo_20251116_112423.csv"
+
+
+def quebrar_em_trechos_antigo(df_original):
+    """Cópia do loop original (iterrows + re.split por música), usada como referência."""
+    dados_processados = []
+    for idx, row in df_original.iterrows():
+        tag_musica = f"musica{idx + 1}"
+        letra_completa = str(row['letra']) if pd.notna(row['letra']) else ""
+        if '\n' in letra_completa:
+            versos = [verso.strip() for verso in letra_completa.split('\n') if verso.strip()]
+        else:
+            versos_raw = re.split(r'(?<=\s)(?=[A-ZÁÀÂÃÉÈÊÍÏÓÔÕÖÚÇÑ])', letra_completa)
+            versos = [verso.strip() for verso in versos_raw if verso.strip()]
+        if not versos:
+            versos = [letra_completa]
+        for num_verso, verso in enumerate(versos, start=1):
+            dados_processados.append({
+                'ranking_posicao': row['ranking_posicao'] if pd.notna(row['ranking_posicao']) else None,
+                'titulo': row['titulo'],
+                'tag_musica': tag_musica,
+                'tag_trecho': f"{tag_musica}_trecho{num_verso}",
+                'letra': verso,
+                'artista': row['artista'],
+                'ano': row['ano'] if pd.notna(row['ano']) else None,
+                'contagem_palavras': len(verso.split())
+            })
+    return pd.DataFrame(dados_processados)
+
+
+def corpus_sintetico(df_base, tamanho, semente=42):
+    """
+    Sorteia músicas da base até `tamanho` linhas. Parte das letras ganha \\n entre
+    os versos (formato da coleta nova) e algumas ficam vazias ou só com espaços,
+    para cobrir os três caminhos da quebra.
+    """
+    rng = random.Random(semente)
+    df = df_base.sample(n=tamanho, replace=True, random_state=semente).reset_index(drop=True)
+    letras = df['letra'].tolist()
+    for i, letra in enumerate(letras):
+        sorteio = rng.random()
+        if not isinstance(letra, str):
+            continue
+        if sorteio < 0.3:
+            letras[i] = re.sub(r'\s(?=[A-ZÁÉÍÓÚÇ])', '\n', letra)
+        elif sorteio < 0.31:
+            letras[i] = rng.choice([None, '', '   '])
+    df['letra'] = letras
+    df['ranking_posicao'] = range(1, tamanho + 1)
+    return df
+
+
+def hash_csv(partes):
+    """sha256 do CSV que as partes formariam juntas (cabeçalho só na primeira)."""
+    h = hashlib.sha256()
+    for i, parte in enumerate(partes):
+        h.update(parte.to_csv(index=False, header=(i == 0)).encode('utf-8'))
+    return h.hexdigest()
+
+
+def fatias(df, tamanho):
+    return [df.iloc[i:i + tamanho] for i in range(0, max(len(df), 1), tamanho)]
+
+
+def comparar(nome, df, repeticoes=1):
+    """Roda as duas versões (a antiga em blocos, preservando o índice) e compara os CSVs."""
+    melhor_antigo, melhor_novo = float('inf'), float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        antigo = [quebrar_em_trechos_antigo(bloco) for bloco in fatias(df, MUSICAS_POR_BLOCO)]
+        melhor_antigo = min(melhor_antigo, time.perf_counter() - inicio)
+        hash_antigo = hash_csv(antigo)
+        del antigo
+
+        inicio = time.perf_counter()
+        novo = quebrar_em_trechos(df)
+        melhor_novo = min(melhor_novo, time.perf_counter() - inicio)
+    identico = hash_antigo == hash_csv(fatias(novo, 500_000))
+
+    print(f"\n📊 {nome}: {len(df):,} músicas -> {len(novo):,} trechos")
+    print(f"   iterrows (antigo):  {melhor_antigo:8.3f} s")
+    print(f"   vetorizado (novo):  {melhor_novo:8.3f} s   ({melhor_antigo / melhor_novo:.1f}x)")
+    print(f"   CSV idêntico: {'✅ sim' if identico else '❌ NÃO'}")
+    return identico
+
+
+def renumerar_trechos_antigo(df_limpo):
+    """Cópia da renumeração original (um filtro do DataFrame inteiro por música)."""
+    df_limpo = df_limpo.sort_values(['tag_musica', 'tag_trecho']).reset_index(drop=True)
+    nova_tag_trecho = []
+    for musica in df_limpo['tag_musica'].unique():
+        indices = df_limpo[df_limpo['tag_musica'] == musica].index
+        for i, idx in enumerate(indices, start=1):
+            nova_tag_trecho.append(f"{musica}_trecho{i}")
+    df_limpo['tag_trecho'] = nova_tag_trecho
+    return df_limpo
+
+
+def comparar_renumeracao(df_base):
+    print(f"\n🔢 Renumeração dos trechos (após drop_duplicates):")
+    print(f"   {'músicas':>8} {'trechos':>10} {'antigo':>9} {'novo':>9}")
+    ok = True
+    for tamanho in MUSICAS_RENUMERACAO:
+        df = df_base if tamanho == len(df_base) else corpus_sintetico(df_base, tamanho)
+        trechos = quebrar_em_trechos(df).drop_duplicates(subset=['tag_musica', 'letra'], keep='first')
+        tempo_antigo, antigo = medir(renumerar_trechos_antigo, trechos)
+        tempo_novo, novo = medir(renumerar_trechos, trechos)
+        ok &= antigo.to_csv(index=False) == novo.to_csv(index=False)
+        print(f"   {tamanho:>8,} {len(trechos):>10,} {tempo_antigo:>8.3f}s {tempo_novo:>8.3f}s"
+              f"   ({tempo_antigo / tempo_novo:.0f}x)")
+    print(f"   CSV idêntico: {'✅ sim' if ok else '❌ NÃO'}")
+    return ok
+
+
+def conferir_cadeia_completa():
+    """
+    Teste de regressão: processar_trechos + limpar_trechos_duplicados sobre a base
+    real precisam reproduzir byte a byte o CSV limpo versionado no repositório.
+    """
+    with tempfile.TemporaryDirectory() as pasta:
+        with contextlib.redirect_stdout(io.StringIO()):
+            _, arquivo_trechos = processar_letras_em_trechos(ARQUIVO_BASE, pasta)
+            _, arquivo_limpo = limpar_trechos_duplicados(arquivo_trechos, pasta)
+        identico = filecmp.cmp(arquivo_limpo, ARQUIVO_LIMPO_REFERENCIA, shallow=False)
+    print(f"\n🧪 Cadeia completa vs {ARQUIVO_LIMPO_REFERENCIA}: {'✅ idêntico' if identico else '❌ DIFERENTE'}")
+    return identico
+
+
+def trechos_limpos_em_ordem_natural(df):
+    """O que o pipeline deve gravar: quebra + drop_duplicates, numerando na ordem da letra."""
+    limpo = quebrar_em_trechos(df).drop_duplicates(subset=['tag_musica', 'letra'], keep='first')
+    num_trecho = limpo.groupby('tag_musica', sort=False).cumcount() + 1
+    return limpo.assign(tag_trecho=limpo['tag_musica'] + '_trecho' + num_trecho.astype(str))
+
+
+def comparar_pipeline(nome, df):
+    """Tempo da cadeia em dois scripts (com o CSV intermediário) vs o pipeline em uma passada."""
+    with tempfile.TemporaryDirectory() as pasta:
+        arquivo_musicas = os.path.join(pasta, "musicas.csv")
+        df.to_csv(arquivo_musicas, index=False)
+        with contextlib.redirect_stdout(io.StringIO()):
+            inicio = time.perf_counter()
+            _, arquivo_trechos = processar_letras_em_trechos(arquivo_musicas, pasta)
+            limpar_trechos_duplicados(arquivo_trechos, pasta)
+            tempo_cadeia = time.perf_counter() - inicio
+            os.makedirs(os.path.join(pasta, "pipeline"))
+            inicio = time.perf_counter()
+            arquivo_pipeline = pipeline_trechos(arquivo_musicas, os.path.join(pasta, "pipeline"))
+            tempo_pipeline = time.perf_counter() - inicio
+        with open(arquivo_pipeline, 'rb') as f:
+            identico = hash_csv([trechos_limpos_em_ordem_natural(df)]) == hashlib.sha256(f.read()).hexdigest()
+
+    print(f"\n🚀 Pipeline em uma passada - {nome}: {len(df):,} músicas")
+    print(f"   processar + limpar (2 CSVs): {tempo_cadeia:8.3f} s")
+    print(f"   pipeline_trechos:            {tempo_pipeline:8.3f} s   ({tempo_cadeia / tempo_pipeline:.1f}x)")
+    print(f"   CSV igual à quebra + limpeza em ordem natural: {'✅ sim' if identico else '❌ NÃO'}")
+    return identico
+
+
+def conferir_pipeline_com_referencia():
+    """
+    O pipeline numera os trechos na ordem da letra; o CSV versionado, na ordem
+    textual das tags. Fora tag_trecho e a ordem das linhas, o conteúdo tem que ser o mesmo.
+    """
+    with tempfile.TemporaryDirectory() as pasta:
+        with contextlib.redirect_stdout(io.StringIO()):
+            arquivo_pipeline = pipeline_trechos(ARQUIVO_BASE, pasta)
+        pipeline = pd.read_csv(arquivo_pipeline)
+    referencia = pd.read_csv(ARQUIVO_LIMPO_REFERENCIA)
+    colunas = [c for c in referencia.columns if c != 'tag_trecho']
+    ordenar = lambda d: d[colunas].sort_values(colunas).to_csv(index=False)
+    identico = len(pipeline) == len(referencia) and ordenar(pipeline) == ordenar(referencia)
+    print(f"🧪 Pipeline vs {ARQUIVO_LIMPO_REFERENCIA} (sem tag_trecho): {'✅ mesmo conteúdo' if identico else '❌ DIFERENTE'}")
+    return identico
+
+
+def medir(funcao, df):
+    inicio = time.perf_counter()
+    resultado = funcao(df)
+    return time.perf_counter() - inicio, resultado
+
+
+def main():
+    print("="*70)
+    print("⏱️  BENCHMARK DO PRÉ-PROCESSAMENTO DE TRECHOS")
+    print("="*70)
+
+    if not os.path.exists(ARQUIVO_BASE):
+        print(f"❌ Erro: Arquivo não encontrado: {ARQUIVO_BASE}")
+        return
+
+    df_base = pd.read_csv(ARQUIVO_BASE)
+    ok = comparar("Base real", df_base, repeticoes=3)
+    ok &= comparar("Corpus sintético", corpus_sintetico(df_base, TAMANHO_CORPUS_SINTETICO))
+    ok &= comparar_renumeracao(df_base)
+    if os.path.exists(ARQUIVO_LIMPO_REFERENCIA):
+        ok &= conferir_cadeia_completa()
+        ok &= conferir_pipeline_com_referencia()
+    ok &= comparar_pipeline("Base real", df_base)
+    ok &= comparar_pipeline("Corpus sintético", corpus_sintetico(df_base, TAMANHO_CORPUS_SINTETICO))
+
+    print()
+    print("✅ Saídas idênticas em todos os casos" if ok else "❌ Saídas diferentes!")
+    print("="*70)
+
+
+if __name__ == "__main__":
+    main()
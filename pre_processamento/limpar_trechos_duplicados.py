@@ -1,7 +1,27 @@
 import pandas as pd
 import os
+import sys
 from datetime import datetime
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from io_tabelas import ler_tabela, salvar_tabela
+
+def renumerar_trechos(df_limpo):
+    """
+    Renumera as tags dos trechos para ficarem sequenciais dentro de cada música
+    (musica1_trecho1, musica1_trecho2, ...), na ordem de tag_musica e tag_trecho.
+    """
+    # Tags como texto: a ordenação é a textual (musica10 antes de musica2), igual à original
+    df_limpo = df_limpo.astype({'tag_musica': str, 'tag_trecho': str})
+    df_limpo = df_limpo.sort_values(['tag_musica', 'tag_trecho']).reset_index(drop=True)
+    
+    # Posição de cada trecho dentro da sua música, numa única passada
+    num_trecho = df_limpo.groupby('tag_musica', sort=False).cumcount() + 1
+    df_limpo['tag_trecho'] = df_limpo['tag_musica'] + '_trecho' + num_trecho.astype(str)
+    
+    return df_limpo
+
+
 def limpar_trechos_duplicados(arquivo_entrada, pasta_saida):
     """
     Remove trechos duplicados dentro de cada música.
@@ -17,7 +37,7 @@ def limpar_trechos_duplicados(arquivo_entrada, pasta_saida):
     
     # Carregar dados
     print("📖 Carregando dados...")
-    df = pd.read_csv(arquivo_entrada)
+    df = ler_tabela(arquivo_entrada)
     print(f"✅ Carregado: {len(df):,} trechos de {df['tag_musica'].nunique()} músicas")
     print()
     
@@ -44,17 +64,7 @@ def limpar_trechos_duplicados(arquivo_entrada, pasta_saida):
     # Renumerar as tags dos trechos para ficarem sequenciais
     print("🔄 Renumerando tags dos trechos...")
     
-    # Criar nova coluna com numeração sequencial por música
-    df_limpo = df_limpo.sort_values(['tag_musica', 'tag_trecho']).reset_index(drop=True)
-    
-    # Renumerar dentro de cada música
-    nova_tag_trecho = []
-    for musica in df_limpo['tag_musica'].unique():
-        indices = df_limpo[df_limpo['tag_musica'] == musica].index
-        for i, idx in enumerate(indices, start=1):
-            nova_tag_trecho.append(f"{musica}_trecho{i}")
-    
-    df_limpo['tag_trecho'] = nova_tag_trecho
+    df_limpo = renumerar_trechos(df_limpo)
     
     print(f"✅ Tags renumeradas sequencialmente!")
     print()
@@ -76,10 +86,10 @@ def limpar_trechos_duplicados(arquivo_entrada, pasta_saida):
         print(f"   Músicas sem duplicatas: {df['tag_musica'].nunique() - len(musicas_com_duplicatas)}")
         print()
         print("   Top 10 músicas com mais duplicatas removidas:")
+        # Título e artista de cada música (primeira linha dela), consultados pela tag
+        info_musicas = df.drop_duplicates('tag_musica').set_index('tag_musica')[['titulo', 'artista']]
         for i, (tag_musica, qtd_removida) in enumerate(musicas_com_duplicatas.head(10).items(), 1):
-            # Pegar o título da música
-            titulo = df[df['tag_musica'] == tag_musica]['titulo'].iloc[0]
-            artista = df[df['tag_musica'] == tag_musica]['artista'].iloc[0]
+            titulo, artista = info_musicas.loc[tag_musica]
             antes = trechos_antes[tag_musica]
             depois = trechos_depois.get(tag_musica, 0)
             print(f"      {i:2d}. {titulo[:40]:40s} ({artista[:20]:20s})")
@@ -95,7 +105,7 @@ def limpar_trechos_duplicados(arquivo_entrada, pasta_saida):
     
     # Salvar arquivo
     print(f"💾 Salvando arquivo limpo...")
-    df_limpo.to_csv(arquivo_saida, index=False, encoding='utf-8')
+    salvar_tabela(df_limpo, arquivo_saida)
     print(f"✅ Arquivo salvo: {os.path.basename(arquivo_saida)}")
     print()
     
@@ -116,34 +126,14 @@ def limpar_trechos_duplicados(arquivo_entrada, pasta_saida):
 
 
 def main():
-    """Função principal para executar a limpeza."""
-    
-    # Definir caminhos
-    base_dir = r"G:\Meu Drive\Mestrado\KDD\Anotacoes de aula\Trabalho pratico\projeto_funk"
-    pasta_pre_processamento = os.path.join(base_dir, "pre_processamento")
-    
-    # Encontrar o arquivo mais recente de trechos (não limpo)
-    import glob
-    arquivos_trechos = glob.glob(os.path.join(pasta_pre_processamento, "musicas_por_trechos_2*.csv"))
-    
-    # Filtrar apenas os arquivos que NÃO são limpos
-    arquivos_trechos = [f for f in arquivos_trechos if 'limpo' not in f]
-    
-    if not arquivos_trechos:
-        print("❌ Erro: Nenhum arquivo de trechos encontrado!")
-        return
-    
-    # Pegar o arquivo mais recente
-    arquivo_entrada = max(arquivos_trechos, key=os.path.getmtime)
-    
-    # Processar
-    df_resultado, arquivo_saida = limpar_trechos_duplicados(arquivo_entrada, pasta_pre_processamento)
-    
-    # Mostrar exemplo de trechos após limpeza
-    print("\n📝 EXEMPLO DOS PRIMEIROS TRECHOS (APÓS LIMPEZA):")
-    print("="*70)
-    print(df_resultado[['tag_musica', 'tag_trecho', 'titulo', 'artista', 'letra']].head(15).to_string(index=False))
-    print("="*70)
+    """
+    Único produtor do artefato 'trechos_limpos' é o pipeline_trechos.py (a numeração
+    dos trechos depende de quem gera o arquivo). A limpeza acima fica só como
+    referência para benchmark_trechos.
+    """
+    from pipeline_trechos import main as main_pipeline
+    print("ℹ️  processar_trechos + limpar_trechos_duplicados foram substituídos por pipeline_trechos.py")
+    main_pipeline()
 
 
 if __name__ == "__main__":
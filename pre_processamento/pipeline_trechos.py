@@ -0,0 +1,156 @@
+import csv
+import os
+import sys
+from datetime import datetime
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from io_tabelas import atualizar_espelho, ler_tabela_em_lotes
+from processar_trechos import PADRAO_INICIO_VERSO, COLUNAS_TRECHOS
+from registro_artefatos import RegistroArtefatos
+
+
+def versos_da_letra(letra_completa):
+    """
+    Mesma quebra de processar_trechos, para uma música:
+    por \n quando existir, senão antes de cada maiúscula que vem após um espaço.
+    """
+    if '\n' in letra_completa:
+        versos_raw = letra_completa.split('\n')
+    else:
+        versos_raw = PADRAO_INICIO_VERSO.split(letra_completa)
+    versos = [verso.strip() for verso in versos_raw if verso.strip()]
+    # Se mesmo assim não conseguiu quebrar, usar toda a letra como um verso
+    return versos or [letra_completa]
+
+
+def _texto(valor):
+    return '' if pd.isna(valor) else str(valor)
+
+
+def _inteiro(valor):
+    return '' if pd.isna(valor) else int(valor)
+
+
+def _float(valor):
+    # Mesmo formato que salvar_tabela grava para a coluna ano ("2019.0")
+    return '' if pd.isna(valor) else repr(float(valor))
+
+
+def pipeline_trechos(arquivo_entrada, pasta_saida):
+    """
+    Das músicas coletadas direto para o CSV de trechos limpo, numa única passada:
+    quebra cada letra em versos, descarta os versos repetidos dentro da música e
+    numera os que sobram. A entrada é lida em lotes (io_tabelas, mesmos tipos das
+    outras etapas) e a saída gravada em fluxo; o espelho Parquet é refeito no fim.
+
+    Os trechos de cada música saem na ordem da letra (trecho1, trecho2, ..., trecho10),
+    e as músicas na ordem do arquivo de entrada. O conjunto de (tag_musica, letra) é o
+    mesmo de processar_trechos + limpar_trechos_duplicados, que ordenavam as tags como
+    texto (musica10 antes de musica2, trecho10 antes de trecho2).
+    """
+
+    print("="*70)
+    print("🎵 PIPELINE DE TRECHOS (QUEBRA + LIMPEZA EM UMA PASSADA)")
+    print("="*70)
+    print(f"📂 Arquivo de entrada: {os.path.basename(arquivo_entrada)}")
+    print(f"📁 Pasta de saída: {pasta_saida}")
+    print()
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    arquivo_saida = os.path.join(pasta_saida, f"musicas_por_trechos_limpo_{timestamp}.csv")
+
+    total_musicas = 0
+    total_versos = 0
+    total_trechos = 0
+    musicas_com_duplicatas = 0
+    artistas = set()
+
+    print("🔄 Quebrando letras e removendo trechos duplicados...")
+    colunas = ['ranking_posicao', 'titulo', 'letra', 'artista', 'ano']
+    with open(arquivo_saida, 'w', newline='', encoding='utf-8') as saida:
+        escritor = csv.writer(saida, lineterminator='\n')
+        escritor.writerow(COLUNAS_TRECHOS)
+
+        num_musica = 0
+        for df in ler_tabela_em_lotes(arquivo_entrada, colunas=colunas):
+            for posicao, titulo, letra, artista, ano in zip(*(df[coluna] for coluna in colunas)):
+                num_musica += 1
+                tag_musica = f"musica{num_musica}"
+                versos = versos_da_letra(_texto(letra))
+
+                # Primeira ocorrência de cada verso; dict.fromkeys preserva a ordem da letra
+                unicos = list(dict.fromkeys(versos))
+
+                ranking_posicao = _inteiro(posicao)
+                ano = _float(ano)
+                titulo, artista = _texto(titulo), _texto(artista)
+                for num_verso, verso in enumerate(unicos, start=1):
+                    escritor.writerow([
+                        ranking_posicao, titulo, tag_musica, f"{tag_musica}_trecho{num_verso}",
+                        verso, artista, ano, len(verso.split())
+                    ])
+
+                total_musicas += 1
+                total_versos += len(versos)
+                total_trechos += len(unicos)
+                musicas_com_duplicatas += len(unicos) < len(versos)
+                if artista:
+                    artistas.add(artista)
+
+                if num_musica % 500 == 0:
+                    print(f"   Processadas {num_musica} músicas - {total_trechos} trechos gravados")
+
+    # O CSV foi gravado em fluxo, fora de salvar_tabela: o espelho Parquet tem de acompanhar
+    atualizar_espelho(arquivo_saida)
+
+    if total_musicas == 0:
+        print("❌ Nenhuma música no arquivo de entrada!")
+        return arquivo_saida
+
+    removidos = total_versos - total_trechos
+    print(f"✅ Processamento concluído!")
+    print(f"   📊 Total de músicas processadas: {total_musicas}")
+    print(f"   📝 Trechos antes da limpeza: {total_versos:,}")
+    print(f"   📊 Trechos únicos gravados: {total_trechos:,}")
+    print(f"   🗑️  Trechos removidos: {removidos:,} ({removidos/max(total_versos, 1)*100:.1f}%)")
+    print(f"   🎤 Músicas com duplicatas: {musicas_com_duplicatas}")
+    print()
+
+    print("="*70)
+    print("📊 RESUMO FINAL")
+    print("="*70)
+    print(f"Total de trechos únicos: {total_trechos:,}")
+    print(f"Total de músicas: {total_musicas}")
+    print(f"Total de artistas: {len(artistas)}")
+    print(f"Média de trechos por música: {total_trechos/total_musicas:.1f}")
+    print()
+    print(f"✅ Processamento finalizado com sucesso!")
+    print(f"📂 Arquivo disponível em: {arquivo_saida}")
+    print("="*70)
+
+    return arquivo_saida
+
+
+def main():
+    """Função principal para executar o pipeline."""
+
+    # Entrada e saída pelo registro de artefatos: o resultado substitui o 'trechos_limpos' atual
+    registro = RegistroArtefatos()
+    arquivo_entrada = registro.caminho('musicas')
+    pasta_saida = os.path.dirname(os.path.abspath(__file__))
+
+    if not arquivo_entrada or not os.path.exists(arquivo_entrada):
+        print(f"❌ Erro: Base de músicas não encontrada no registro: {arquivo_entrada}")
+        return
+
+    registro.executar(
+        'trechos_limpos', 'pipeline_trechos',
+        lambda: pipeline_trechos(arquivo_entrada, pasta_saida),
+        entradas={'musicas': arquivo_entrada, 'codigo': __file__}
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,61 @@
+import numpy as np
 import pandas as pd
 import os
+import re
+import sys
 from datetime import datetime
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from io_tabelas import ler_tabela, salvar_tabela
+
+# Quebra antes de cada letra maiúscula que vem após um espaço (início de um novo verso).
+# A maiúscula fica no início do novo verso.
+PADRAO_INICIO_VERSO = re.compile(r'(?<=\s)(?=[A-ZÁÀÂÃÉÈÊÍÏÓÔÕÖÚÇÑ])')
+
+COLUNAS_TRECHOS = ['ranking_posicao', 'titulo', 'tag_musica', 'tag_trecho', 'letra', 'artista', 'ano', 'contagem_palavras']
+
+def quebrar_em_trechos(df_original):
+    """
+    Quebra as letras de todas as músicas em versos, um trecho por linha.
+    1. Letras com \n são quebradas pelas quebras de linha explícitas
+    2. Sem \n, quebra antes de cada maiúscula que vem após um espaço
+    Versos vazios são descartados; se não sobrar nenhum, a letra inteira vira um trecho.
+    """
+    letras = df_original['letra'].fillna('').astype(str)
+    tem_quebra = letras.str.contains('\n', regex=False)
+    
+    # Uma lista de versos por música, na ordem original
+    versos = pd.concat([
+        letras[tem_quebra].str.split('\n', regex=False),
+        letras[~tem_quebra].str.split(PADRAO_INICIO_VERSO),
+    ]).sort_index(kind='stable')
+    
+    # Uma linha por verso (o índice continua sendo o da música)
+    versos = versos.explode().str.strip()
+    versos = versos[versos.str.len() > 0]
+    
+    # Músicas sem nenhum verso: a letra inteira como um verso
+    sem_versos = letras.index.difference(versos.index)
+    if len(sem_versos) > 0:
+        versos = pd.concat([versos, letras.loc[sem_versos]]).sort_index(kind='stable')
+    
+    indice = versos.index
+    num_musica = pd.Series(indice + 1, index=indice).astype(str)
+    num_verso = (versos.groupby(level=0).cumcount() + 1).astype(str)
+    tag_musica = 'musica' + num_musica  # Tag no formato musica1, musica2, etc
+    
+    # len(verso.split()) direto no array: mais rápido que str.split().str.len(), sem criar as listas no pandas
+    contagem_palavras = np.fromiter(map(len, map(str.split, versos.to_numpy())), dtype=np.int64, count=len(versos))
+    
+    # Colunas da música repetidas em cada trecho, mantendo os tipos (categoria, Int64)
+    df_trechos = df_original.loc[indice, ['ranking_posicao', 'titulo', 'artista', 'ano']].reset_index(drop=True)
+    df_trechos['tag_musica'] = tag_musica.to_numpy()
+    df_trechos['tag_trecho'] = (tag_musica + '_trecho' + num_verso).to_numpy()
+    df_trechos['letra'] = versos.to_numpy()  # O trecho/verso
+    df_trechos['contagem_palavras'] = contagem_palavras
+    
+    return df_trechos[COLUNAS_TRECHOS]
+
 def processar_letras_em_trechos(arquivo_entrada, pasta_saida):
     """
     Processa o arquivo de músicas e cria uma nova tabela com os trechos das letras.
@@ -17,70 +71,14 @@ def processar_letras_em_trechos(arquivo_entrada, pasta_saida):
     
     # Carregar dados originais
     print("📖 Carregando dados originais...")
-    df_original = pd.read_csv(arquivo_entrada)
+    df_original = ler_tabela(arquivo_entrada, colunas=['ranking_posicao', 'titulo', 'letra', 'artista', 'ano'])
     print(f"✅ Carregado: {len(df_original)} músicas")
     print()
     
-    # Lista para armazenar os novos dados
-    dados_processados = []
-    
-    # Processar cada música
+    # Quebrar todas as letras de uma vez (sem loop por música)
     print("🔄 Processando músicas e quebrando letras em trechos...")
-    total_trechos = 0
-    
-    for idx, row in df_original.iterrows():
-        num_musica = idx + 1  # Número da música (começa em 1)
-        tag_musica = f"musica{num_musica}"  # Tag no formato musica1, musica2, etc
-        
-        # Pegar a letra completa
-        letra_completa = str(row['letra']) if pd.notna(row['letra']) else ""
-        
-        # Quebrar a letra em versos usando estratégias inteligentes
-        # 1. Tentar quebrar por \n (quebras de linha explícitas)
-        if '\n' in letra_completa:
-            versos = [verso.strip() for verso in letra_completa.split('\n') if verso.strip()]
-        else:
-            # 2. Se não tem \n, quebrar quando encontrar letra maiúscula após espaço
-            # Isso indica o início de um novo verso
-            import re
-            
-            # Usar regex para quebrar antes de cada letra maiúscula que vem após um espaço
-            # Padrão: espaço seguido de letra maiúscula
-            # Mantém a maiúscula no início do novo verso
-            versos_raw = re.split(r'(?<=\s)(?=[A-ZÁÀÂÃÉÈÊÍÏÓÔÕÖÚÇÑ])', letra_completa)
-            
-            # Limpar espaços e filtrar versos vazios
-            versos = [verso.strip() for verso in versos_raw if verso.strip()]
-        
-        # Se mesmo assim não conseguiu quebrar, usar toda a letra como um verso
-        if not versos:
-            versos = [letra_completa]
-        
-        # Criar uma linha para cada verso
-        for num_verso, verso in enumerate(versos, start=1):
-            tag_trecho = f"{tag_musica}_trecho{num_verso}"
-            
-            # Contar palavras do trecho
-            contagem_palavras_trecho = len(verso.split())
-            
-            # Criar registro do trecho
-            trecho_data = {
-                'ranking_posicao': row['ranking_posicao'] if pd.notna(row['ranking_posicao']) else None,
-                'titulo': row['titulo'],
-                'tag_musica': tag_musica,
-                'tag_trecho': tag_trecho,
-                'letra': verso,  # O trecho/verso
-                'artista': row['artista'],
-                'ano': row['ano'] if pd.notna(row['ano']) else None,
-                'contagem_palavras': contagem_palavras_trecho
-            }
-            
-            dados_processados.append(trecho_data)
-            total_trechos += 1
-        
-        # Mostrar progresso a cada 50 músicas
-        if (idx + 1) % 50 == 0:
-            print(f"   Processadas {idx + 1}/{len(df_original)} músicas - {total_trechos} trechos gerados")
+    df_trechos = quebrar_em_trechos(df_original)
+    total_trechos = len(df_trechos)
     
     print(f"✅ Processamento concluído!")
     print(f"   📊 Total de músicas processadas: {len(df_original)}")
@@ -88,16 +86,13 @@ def processar_letras_em_trechos(arquivo_entrada, pasta_saida):
     print(f"   📈 Média de trechos por música: {total_trechos/len(df_original):.1f}")
     print()
     
-    # Criar DataFrame com os trechos
-    df_trechos = pd.DataFrame(dados_processados)
-    
     # Gerar nome do arquivo de saída
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     arquivo_saida = os.path.join(pasta_saida, f"musicas_por_trechos_{timestamp}.csv")
     
     # Salvar arquivo
     print(f"💾 Salvando arquivo processado...")
-    df_trechos.to_csv(arquivo_saida, index=False, encoding='utf-8')
+    salvar_tabela(df_trechos, arquivo_saida)
     print(f"✅ Arquivo salvo: {os.path.basename(arquivo_saida)}")
     print()
     
@@ -134,31 +129,14 @@ def processar_letras_em_trechos(arquivo_entrada, pasta_saida):
 
 
 def main():
-    """Função principal para executar o processamento."""
-    
-    # Definir caminhos
-    base_dir = r"G:\Meu Drive\Mestrado\KDD\Anotacoes de aula\Trabalho pratico\projeto_funk"
-    arquivo_entrada = os.path.join(base_dir, "base_de_dados", "sertanejo_parcial_20251027_180724_pos600.csv")
-    pasta_saida = os.path.join(base_dir, "pre_processamento")
-    
-    # Verificar se o arquivo existe
-    if not os.path.exists(arquivo_entrada):
-        print(f"❌ Erro: Arquivo não encontrado: {arquivo_entrada}")
-        return
-    
-    # Verificar se a pasta de saída existe
-    if not os.path.exists(pasta_saida):
-        os.makedirs(pasta_saida)
-        print(f"📁 Pasta criada: {pasta_saida}")
-    
-    # Processar
-    df_resultado, arquivo_saida = processar_letras_em_trechos(arquivo_entrada, pasta_saida)
-    
-    # Mostrar exemplo dos primeiros trechos
-    print("\n📝 EXEMPLO DOS PRIMEIROS TRECHOS:")
-    print("="*70)
-    print(df_resultado[['tag_musica', 'tag_trecho', 'titulo', 'artista', 'letra']].head(10).to_string(index=False))
-    print("="*70)
+    """
+    Os trechos limpos saem do pipeline_trechos.py numa passada só; este script
+    não grava mais o CSV intermediário. A quebra acima continua aqui como
+    referência (usada por pipeline_trechos e por benchmark_trechos).
+    """
+    from pipeline_trechos import main as main_pipeline
+    print("ℹ️  processar_trechos + limpar_trechos_duplicados foram substituídos por pipeline_trechos.py")
+    main_pipeline()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,114 @@
+# ================================================================================
+# REGISTRO DE ARTEFATOS DO PIPELINE
+# Nome lógico -> arquivo atual, com o hash do conteúdo e as entradas/parâmetros da etapa
+# ================================================================================
+
+import hashlib
+import json
+import os
+
+RAIZ_PROJETO = os.path.dirname(os.path.abspath(__file__))
+CAMINHO_REGISTRO = os.path.join(RAIZ_PROJETO, "registro_artefatos.json")
+
+def hash_arquivo(caminho, tamanho_bloco=1 << 20):
+    """sha256 do conteúdo do arquivo, lido em blocos."""
+    h = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(tamanho_bloco), b''):
+            h.update(bloco)
+    return h.hexdigest()
+
+def _normalizar(parametros):
+    """Parâmetros como JSON puro (tuplas viram listas, o resto vira texto), para comparar com o gravado."""
+    return json.loads(json.dumps(parametros or {}, sort_keys=True, ensure_ascii=False, default=str))
+
+class RegistroArtefatos:
+    """
+    Registro dos artefatos do projeto (base coletada, trechos, tópicos...) num JSON
+    versionado. Cada artefato guarda o arquivo atual (relativo à raiz do projeto),
+    o sha256 dele e, da etapa que o gerou, o hash de cada entrada e os parâmetros.
+    Uma etapa cujas entradas e parâmetros não mudaram desde a última execução pode
+    ser pulada (como no make, mas comparando conteúdo em vez de data de modificação).
+    Só entra no JSON o que depende do conteúdo (nada de data/hora da execução):
+    rodar de novo uma etapa com o mesmo resultado não muda o arquivo versionado.
+    """
+
+    def __init__(self, caminho=CAMINHO_REGISTRO):
+        self.caminho_registro = caminho
+        self.raiz = os.path.dirname(os.path.abspath(caminho))
+        self.artefatos = {}
+        if os.path.exists(caminho):
+            with open(caminho, 'r', encoding='utf-8') as f:
+                self.artefatos = json.load(f).get('artefatos', {})
+        self._hashes = {}  # (caminho, tamanho, mtime) -> sha256, só durante a execução
+
+    def _relativo(self, caminho):
+        return os.path.relpath(os.path.abspath(caminho), self.raiz).replace(os.sep, '/')
+
+    def _absoluto(self, relativo):
+        return os.path.normpath(os.path.join(self.raiz, *relativo.split('/')))
+
+    def _hash(self, caminho):
+        info = os.stat(caminho)
+        chave = (os.path.abspath(caminho), info.st_size, info.st_mtime_ns)
+        if chave not in self._hashes:
+            self._hashes[chave] = hash_arquivo(caminho)
+        return self._hashes[chave]
+
+    def caminho(self, nome):
+        """Caminho absoluto do arquivo atual do artefato, ou None se não registrado."""
+        item = self.artefatos.get(nome)
+        return self._absoluto(item['arquivo']) if item else None
+
+    def _hashes_entradas(self, entradas):
+        return {rotulo: self._hash(caminho) for rotulo, caminho in sorted((entradas or {}).items())}
+
+    def atualizado(self, nome, etapa, entradas=None, parametros=None):
+        """
+        True se o artefato existe, não foi alterado desde o registro e foi gerado
+        pela mesma etapa a partir das mesmas entradas (mesmo conteúdo) e parâmetros.
+        """
+        item = self.artefatos.get(nome)
+        if not item or item.get('etapa') != etapa:
+            return False
+        arquivo = self._absoluto(item['arquivo'])
+        if not os.path.exists(arquivo) or self._hash(arquivo) != item['sha256']:
+            return False
+        if any(not os.path.exists(caminho) for caminho in (entradas or {}).values()):
+            return False
+        return (item.get('entradas') == self._hashes_entradas(entradas)
+                and item.get('parametros') == _normalizar(parametros))
+
+    def registrar(self, nome, caminho, etapa, entradas=None, parametros=None):
+        """Registra `caminho` como a versão atual do artefato `nome` e grava o JSON."""
+        self.artefatos[nome] = {
+            'arquivo': self._relativo(caminho),
+            'sha256': self._hash(caminho),
+            'etapa': etapa,
+            'entradas': self._hashes_entradas(entradas),
+            'parametros': _normalizar(parametros),
+        }
+        self.salvar()
+        return self.artefatos[nome]
+
+    def executar(self, nome, etapa, funcao, entradas=None, parametros=None):
+        """
+        Roda `funcao()` (que retorna o caminho do arquivo gerado) só se o artefato
+        não estiver atualizado; senão reaproveita o arquivo registrado.
+        Retorna o caminho do artefato.
+        """
+        if self.atualizado(nome, etapa, entradas, parametros):
+            print(f"⏭️  {etapa}: entradas e parâmetros sem mudança, reaproveitando '{nome}'")
+            print(f"   📂 {self.artefatos[nome]['arquivo']}")
+            return self.caminho(nome)
+        caminho = funcao()
+        self.registrar(nome, caminho, etapa, entradas, parametros)
+        print(f"📒 Artefato '{nome}' registrado: {self.artefatos[nome]['arquivo']}")
+        return caminho
+
+    def salvar(self):
+        temporario = self.caminho_registro + '.tmp'
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump({'artefatos': self.artefatos}, f, ensure_ascii=False, indent=2, sort_keys=True)
+            f.write('\n')
+        os.replace(temporario, self.caminho_registro)
@@ -0,0 +1,155 @@
+# ================================================================================
+# AGENDADOR DE GÊNEROS
+# Coleta vários gêneros ao mesmo tempo, com limite de req/s e pool compartilhados
+# ================================================================================
+
+import asyncio
+import os
+import time
+
+from descoberta import DescobertaMusicas, paginas_iniciais_do_genero, nome_do_genero
+from escrita_incremental import SaidaParticionada
+from estado_coleta import DiarioColeta
+from limitador_taxa import LimitadorAdaptativo
+from sessao_http import obter_sessao
+from scraper_sertanejo import (
+    baixar_pagina, _abrir_saida, _filtrar_duplicatas, _coletar_letras_async, _finalizar_coleta, PASTA_SAIDA, PORTA_METRICAS
+)
+from metricas import iniciar_servidor_metricas
+
+GENEROS_PADRAO = ['sertanejo', 'funk']
+PASTA_GENEROS = os.path.join(PASTA_SAIDA, "generos")
+ITENS_EM_ESPERA_POR_GENERO = 8   # Músicas descobertas aguardando vaga, por gênero
+CONCORRENCIA_DESCOBERTA = 2      # Listagens baixadas em paralelo, por gênero
+
+async def intercalar_generos(fontes, tamanho_buffer=ITENS_EM_ESPERA_POR_GENERO):
+    """
+    Junta os geradores assíncronos de cada gênero numa fila justa: a cada
+    rodada sai no máximo uma música de cada gênero que tiver alguma pronta.
+    Um gênero lento não segura os outros, e nenhum domina a coleta.
+    Gera (genero, item).
+    """
+    filas = {genero: asyncio.Queue(maxsize=tamanho_buffer) for genero in fontes}
+    ativos = set(fontes)
+    novo_item = asyncio.Event()
+
+    async def bombear(genero, fonte):
+        try:
+            async for item in fonte:
+                await filas[genero].put(item)  # Fila cheia: a descoberta do gênero espera
+                novo_item.set()
+        finally:
+            ativos.discard(genero)
+            novo_item.set()
+
+    tarefas = [asyncio.ensure_future(bombear(genero, fonte)) for genero, fonte in fontes.items()]
+    try:
+        while True:
+            entregou = False
+            for genero, fila in filas.items():
+                if not fila.empty():
+                    entregou = True
+                    yield genero, fila.get_nowait()
+            if entregou:
+                continue
+            if not ativos:
+                break
+            novo_item.clear()
+            await novo_item.wait()
+    finally:
+        for tarefa in tarefas:
+            tarefa.cancel()
+
+def _pasta_do_genero(genero):
+    return os.path.join(PASTA_GENEROS, f"genero={genero}")
+
+def _abrir_particao(genero):
+    """Saída de um gênero em ../base_de_dados/generos/genero=<nome>/."""
+    pasta = _pasta_do_genero(genero)
+    os.makedirs(pasta, exist_ok=True)
+    return _abrir_saida(pasta, f"{genero}_mais_acessadas_todos_anos")
+
+class SaidaPorGenero(SaidaParticionada):
+    """Particiona as músicas pelo gênero em que foram descobertas e ajusta a `fonte`."""
+
+    def __init__(self):
+        self.genero_por_url = {}
+        super().__init__(_abrir_particao, lambda dados: self.genero_por_url[dados['url']])
+
+    def adicionar(self, dados):
+        genero = self.genero_por_url[dados['url']]
+        super().adicionar(dict(dados, fonte=f"{genero}_todos_anos"))
+
+def coletar_generos(generos=GENEROS_PADRAO, limite_por_genero=500, concorrencia=8,
+                    requisicoes_por_segundo=2.0, diario=None):
+    """
+    Descobre e coleta vários gêneros (nomes ou URLs de estilo) num único
+    event loop. Todos dividem o mesmo limitador de req/s, o mesmo pool de
+    conexões e as mesmas `concorrencia` vagas de coleta.
+    """
+    nomes = [nome_do_genero(genero) for genero in generos]
+    total = limite_por_genero * len(generos)
+
+    print(f"🎵 Descobrindo e coletando {len(generos)} gêneros: {', '.join(nomes)}")
+    print(f"🎯 Até {limite_por_genero} músicas por gênero ({total} no total)")
+    print(f"💾 Dados serão salvos em: {PASTA_GENEROS}/genero=<nome>/")
+    print(f"⚡ Concorrência: {concorrencia} | Taxa inicial: {requisicoes_por_segundo:.1f} req/s por host (adaptativa, compartilhada)")
+
+    diario = diario or DiarioColeta()
+    limitador = LimitadorAdaptativo(requisicoes_por_segundo)
+    # Vagas da coleta mais as listagens de todos os gêneros no mesmo pool
+    obter_sessao(tamanho_pool=concorrencia + CONCORRENCIA_DESCOBERTA * len(generos))
+
+    descobertas = {
+        nome: DescobertaMusicas(baixar_pagina, limitador, limite_por_genero,
+                                paginas_iniciais_do_genero(genero), concorrencia=CONCORRENCIA_DESCOBERTA)
+        for nome, genero in zip(nomes, generos)
+    }
+    # Variantes da mesma letra são detectadas também entre gêneros diferentes
+    saida = _filtrar_duplicatas(SaidaPorGenero())
+    repetidas = []
+
+    async def fluxo_unico():
+        # A mesma música pode aparecer em dois gêneros: fica no primeiro que a achou
+        fontes = {nome: descoberta.musicas() for nome, descoberta in descobertas.items()}
+        async for genero, item in intercalar_generos(fontes):
+            url = item[3]
+            if url in saida.genero_por_url:
+                repetidas.append(url)
+                continue
+            saida.genero_por_url[url] = genero
+            yield item
+
+    try:
+        sucessos, falhas = asyncio.run(_coletar_letras_async(
+            fluxo_unico(), total, concorrencia, limitador, diario, saida
+        ))
+    finally:
+        saida.fechar()
+
+    print(f"\n🔍 Descoberta por gênero:")
+    for nome, descoberta in descobertas.items():
+        coletadas = len(saida.particoes[nome]) if nome in saida.particoes else 0
+        print(f"   - {nome}: {descoberta.encontradas} encontradas em {descoberta.paginas_baixadas} páginas | {coletadas} coletadas")
+    if repetidas:
+        print(f"   ♻️  {len(repetidas)} músicas repetidas entre gêneros ficaram só no primeiro")
+
+    _finalizar_coleta(saida, sum(d.encontradas for d in descobertas.values()), sucessos, falhas, diario)
+    return saida
+
+if __name__ == "__main__":
+    print("🚀 COLETA MULTI-GÊNERO")
+    print("⚖️  FILA JUSTA: Os gêneros se revezam nas vagas de coleta")
+    print()
+
+    if PORTA_METRICAS:
+        iniciar_servidor_metricas(PORTA_METRICAS)
+
+    inicio_execucao = time.time()
+    musicas = coletar_generos(GENEROS_PADRAO, limite_por_genero=500)
+    tempo_total = time.time() - inicio_execucao
+
+    print(f"\n" + "="*70)
+    print(f"🏁 EXECUÇÃO FINALIZADA!")
+    print(f"⏱️  Tempo total: {tempo_total/60:.1f} minutos")
+    print(f"📊 Total coletado: {len(musicas)} músicas")
@@ -0,0 +1,227 @@
+# ================================================================================
+# ATUALIZAÇÃO INCREMENTAL DO RANKING
+# Compara o ranking atual com a base existente e só baixa as letras novas
+# ================================================================================
+
+import asyncio
+import csv
+import glob
+import os
+import re
+import time
+from datetime import datetime
+
+from deduplicacao_letras import DetectorDuplicatas, FiltroDuplicatas
+from descoberta import PAGINAS_RANKING_SERTANEJO, chave_musica
+from escrita_incremental import COLUNAS_MUSICA, EscritorCSVIncremental, SaidaColeta
+from estado_coleta import DiarioColeta
+from limitador_taxa import LimitadorAdaptativo
+from resolucao_urls import obter_resolucao
+from scraper_sertanejo import (
+    buscar_musicas_mais_acessadas, _coletar_letras_async, _iterar_lista, _finalizar_coleta,
+    PASTA_SAIDA, BASE_NOME_SAIDA, MODO_DUPLICATAS
+)
+
+PASTA_SNAPSHOTS = os.path.join(PASTA_SAIDA, "snapshots")
+PREFIXO_SNAPSHOT = "sertanejo_snapshot"
+CAMINHO_CHANGELOG = os.path.join(PASTA_SNAPSHOTS, "changelog.csv")
+COLUNAS_CHANGELOG = ['versao', 'data', 'tipo', 'url', 'titulo', 'artista', 'posicao_anterior', 'posicao_nova']
+
+# O delta só lê o ranking: sem páginas de artista e com poucas páginas de paginação
+MAX_PAGINAS_RANKING = 20
+
+# Músicas que saíram do ranking continuam no snapshot (sem posição) para não perder as letras
+MANTER_FORA_DO_RANKING = True
+
+NOVA = 'nova'
+POSICAO_ALTERADA = 'posicao_alterada'
+SAIU_DO_RANKING = 'saiu_do_ranking'
+FALHA_COLETA = 'falha_coleta'
+VARIANTE = 'variante'  # Música nova cuja letra já existe na base em outra URL
+
+def _chave(url):
+    """Chave de comparação: 'artista/musica' depois de aplicar redirecionamentos conhecidos."""
+    url = obter_resolucao().resolver(url)
+    return chave_musica(url) or url
+
+def _snapshots():
+    """{versão: caminho} dos snapshots existentes, pelo _vNNNN do nome."""
+    padrao = re.compile(rf'^{re.escape(PREFIXO_SNAPSHOT)}_v(\d+)_')
+    versoes = {}
+    for caminho in glob.glob(os.path.join(PASTA_SNAPSHOTS, f"{PREFIXO_SNAPSHOT}_v*.csv")):
+        encontrado = padrao.match(os.path.basename(caminho))
+        if encontrado:
+            versoes[int(encontrado.group(1))] = caminho
+    return versoes
+
+def base_mais_recente():
+    """Último snapshot; sem snapshots, a coleta completa mais recente em ../base_de_dados/."""
+    snapshots = _snapshots()
+    if snapshots:
+        return snapshots[max(snapshots)]
+    coletas = glob.glob(os.path.join(PASTA_SAIDA, f"{BASE_NOME_SAIDA}_*.csv"))
+    coletas += glob.glob(os.path.join(PASTA_SAIDA, "sertanejo_parcial_*.csv"))
+    return max(coletas, key=os.path.getmtime) if coletas else None
+
+def _proxima_versao():
+    """Maior versão já usada + 1 (apagar um snapshot antigo não faz um número se repetir)."""
+    return max(_snapshots(), default=0) + 1
+
+def _inteiro(valor):
+    """'12', '2019.0' -> int; vazio -> None (o CSV guarda ano como float)."""
+    if valor in (None, ''):
+        return None
+    return int(float(valor))
+
+def _ler_base(caminho):
+    """Gera as linhas da base como dicionários (leitura em fluxo, sem carregar tudo)."""
+    with open(caminho, newline='', encoding='utf-8') as f:
+        for linha in csv.DictReader(f):
+            for coluna in ('ranking_posicao', 'ano', 'contagem_palavras', 'contagem_linhas'):
+                linha[coluna] = _inteiro(linha.get(coluna))
+            yield linha
+
+def comparar_ranking(caminho_base, ranking):
+    """
+    Cruza a base com o ranking atual pela URL. Retorna (posicao_atual, novas, posicao_anterior):
+    - posicao_atual: chave -> posição no ranking de hoje
+    - novas: itens do ranking que ainda não estão na base
+    - posicao_anterior: chave -> posição registrada na base
+    """
+    posicao_atual = {}
+    itens_por_chave = {}
+    for posicao, titulo, artista, url in ranking:
+        chave = _chave(url)
+        if chave not in posicao_atual:
+            posicao_atual[chave] = posicao
+            itens_por_chave[chave] = (posicao, titulo, artista, url)
+
+    posicao_anterior = {}
+    for linha in _ler_base(caminho_base):
+        posicao_anterior[_chave(linha['url'])] = linha['ranking_posicao']
+
+    novas = [item for chave, item in itens_por_chave.items() if chave not in posicao_anterior]
+    return posicao_atual, novas, posicao_anterior
+
+class Changelog:
+    """Acrescenta as mudanças de cada versão ao changelog.csv (um arquivo para todas)."""
+
+    def __init__(self, versao, caminho=CAMINHO_CHANGELOG):
+        novo = not os.path.exists(caminho)
+        self.versao = versao
+        self.data = datetime.now().isoformat()
+        self.arquivo = open(caminho, 'a', newline='', encoding='utf-8')
+        self.escritor = csv.writer(self.arquivo)
+        if novo:
+            self.escritor.writerow(COLUNAS_CHANGELOG)
+        self.contagem = {NOVA: 0, POSICAO_ALTERADA: 0, SAIU_DO_RANKING: 0, FALHA_COLETA: 0, VARIANTE: 0}
+
+    def registrar(self, tipo, url, titulo, artista, anterior=None, nova=None):
+        self.escritor.writerow([self.versao, self.data, tipo, url, titulo, artista,
+                                '' if anterior is None else anterior, '' if nova is None else nova])
+        self.contagem[tipo] += 1
+
+    def fechar(self):
+        self.arquivo.close()
+
+class _SaidaComChangelog:
+    """Grava as músicas novas no snapshot e registra cada uma no changelog."""
+
+    def __init__(self, saida, changelog, detector=None):
+        self.saida = FiltroDuplicatas(saida, detector) if detector else saida
+        self.changelog = changelog
+        self.urls_coletadas = set()
+
+    def adicionar(self, dados):
+        gravada = self.saida.adicionar(dados) is not False
+        tipo = NOVA if gravada and not dados.get('duplicata_de') else VARIANTE
+        self.changelog.registrar(tipo, dados['url'], dados['titulo'], dados['artista'],
+                                 nova=dados['ranking_posicao'])
+        self.urls_coletadas.add(dados['url'])
+
+def atualizar_ranking(limite=1000, caminho_base=None, concorrencia=8, requisicoes_por_segundo=2.0, diario=None):
+    """
+    Modo delta: baixa só as listagens do ranking, reaproveita as letras já
+    coletadas (atualizando `ranking_posicao`) e busca apenas as músicas novas.
+    Gera um snapshot versionado e acrescenta as mudanças ao changelog.
+    """
+    caminho_base = caminho_base or base_mais_recente()
+    if not caminho_base:
+        print("❌ Nenhuma base encontrada para comparar. Rode primeiro a coleta completa (scraper_sertanejo.py).")
+        return None
+
+    print(f"🔄 ATUALIZAÇÃO INCREMENTAL DO RANKING")
+    print(f"📂 Base atual: {caminho_base}")
+
+    # Só as listagens do ranking (posições determinísticas, na ordem da paginação):
+    # páginas de artista e listagens de estilo não são ranking e gerariam falsas mudanças
+    ranking = buscar_musicas_mais_acessadas(limite, PAGINAS_RANKING_SERTANEJO, requisicoes_por_segundo,
+                                            seguir_artistas=False, max_paginas=MAX_PAGINAS_RANKING)
+    if not ranking:
+        print("❌ Não foi possível obter o ranking atual. Nada foi alterado.")
+        return None
+
+    posicao_atual, novas, posicao_anterior = comparar_ranking(caminho_base, ranking)
+    print(f"📊 Ranking atual: {len(posicao_atual)} músicas | Já na base: {len(posicao_atual) - len(novas)} | Novas: {len(novas)}")
+
+    os.makedirs(PASTA_SNAPSHOTS, exist_ok=True)
+    versao = _proxima_versao()
+    caminho_snapshot = os.path.join(
+        PASTA_SNAPSHOTS, f"{PREFIXO_SNAPSHOT}_v{versao:04d}_{datetime.now():%Y%m%d_%H%M%S}.csv"
+    )
+    saida = SaidaColeta(EscritorCSVIncremental(caminho_snapshot, COLUNAS_MUSICA))
+    changelog = Changelog(versao)
+    # As letras da base entram no índice como canônicas: novas variantes delas são detectadas
+    detector = DetectorDuplicatas(MODO_DUPLICATAS) if MODO_DUPLICATAS else None
+
+    try:
+        # 1) Músicas já coletadas: só a posição muda, nenhuma requisição
+        for linha in _ler_base(caminho_base):
+            chave = _chave(linha['url'])
+            anterior = posicao_anterior.get(chave)
+            atual = posicao_atual.get(chave)
+            if atual is None:
+                if anterior is not None:
+                    changelog.registrar(SAIU_DO_RANKING, linha['url'], linha['titulo'], linha['artista'], anterior)
+                if not MANTER_FORA_DO_RANKING:
+                    continue
+            elif atual != anterior:
+                changelog.registrar(POSICAO_ALTERADA, linha['url'], linha['titulo'], linha['artista'], anterior, atual)
+            linha['ranking_posicao'] = atual
+            saida.adicionar(linha)
+            if detector and not linha.get('duplicata_de'):
+                detector.adicionar(linha['url'], linha['letra'])
+
+        # 2) Músicas novas: letras baixadas com a mesma coleta concorrente do scraper
+        sucessos, falhas = 0, 0
+        if novas:
+            diario = diario or DiarioColeta()
+            destino = _SaidaComChangelog(saida, changelog, detector)
+            sucessos, falhas = asyncio.run(_coletar_letras_async(
+                _iterar_lista(novas), len(novas), concorrencia,
+                LimitadorAdaptativo(requisicoes_por_segundo), diario, destino
+            ))
+            for posicao, titulo, artista, url in novas:
+                if url not in destino.urls_coletadas:
+                    changelog.registrar(FALHA_COLETA, url, titulo, artista, nova=posicao)
+    finally:
+        saida.fechar()
+        changelog.fechar()
+
+    print(f"\n📝 CHANGELOG (versão {versao}):")
+    print(f"   🆕 Novas: {changelog.contagem[NOVA]}")
+    print(f"   ↕️  Posição alterada: {changelog.contagem[POSICAO_ALTERADA]}")
+    print(f"   🚪 Saíram do ranking: {changelog.contagem[SAIU_DO_RANKING]}")
+    print(f"   🪞 Variantes de letras já na base: {changelog.contagem[VARIANTE]}")
+    print(f"   ❌ Novas que falharam: {changelog.contagem[FALHA_COLETA]}")
+    print(f"📒 Changelog: {CAMINHO_CHANGELOG}")
+
+    if novas:
+        _finalizar_coleta(saida, len(novas), sucessos, falhas, diario)
+    print(f"📸 Snapshot: {caminho_snapshot} ({len(saida)} músicas)")
+    return caminho_snapshot
+
+if __name__ == "__main__":
+    inicio_execucao = time.time()
+    snapshot = atualizar_ranking(limite=1000)
+    print(f"\n⏱️  Tempo total: {(time.time() - inicio_execucao)/60:.1f} minutos")
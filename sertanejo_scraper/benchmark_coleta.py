@@ -0,0 +1,125 @@
+# ================================================================================
+# BENCHMARK DA COLETA (OFFLINE)
+# Músicas/s de ponta a ponta contra o servidor de replay, em vários níveis de concorrência
+# ================================================================================
+
+import asyncio
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from bs4 import BeautifulSoup
+
+import cache_http
+import resolucao_urls
+from escrita_incremental import EscritorCSVIncremental, SaidaColeta
+from estado_coleta import DiarioColeta
+from limitador_taxa import LimitadorTaxa, LimitadorAdaptativo
+from parser_letras import extrair_campos_pagina
+from replay_fixtures import (
+    FixturesHTML, ServidorReplay, gerar_fixtures_sinteticas, PASTA_FIXTURES_PADRAO
+)
+from scraper_sertanejo import (
+    _coletar_letras_async, _iterar_lista, extrair_ano_melhorado, limpar_letra
+)
+
+NIVEIS_CONCORRENCIA = [1, 2, 4, 8, 16]
+LATENCIA_MS = (20, 80)        # Latência simulada por requisição no servidor local
+MUSICAS_POR_RODADA = 200
+SEM_LIMITE = 1_000_000        # req/s: mede o pipeline, não o limitador
+
+def paginas_de_letra(fixtures):
+    """Caminhos das páginas de letra ('/artista/musica/') entre as fixtures."""
+    return [c for c in fixtures.caminhos() if c.count('/') == 3 and not c.startswith('/mais-acessadas/')]
+
+def medir_etapas(fixtures, caminhos):
+    """Tempo por página de cada função de extração, sem rede."""
+    paginas = [fixtures.ler(c) for c in caminhos]
+    resultados = {}
+
+    inicio = time.perf_counter()
+    campos = [extrair_campos_pagina(html) for html in paginas]
+    resultados['extrair_campos_pagina'] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    for c in campos:
+        limpar_letra(c['letra_bruta'])
+    resultados['limpar_letra'] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    for html in paginas:
+        extrair_ano_melhorado(BeautifulSoup(html, 'html.parser'))
+    resultados['extrair_ano_melhorado (bs4)'] = time.perf_counter() - inicio
+
+    return {nome: tempo / len(paginas) * 1000 for nome, tempo in resultados.items()}
+
+def rodar_coleta(url_base, caminhos, concorrencia, limitador, pasta_tmp):
+    """Coleta as músicas do servidor local; retorna (segundos, sucessos, falhas)."""
+    diario = DiarioColeta(os.path.join(pasta_tmp, f"diario_{concorrencia}_{time.time_ns()}.sqlite"))
+    saida = SaidaColeta(EscritorCSVIncremental(os.path.join(pasta_tmp, f"saida_{time.time_ns()}.csv")))
+    itens = [(i, c.strip('/').split('/')[1], c.strip('/').split('/')[0], url_base + c)
+             for i, c in enumerate(caminhos, 1)]
+
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # Sem o log por música no meio da tabela
+        sucessos, falhas = asyncio.run(_coletar_letras_async(
+            _iterar_lista(itens), len(itens), concorrencia, limitador, diario, saida
+        ))
+    duracao = time.perf_counter() - inicio
+    saida.fechar()
+    diario.fechar()
+    return duracao, sucessos, falhas
+
+def main():
+    pasta = sys.argv[1] if len(sys.argv) > 1 else PASTA_FIXTURES_PADRAO
+    pasta_tmp = tempfile.mkdtemp(prefix="benchmark_coleta_")
+
+    print("="*70)
+    print("⏱️  BENCHMARK DA COLETA (OFFLINE)")
+    print("="*70)
+
+    fixtures = FixturesHTML(pasta) if os.path.exists(pasta) else None
+    if not fixtures or not paginas_de_letra(fixtures):
+        print(f"📂 Sem fixtures em {pasta}: gerando páginas sintéticas")
+        print(f"   (para usar páginas reais: FixturesHTML().importar_do_cache() depois de uma coleta)")
+        fixtures = FixturesHTML(os.path.join(pasta_tmp, 'fixtures'))
+        gerar_fixtures_sinteticas(fixtures, quantidade=MUSICAS_POR_RODADA)
+    caminhos = paginas_de_letra(fixtures)[:MUSICAS_POR_RODADA]
+    print(f"📂 {len(caminhos)} páginas de letra")
+
+    # Sem cache em disco e sem mexer no mapa de redirecionamentos real
+    cache_http.configurar_cache(ativo=False)
+    resolucao_urls.configurar_resolucao(os.path.join(pasta_tmp, 'resolucao_urls.json'))
+
+    print(f"\n🔬 Extração por página (sem rede):")
+    for nome, ms in medir_etapas(fixtures, caminhos).items():
+        print(f"   {nome:30s} {ms:7.2f} ms/página")
+
+    print(f"\n🌐 Ponta a ponta contra o servidor local (latência {LATENCIA_MS[0]}-{LATENCIA_MS[1]} ms):")
+    print(f"   {'concorrência':>12} {'tempo':>8} {'músicas/s':>10} {'falhas':>7}")
+    with ServidorReplay(fixtures, latencia_ms=LATENCIA_MS, semente=1) as servidor:
+        base = None
+        for concorrencia in NIVEIS_CONCORRENCIA:
+            duracao, sucessos, falhas = rodar_coleta(
+                servidor.url_base, caminhos, concorrencia, LimitadorTaxa(SEM_LIMITE), pasta_tmp
+            )
+            base = base or sucessos / duracao
+            print(f"   {concorrencia:>12} {duracao:>7.1f}s {sucessos/duracao:>10.1f} {falhas:>7}"
+                  f"   ({sucessos/duracao/base:.1f}x)")
+
+    print(f"\n⚠️  Com erros injetados (5% de 503, 2% de 429), concorrência 8, limitador adaptativo:")
+    with ServidorReplay(fixtures, latencia_ms=LATENCIA_MS, taxa_erro=0.05, taxa_429=0.02,
+                        retry_after=0, semente=2) as servidor:
+        limitador = LimitadorAdaptativo(20.0, taxa_maxima=200.0)
+        duracao, sucessos, falhas = rodar_coleta(servidor.url_base, caminhos, 8, limitador, pasta_tmp)
+        print(f"   {duracao:.1f}s | {sucessos/duracao:.1f} músicas/s | {sucessos} sucessos | {falhas} falhas"
+              f" | {servidor.erros_injetados} erros injetados | taxa final {limitador.descricao()}")
+    print("="*70)
+    shutil.rmtree(pasta_tmp, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
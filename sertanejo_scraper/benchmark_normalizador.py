@@ -0,0 +1,110 @@
+# ================================================================================
+# BENCHMARK E CONFERÊNCIA DO NORMALIZADOR DE LETRAS
+# Compara a regex única com a cadeia antiga de re.sub nos CSVs existentes
+# ================================================================================
+
+import glob
+import os
+import random
+import re
+import time
+
+import pandas as pd
+
+from normalizador_letras import normalizar_letra, normalizar_letras
+
+ARQUIVOS_PADRAO = [
+    "../base_de_dados/*.csv",
+    "teste_hits_corrigido_*.csv",
+]
+
+def limpar_letra_antigo(letra_bruta):
+    """Cópia do limpar_letra original (7 passes), usada como referência."""
+    if not letra_bruta:
+        return ""
+    texto_limpo = re.sub(r'([a-záéíóúçãõâêôà])([A-ZÁÉÍÓÚÇÃÕÂÊÔÀ])', r'\1 \2', letra_bruta)
+    texto_limpo = re.sub(r'([0-9A-ZÁÉÍÓÚÇÃÕÂÊÔÀ]{2,})([A-ZÁÉÍÓÚÇÃÕÂÊÔÀ][a-záéíóúçãõâêôà])', r'\1 \2', texto_limpo)
+    texto_limpo = re.sub(r'([A-ZÁÉÍÓÚÇÃÕÂÊÔÀ]{2,})([A-ZÁÉÍÓÚÇÃÕÂÊÔÀ][a-záéíóúçãõâêôà]+)', r'\1 \2', texto_limpo)
+    texto_limpo = re.sub(r'([a-záéíóúçãõâêôà])([A-ZÁÉÍÓÚÇÃÕÂÊÔÀ][a-záéíóúçãõâêôà])', r'\1 \2', texto_limpo)
+    texto_limpo = re.sub(r'([.!?;:])([A-ZÁÉÍÓÚÇÃÕÂÊÔÀ])', r'\1 \2', texto_limpo)
+    linhas = [linha.strip() for linha in texto_limpo.split('\n') if linha.strip()]
+    texto_final = '\n'.join(linhas)
+    texto_final = re.sub(r'\s+', ' ', texto_final)
+    return texto_final
+
+def colapsar_linhas(texto):
+    """O formato antigo: tudo em uma linha."""
+    return re.sub(r'\s+', ' ', texto)
+
+def carregar_letras():
+    letras = []
+    for padrao in ARQUIVOS_PADRAO:
+        for arquivo in sorted(glob.glob(padrao)):
+            df = pd.read_csv(arquivo, usecols=['letra'])
+            letras.extend(df['letra'].dropna().astype(str).tolist())
+            print(f"📂 {os.path.basename(arquivo)}: {len(df)} letras")
+    return letras
+
+def com_quebras(letra, rng):
+    """Simula a letra bruta da página: versos separados por \\n e espaços sobrando."""
+    palavras = letra.split(' ')
+    partes = []
+    for palavra in palavras:
+        partes.append(palavra)
+        partes.append(rng.choice([' ', ' ', ' ', '\n', '  \n\n ', '\t']))
+    return ''.join(partes)
+
+def medir(funcao, letras, repeticoes=5):
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        for letra in letras:
+            funcao(letra)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+def main():
+    print("="*70)
+    print("⏱️  NORMALIZADOR DE LETRAS: CONFERÊNCIA E BENCHMARK")
+    print("="*70)
+
+    letras = carregar_letras()
+    if not letras:
+        print("❌ Nenhum CSV com coluna 'letra' encontrado")
+        return
+    rng = random.Random(42)
+    brutas = [com_quebras(letra, rng) for letra in letras]
+
+    # 1. Saída dourada: nas letras já salvas (sem \n) o resultado é idêntico
+    divergentes = [l for l in letras if normalizar_letra(l) != limpar_letra_antigo(l)]
+    print(f"\n🔎 Letras salvas: {len(letras) - len(divergentes)}/{len(letras)} idênticas ao limpar_letra antigo")
+
+    # 2. Com quebras de linha: mesmo texto, mas os versos continuam separados
+    divergentes_brutas = [b for b in brutas if colapsar_linhas(normalizar_letra(b)) != limpar_letra_antigo(b)]
+    versos = sum(normalizar_letra(b).count('\n') + 1 for b in brutas)
+    print(f"🔎 Letras com \\n: {len(brutas) - len(divergentes_brutas)}/{len(brutas)} idênticas (ignorando as quebras)")
+    print(f"   {versos:,} versos preservados (o antigo devolvia {len(brutas):,} linhas)")
+
+    # 3. Tempo
+    tempo_antigo = medir(limpar_letra_antigo, brutas)
+    tempo_novo = medir(normalizar_letra, brutas)
+    serie = pd.Series(brutas)
+    inicio = time.perf_counter()
+    resultado_lote = normalizar_letras(serie)
+    tempo_lote = time.perf_counter() - inicio
+
+    print(f"\n⏱️  {len(brutas)} letras:")
+    print(f"   limpar_letra antigo : {tempo_antigo*1000:8.1f} ms")
+    print(f"   normalizar_letra    : {tempo_novo*1000:8.1f} ms ({tempo_antigo/tempo_novo:.1f}x)")
+    print(f"   normalizar_letras   : {tempo_lote*1000:8.1f} ms (Series do pandas)")
+
+    lote_ok = resultado_lote.tolist() == [normalizar_letra(b) for b in brutas]
+    print(f"\n{'✅' if lote_ok else '❌'} Lote e chamada individual dão o mesmo resultado")
+    if divergentes or divergentes_brutas:
+        print(f"❌ {len(divergentes) + len(divergentes_brutas)} divergências em relação ao limpar_letra antigo")
+    else:
+        print("✅ Nenhuma divergência em relação ao limpar_letra antigo")
+    print("="*70)
+
+if __name__ == "__main__":
+    main()
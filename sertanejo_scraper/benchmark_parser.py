@@ -0,0 +1,77 @@
+# ================================================================================
+# BENCHMARK DO PARSER DE LETRAS
+# Mede o tempo de análise das páginas salvas com cada backend
+# ================================================================================
+
+import gzip
+import os
+import sys
+import time
+
+from cache_http import PASTA_CACHE_PADRAO
+from parser_letras import extrair_campos_pagina, BACKENDS, LexborHTMLParser, PARSER_BS4
+
+def carregar_paginas(pasta):
+    """Lê as páginas salvas (.html ou .html.gz do cache HTTP) da pasta."""
+    paginas = []
+    for raiz, _, arquivos in os.walk(pasta):
+        for nome in sorted(arquivos):
+            caminho = os.path.join(raiz, nome)
+            if nome.endswith('.html.gz'):
+                with open(caminho, 'rb') as f:
+                    paginas.append(gzip.decompress(f.read()))
+            elif nome.endswith('.html'):
+                with open(caminho, 'rb') as f:
+                    paginas.append(f.read())
+    return paginas
+
+def medir_backend(paginas, backend, repeticoes=3):
+    """Retorna (melhor tempo total em segundos, resultados da última rodada)."""
+    melhor = float('inf')
+    resultados = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultados = [extrair_campos_pagina(html, backend) for html in paginas]
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultados
+
+def main():
+    pasta = sys.argv[1] if len(sys.argv) > 1 else PASTA_CACHE_PADRAO
+
+    print("="*70)
+    print("⏱️  BENCHMARK DO PARSER DE LETRAS")
+    print("="*70)
+
+    paginas = carregar_paginas(pasta)
+    if not paginas:
+        print(f"❌ Nenhuma página encontrada em {pasta}")
+        print("   Rode o scraper uma vez (o cache HTTP guarda as páginas) ou passe uma pasta com .html")
+        return
+
+    total_mb = sum(len(p) for p in paginas) / 1024 / 1024
+    print(f"📂 {len(paginas)} páginas ({total_mb:.1f} MB) de {pasta}")
+    print(f"🧩 BeautifulSoup usando o parser: {PARSER_BS4}")
+    print()
+
+    tempos = {}
+    resultados = {}
+    for backend in BACKENDS:
+        if backend == 'selectolax' and LexborHTMLParser is None:
+            print(f"   {backend:12s} não instalado (pip install selectolax)")
+            continue
+        tempos[backend], resultados[backend] = medir_backend(paginas, backend)
+        por_pagina_ms = tempos[backend] / len(paginas) * 1000
+        print(f"   {backend:12s} {tempos[backend]:.3f}s | {por_pagina_ms:.2f} ms/página | {len(paginas)/tempos[backend]:.0f} páginas/s")
+
+    if 'selectolax' in tempos and 'bs4' in tempos:
+        print()
+        print(f"🚀 Aceleração: {tempos['bs4'] / tempos['selectolax']:.1f}x")
+        divergentes = sum(1 for a, b in zip(resultados['bs4'], resultados['selectolax']) if a != b)
+        if divergentes:
+            print(f"⚠️  {divergentes} páginas com campos diferentes entre os backends")
+        else:
+            print(f"✅ Os dois backends extraem exatamente os mesmos campos")
+    print("="*70)
+
+if __name__ == "__main__":
+    main()
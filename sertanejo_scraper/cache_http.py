@@ -0,0 +1,173 @@
+# ================================================================================
+# CACHE HTTP EM DISCO
+# Guarda as páginas baixadas (comprimidas) para reexecuções sem rede
+# ================================================================================
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+PASTA_CACHE_PADRAO = "../base_de_dados/cache_http"
+TTL_PADRAO = 30 * 24 * 3600   # Letras quase nunca mudam: 30 dias
+TTL_RANKING = 24 * 3600       # Páginas de ranking mudam todo dia
+
+class EntradaCache:
+    """Página guardada no cache: corpo descomprimido e metadados."""
+
+    def __init__(self, corpo, meta):
+        self.corpo = corpo
+        self.meta = meta
+
+    def idade(self):
+        return time.time() - self.meta['validado_em']
+
+def _gravar_atomico(caminho, conteudo, modo):
+    """Temporário (um por thread) + os.replace: quem lê vê o arquivo antigo ou o novo, nunca um pedaço."""
+    temporario = f"{caminho}.{threading.get_ident()}.tmp"
+    with open(temporario, modo) as f:
+        f.write(conteudo)
+    os.replace(temporario, caminho)
+
+class CacheRespostas:
+    """Cache de respostas HTTP com TTL, revalidação condicional e despejo LRU."""
+
+    def __init__(self, pasta=PASTA_CACHE_PADRAO, ttl_segundos=TTL_PADRAO,
+                 tamanho_maximo_mb=500, somente_cache=False):
+        self.pasta = pasta
+        self.ttl_segundos = ttl_segundos
+        self.tamanho_maximo = tamanho_maximo_mb * 1024 * 1024
+        self.somente_cache = somente_cache
+        self._lock = threading.Lock()
+        self._indice = {}  # chave -> [tamanho em bytes, último acesso]
+        self._tamanho_total = 0
+        os.makedirs(pasta, exist_ok=True)
+        self._carregar_indice()
+
+    def _carregar_indice(self):
+        """Reconstrói o índice LRU a partir dos arquivos já existentes."""
+        for raiz, _, arquivos in os.walk(self.pasta):
+            for nome in arquivos:
+                if not nome.endswith('.json'):
+                    continue
+                chave = nome[:-len('.json')]
+                caminho_corpo = os.path.join(raiz, chave + '.html.gz')
+                if not os.path.exists(caminho_corpo):
+                    continue
+                tamanho = os.path.getsize(caminho_corpo)
+                ultimo_acesso = os.path.getmtime(os.path.join(raiz, nome))
+                self._indice[chave] = [tamanho, ultimo_acesso]
+                self._tamanho_total += tamanho
+
+    @staticmethod
+    def chave(url):
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def _caminhos(self, chave):
+        subpasta = os.path.join(self.pasta, chave[:2])
+        return os.path.join(subpasta, chave + '.html.gz'), os.path.join(subpasta, chave + '.json')
+
+    def obter(self, url):
+        """Retorna a EntradaCache da URL ou None se não estiver guardada."""
+        chave = self.chave(url)
+        caminho_corpo, caminho_meta = self._caminhos(chave)
+        try:
+            with open(caminho_meta, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(caminho_corpo, 'rb') as f:
+                corpo = gzip.decompress(f.read())
+        except (OSError, ValueError):
+            return None
+        self._tocar(chave, caminho_meta)
+        return EntradaCache(corpo, meta)
+
+    def esta_fresca(self, entrada, ttl=None):
+        ttl = self.ttl_segundos if ttl is None else ttl
+        return entrada.idade() < ttl
+
+    @staticmethod
+    def headers_condicionais(entrada):
+        """Headers para revalidar a entrada (resposta 304 se nada mudou)."""
+        headers = {}
+        if entrada.meta.get('etag'):
+            headers['If-None-Match'] = entrada.meta['etag']
+        if entrada.meta.get('last_modified'):
+            headers['If-Modified-Since'] = entrada.meta['last_modified']
+        return headers
+
+    def salvar(self, url, corpo, etag=None, last_modified=None):
+        """Guarda o corpo comprimido e os metadados de validação."""
+        chave = self.chave(url)
+        caminho_corpo, caminho_meta = self._caminhos(chave)
+        os.makedirs(os.path.dirname(caminho_corpo), exist_ok=True)
+        comprimido = gzip.compress(corpo)
+        meta = {
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'sha256_corpo': hashlib.sha256(corpo).hexdigest(),
+            'validado_em': time.time(),
+        }
+        # Escreve em arquivo temporário e renomeia: nunca deixa entrada pela metade
+        _gravar_atomico(caminho_corpo, comprimido, 'wb')
+        _gravar_atomico(caminho_meta, json.dumps(meta), 'w')
+
+        with self._lock:
+            tamanho_antigo = self._indice.get(chave, [0])[0]
+            self._indice[chave] = [len(comprimido), time.time()]
+            self._tamanho_total += len(comprimido) - tamanho_antigo
+        self._despejar_se_necessario()
+
+    def renovar(self, url, entrada):
+        """Marca a entrada como revalidada (servidor respondeu 304)."""
+        chave = self.chave(url)
+        _, caminho_meta = self._caminhos(chave)
+        entrada.meta['validado_em'] = time.time()
+        _gravar_atomico(caminho_meta, json.dumps(entrada.meta), 'w')
+
+    def _tocar(self, chave, caminho_meta):
+        """Atualiza o último acesso (mtime do .json guarda o LRU entre execuções)."""
+        agora = time.time()
+        with self._lock:
+            if chave in self._indice:
+                self._indice[chave][1] = agora
+        try:
+            os.utime(caminho_meta, (agora, agora))
+        except OSError:
+            pass
+
+    def _despejar_se_necessario(self):
+        """Remove as entradas menos usadas até voltar a 90% do limite."""
+        with self._lock:
+            if self._tamanho_total <= self.tamanho_maximo:
+                return
+            alvo = self.tamanho_maximo * 0.9
+            for chave, (tamanho, _) in sorted(self._indice.items(), key=lambda item: item[1][1]):
+                if self._tamanho_total <= alvo:
+                    break
+                for caminho in self._caminhos(chave):
+                    try:
+                        os.remove(caminho)
+                    except OSError:
+                        pass
+                del self._indice[chave]
+                self._tamanho_total -= tamanho
+
+_cache = None
+_configurado = False
+
+def configurar_cache(pasta=PASTA_CACHE_PADRAO, ttl_segundos=TTL_PADRAO,
+                     tamanho_maximo_mb=500, somente_cache=False, ativo=True):
+    """Define o cache global usado pelo scraper (ativo=False desliga o cache)."""
+    global _cache, _configurado
+    _cache = CacheRespostas(pasta, ttl_segundos, tamanho_maximo_mb, somente_cache) if ativo else None
+    _configurado = True
+    return _cache
+
+def obter_cache():
+    """Retorna o cache global (ou None se desligado), com a configuração padrão na primeira vez."""
+    if not _configurado:
+        configurar_cache()
+    return _cache
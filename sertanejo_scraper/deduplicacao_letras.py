@@ -0,0 +1,146 @@
+# ================================================================================
+# DETECÇÃO DE LETRAS QUASE DUPLICADAS (MINHASH + LSH)
+# Versões "ao vivo", reuploads e variantes da mesma letra em outras URLs
+# ================================================================================
+
+import re
+import zlib
+from collections import defaultdict
+
+import numpy as np
+import unidecode
+
+NUM_PERMUTACOES = 128
+BANDAS = 16                   # 16 bandas x 8 linhas: candidatos a partir de ~70% de Jaccard
+TAMANHO_SHINGLE = 5           # Sequências de 5 palavras
+LIMIAR_SIMILARIDADE = 0.8     # Jaccard estimado para considerar a mesma letra
+
+PRIMO_MERSENNE = (1 << 61) - 1
+MASCARA_32 = (1 << 32) - 1
+
+PULAR = 'pular'     # Variantes não vão para a saída (só ficam no diário)
+MARCAR = 'marcar'   # Variantes vão para a saída com `duplicata_de` preenchido
+
+_PALAVRA = re.compile(r'\w+')
+
+def _permutacoes(num_permutacoes, semente=1):
+    """Coeficientes (a, b) fixos: assinaturas comparáveis entre execuções."""
+    gerador = np.random.RandomState(semente)
+    a = gerador.randint(1, MASCARA_32, size=num_permutacoes, dtype=np.uint64)
+    b = gerador.randint(0, MASCARA_32, size=num_permutacoes, dtype=np.uint64)
+    return a, b
+
+def shingles(letra, tamanho=TAMANHO_SHINGLE):
+    """Hashes (crc32) das sequências de `tamanho` palavras, sem acento e em minúsculas."""
+    palavras = _PALAVRA.findall(unidecode.unidecode(letra).lower())
+    if len(palavras) < tamanho:
+        palavras = palavras + [''] * (tamanho - len(palavras))
+    return np.fromiter(
+        {zlib.crc32(' '.join(palavras[i:i + tamanho]).encode('utf-8'))
+         for i in range(len(palavras) - tamanho + 1)},
+        dtype=np.uint64
+    )
+
+class DetectorDuplicatas:
+    """
+    Índice LSH de assinaturas MinHash das letras já aceitas. A primeira versão
+    vista de uma letra é a canônica; as seguintes parecidas o suficiente recebem
+    `duplicata_de` com a URL dela.
+    """
+
+    def __init__(self, modo=PULAR, limiar=LIMIAR_SIMILARIDADE,
+                 num_permutacoes=NUM_PERMUTACOES, bandas=BANDAS):
+        if num_permutacoes % bandas:
+            raise ValueError("num_permutacoes precisa ser múltiplo de bandas")
+        self.modo = modo
+        self.limiar = limiar
+        self.bandas = bandas
+        self.linhas = num_permutacoes // bandas
+        self._a, self._b = _permutacoes(num_permutacoes)
+        self._buckets = [defaultdict(list) for _ in range(bandas)]
+        self._assinaturas = {}   # url canônica -> assinatura
+        self.duplicatas = {}     # url da variante -> url canônica
+
+    @property
+    def pular(self):
+        return self.modo == PULAR
+
+    def assinatura(self, letra):
+        """Mínimo de (a*h + b) mod p em cada permutação, com todos os shingles de uma vez."""
+        hashes = shingles(letra)
+        valores = (np.outer(hashes, self._a) + self._b) % PRIMO_MERSENNE
+        return (valores.min(axis=0) & MASCARA_32).astype(np.uint32)
+
+    def _chaves_bandas(self, assinatura):
+        return [assinatura[i * self.linhas:(i + 1) * self.linhas].tobytes() for i in range(self.bandas)]
+
+    def _indexar(self, url, assinatura):
+        self._assinaturas[url] = assinatura
+        for banda, chave in zip(self._buckets, self._chaves_bandas(assinatura)):
+            banda[chave].append(url)
+
+    def adicionar(self, url, letra):
+        """Indexa uma letra como canônica (ex.: músicas de uma base já existente)."""
+        if url not in self._assinaturas:
+            self._indexar(url, self.assinatura(letra))
+
+    def consultar(self, letra, assinatura=None):
+        """(url canônica, similaridade estimada) da letra mais parecida acima do limiar, ou (None, 0)."""
+        assinatura = self.assinatura(letra) if assinatura is None else assinatura
+        candidatos = set()
+        for banda, chave in zip(self._buckets, self._chaves_bandas(assinatura)):
+            candidatos.update(banda.get(chave, ()))
+        melhor, similaridade = None, 0.0
+        for url in candidatos:
+            estimativa = float(np.mean(self._assinaturas[url] == assinatura))
+            if estimativa > similaridade:
+                melhor, similaridade = url, estimativa
+        if similaridade >= self.limiar:
+            return melhor, similaridade
+        return None, similaridade
+
+    def classificar(self, dados):
+        """
+        Marca `dados['duplicata_de']` se a letra já tiver uma versão canônica;
+        senão indexa a música como canônica. Retorna os próprios dados.
+        """
+        url = dados['url']
+        if dados.get('duplicata_de'):
+            self.duplicatas[url] = dados['duplicata_de']
+            return dados
+        if url in self._assinaturas:
+            return dados
+        assinatura = self.assinatura(dados['letra'])
+        canonica, _ = self.consultar(dados['letra'], assinatura)
+        if canonica:
+            dados['duplicata_de'] = canonica
+            self.duplicatas[url] = canonica
+            return dados
+        self._indexar(url, assinatura)
+        return dados
+
+class FiltroDuplicatas:
+    """
+    Envolve uma saída (SaidaColeta, SaidaParticionada...) e passa cada música
+    pelo detector antes de gravar. No modo 'pular' as variantes não chegam à
+    saída; em 'marcar' chegam com `duplicata_de` preenchido.
+    """
+
+    def __init__(self, saida, detector):
+        self.saida = saida
+        self.detector = detector
+
+    def adicionar(self, dados):
+        """Retorna True se a música foi gravada na saída."""
+        self.detector.classificar(dados)
+        if self.detector.pular and dados.get('duplicata_de'):
+            return False
+        self.saida.adicionar(dados)
+        return True
+
+    def __getattr__(self, nome):
+        # Contadores, arquivos e fechar() vêm da saída envolvida
+        return getattr(self.saida, nome)
+
+    def __len__(self):
+        return len(self.saida)
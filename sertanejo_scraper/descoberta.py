@@ -0,0 +1,220 @@
+# ================================================================================
+# DESCOBERTA DE MÚSICAS (RANKING + PAGINAÇÃO + PÁGINAS DE ARTISTA)
+# Busca as listagens em paralelo e entrega as músicas em ordem de posição
+# ================================================================================
+
+import asyncio
+import heapq
+import re
+from urllib.parse import urljoin, urlparse
+
+from cache_http import TTL_RANKING
+from parser_letras import extrair_links
+
+URL_BASE = "https://www.letras.mus.br"
+
+PAGINAS_INICIAIS_SERTANEJO = [
+    "https://www.letras.mus.br/mais-acessadas/sertanejo/",
+    "https://www.letras.mus.br/estilos/sertanejo/",
+    "https://www.letras.mus.br/top100/sertanejo/",
+    "https://www.letras.mus.br/estilos/sertanejo-universitario/",
+    "https://www.letras.mus.br/estilos/sertanejo-raiz/",
+]
+
+# Só o ranking em si (e a sua paginação): usado pela atualização incremental
+PAGINAS_RANKING_SERTANEJO = PAGINAS_INICIAIS_SERTANEJO[:1]
+
+def paginas_iniciais_do_genero(genero, url_base=URL_BASE):
+    """Listagens de partida de um gênero ('funk', 'pagode', ...) ou a própria URL de estilo."""
+    if genero.startswith('http'):
+        return [genero]
+    if genero == 'sertanejo' and url_base == URL_BASE:
+        return PAGINAS_INICIAIS_SERTANEJO
+    return [f"{url_base}/mais-acessadas/{genero}/", f"{url_base}/estilos/{genero}/"]
+
+def nome_do_genero(genero):
+    """'funk' -> 'funk'; 'https://.../estilos/funk-carioca/' -> 'funk-carioca'."""
+    if genero.startswith('http'):
+        return [s for s in urlparse(genero).path.split('/') if s][-1]
+    return genero
+
+# Segmentos que indicam páginas que não são letras
+SEGMENTOS_EXCLUIDOS = {
+    'mais-acessadas', 'artista', 'artistas', 'album', 'albuns', 'biografia', 'discografia',
+    'fotos', 'playlists', 'playlist', 'estilos', 'top100', 'traducao', 'cifra',
+}
+
+PADRAO_PAGINACAO = re.compile(r'^(\d+|pagina-?\d+|page-?\d+)/?$')
+
+# Ordem das páginas: cada página recebe uma chave (tupla) ao ser agendada.
+#   (0, i)           -> i-ésima listagem inicial (ranking primeiro)
+#   (0, i, j, ...)   -> j-ésimo link de paginação da listagem (0, i), e assim por diante
+#   (1, n)           -> página do artista da n-ésima música encontrada
+# Por comparação de tuplas, a paginação de uma listagem vem logo depois dela e antes da
+# listagem seguinte, e todas as listagens vêm antes de qualquer página de artista.
+CLASSE_LISTAGEM = 0
+CLASSE_ARTISTA = 1
+
+def chave_musica(url, url_base=URL_BASE):
+    """Chave canônica 'artista/musica' de uma URL de letra, ou None se não for letra."""
+    partes = urlparse(url)
+    if partes.netloc and partes.netloc != urlparse(url_base).netloc:
+        return None
+    segmentos = [s for s in partes.path.lower().split('/') if s]
+    if len(segmentos) != 2:
+        return None
+    artista_slug, titulo_slug = segmentos
+    if artista_slug in SEGMENTOS_EXCLUIDOS or titulo_slug in SEGMENTOS_EXCLUIDOS:
+        return None
+    if titulo_slug.isdigit() or len(titulo_slug) <= 2 or '.' in titulo_slug:
+        return None
+    return f"{artista_slug}/{titulo_slug}"
+
+def url_da_chave(chave, url_base=URL_BASE):
+    return f"{url_base}/{chave}/"
+
+def eh_paginacao(url, url_listagem):
+    """True se a URL for outra página da mesma listagem (/2/, ?pagina=2, ...)."""
+    partes, base = urlparse(url), urlparse(url_listagem)
+    if partes.netloc != base.netloc:
+        return False
+    if partes.path == base.path:
+        return any(p in partes.query.lower() for p in ('pagina=', 'page='))
+    if not partes.path.startswith(base.path):
+        return False
+    return bool(PADRAO_PAGINACAO.match(partes.path[len(base.path):]))
+
+class DescobertaMusicas:
+    """
+    Percorre listagens de ranking, suas paginações e as páginas dos artistas
+    encontrados, baixando várias páginas em paralelo. As músicas saem como
+    (posicao, titulo, artista, url) pelo gerador assíncrono `musicas()`.
+
+    O download é concorrente, mas as páginas são processadas na ordem das suas
+    chaves (ranking e paginação, depois listagens secundárias, depois artistas):
+    a posição de cada música depende só da página onde aparece e do lugar nela,
+    nunca de qual download terminou primeiro.
+    """
+
+    def __init__(self, baixar, limitador, limite=1000, paginas_iniciais=None,
+                 concorrencia=4, seguir_artistas=True, max_paginas=200):
+        self.baixar = baixar
+        self.limitador = limitador
+        self.limite = limite
+        self.paginas_iniciais = paginas_iniciais or PAGINAS_INICIAIS_SERTANEJO
+        self.concorrencia = concorrencia
+        self.seguir_artistas = seguir_artistas
+        self.max_paginas = max_paginas
+        partes = urlparse(self.paginas_iniciais[0])
+        self.url_base = f"{partes.scheme}://{partes.netloc}"
+
+        self.chaves_vistas = set()
+        self.paginas_vistas = set()
+        self.encontradas = 0
+        self.paginas_baixadas = 0
+        self._pendentes = []   # heap das chaves agendadas e ainda não processadas
+        self._baixadas = {}    # chave -> (html, url, tipo, artista_slug), à espera da vez
+        self._iniciais_restantes = list(enumerate(self.paginas_iniciais))
+        self._artistas_adiados = []
+
+    def _liberar_proximas(self, fila):
+        """
+        Agenda a próxima etapa quando a atual terminou: cada listagem inicial só depois
+        da anterior e de toda a sua paginação; as páginas de artista só depois de todas
+        as listagens. Assim o ranking é baixado antes de qualquer página secundária.
+        """
+        while not self._pendentes and self.encontradas < self.limite:
+            if self._iniciais_restantes:
+                i, url = self._iniciais_restantes.pop(0)
+                self._agendar(fila, (CLASSE_LISTAGEM, i), url, 'listagem')
+            elif self._artistas_adiados:
+                for chave_pagina, url, artista_slug in self._artistas_adiados:
+                    self._agendar(fila, chave_pagina, url, 'artista', artista_slug)
+                self._artistas_adiados = []
+            else:
+                return
+
+    def _agendar(self, fila, chave_pagina, url, tipo, artista_slug=None):
+        if url in self.paginas_vistas or len(self.paginas_vistas) >= self.max_paginas:
+            return
+        self.paginas_vistas.add(url)
+        heapq.heappush(self._pendentes, chave_pagina)
+        fila.put_nowait((chave_pagina, url, tipo, artista_slug))
+
+    def _processar_pagina(self, html, url_pagina, tipo, artista_slug, chave_pagina, fila):
+        """Extrai músicas (na ordem da página), paginação e artistas dos links. Retorna as músicas novas."""
+        musicas = []
+        links_paginacao = 0
+        for href, _ in extrair_links(html):
+            if self.encontradas >= self.limite:
+                break
+            url = urljoin(url_pagina, href.split('#')[0])
+            chave = chave_musica(url, self.url_base)
+
+            if chave:
+                artista_da_musica = chave.split('/')[0]
+                # Em página de artista só vale a própria discografia
+                if tipo == 'artista' and artista_da_musica != artista_slug:
+                    continue
+                if chave in self.chaves_vistas:
+                    continue
+                self.chaves_vistas.add(chave)
+                self.encontradas += 1
+
+                titulo = chave.split('/')[1].replace('-', ' ').title()
+                artista = artista_da_musica.replace('-', ' ').title()
+                musicas.append((self.encontradas, titulo, artista, url_da_chave(chave, self.url_base)))
+
+                if self.seguir_artistas:
+                    self._artistas_adiados.append(((CLASSE_ARTISTA, self.encontradas),
+                                                   f"{self.url_base}/{artista_da_musica}/", artista_da_musica))
+            elif tipo == 'listagem' and eh_paginacao(url, url_pagina):
+                self._agendar(fila, chave_pagina + (links_paginacao,), url, 'listagem')
+                links_paginacao += 1
+        return musicas
+
+    async def _trabalhador(self, fila, resultados):
+        loop = asyncio.get_running_loop()
+        while True:
+            chave_pagina, url, tipo, artista_slug = await fila.get()
+            html = None
+            try:
+                if self.encontradas < self.limite:
+                    # O limitador é consultado dentro de `baixar`, só se a página não vier do cache
+                    html = await loop.run_in_executor(None, self.baixar, url, TTL_RANKING, self.limitador)
+                    self.paginas_baixadas += 1
+            except Exception as e:
+                print(f"   ⚠️ Erro ao processar listagem {url}: {e}")
+            finally:
+                resultados.put_nowait((chave_pagina, (html, url, tipo, artista_slug)))
+                fila.task_done()
+
+    async def musicas(self):
+        """Gerador assíncrono de (posicao, titulo, artista, url), em ordem de posição."""
+        fila = asyncio.PriorityQueue()     # Downloads: as chaves menores (mais urgentes) primeiro
+        resultados = asyncio.Queue()
+        self._liberar_proximas(fila)
+
+        trabalhadores = [asyncio.ensure_future(self._trabalhador(fila, resultados)) for _ in range(self.concorrencia)]
+        try:
+            while self._pendentes:
+                chave_pagina, pagina = await resultados.get()
+                self._baixadas[chave_pagina] = pagina
+                # Processa tudo o que já pode sair em ordem: nenhuma página ainda pendente
+                # (nem as que ela venha a agendar) tem chave menor que a do topo do heap
+                while self._pendentes and self._pendentes[0] in self._baixadas:
+                    chave_atual = heapq.heappop(self._pendentes)
+                    html, url, tipo, artista_slug = self._baixadas.pop(chave_atual)
+                    if not html or self.encontradas >= self.limite:
+                        continue
+                    try:
+                        musicas = self._processar_pagina(html, url, tipo, artista_slug, chave_atual, fila)
+                    except Exception as e:
+                        print(f"   ⚠️ Erro ao processar listagem {url}: {e}")
+                        continue
+                    for item in musicas:
+                        yield item
+                self._liberar_proximas(fila)
+        finally:
+            for tarefa in trabalhadores:
+                tarefa.cancel()
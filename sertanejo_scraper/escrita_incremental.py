@@ -0,0 +1,267 @@
+# ================================================================================
+# ESCRITA INCREMENTAL DAS MÚSICAS COLETADAS
+# Cada música vai para o disco assim que chega (CSV rotativo ou Parquet)
+# ================================================================================
+
+import csv
+import glob
+import json
+import os
+import re
+from collections import Counter
+
+COLUNAS_MUSICA = [
+    'ranking_posicao', 'titulo', 'artista', 'titulo_original', 'artista_original',
+    'letra', 'url', 'ano', 'coletado_em', 'contagem_palavras', 'contagem_linhas', 'fonte',
+    'duplicata_de'  # URL da versão canônica quando a letra é variante de outra (ver deduplicacao_letras)
+]
+COLUNAS_INTEIRAS = {'ranking_posicao', 'ano', 'contagem_palavras', 'contagem_linhas'}
+
+def proximo_caminho_livre(pasta, base_nome, extensao='.csv'):
+    """
+    '<base_nome>_N<extensao>' com N uma unidade acima do maior já usado na pasta
+    (inclusive '<base_nome>_N_parteK<extensao>' da escrita rotativa).
+    """
+    padrao = re.compile(rf'^{re.escape(base_nome)}_(\d+)(?:_parte\d+)?{re.escape(extensao)}$')
+    numeros = [0]
+    for caminho in glob.glob(os.path.join(pasta, f"{glob.escape(base_nome)}_*{extensao}")):
+        encontrado = padrao.match(os.path.basename(caminho))
+        if encontrado:
+            numeros.append(int(encontrado.group(1)))
+    return os.path.join(pasta, f"{base_nome}_{max(numeros) + 1}{extensao}")
+
+def _formatar(coluna, valor):
+    """Mesmo formato do DataFrame.to_csv usado antes (ano como float, nulos vazios)."""
+    if valor is None or valor == '':
+        return ''
+    if coluna == 'ano':
+        return repr(float(valor))
+    return valor
+
+class EscritorCSVIncremental:
+    """
+    Escreve um registro por linha e dá flush a cada música: uma queda perde no
+    máximo o registro que estava sendo escrito. Com `linhas_por_arquivo`, abre
+    um novo arquivo '<base>_parteN.csv' quando o atual enche.
+    """
+
+    def __init__(self, caminho, colunas=COLUNAS_MUSICA, linhas_por_arquivo=None):
+        self.caminho_base = caminho
+        self.colunas = colunas
+        self.linhas_por_arquivo = linhas_por_arquivo
+        self.arquivos = []
+        self.total_linhas = 0
+        self._arquivo = None
+        self._escritor = None
+        self._linhas_no_arquivo = 0
+
+    def _abrir_proximo(self):
+        self.fechar()
+        if self.linhas_por_arquivo:
+            raiz, extensao = os.path.splitext(self.caminho_base)
+            caminho = f"{raiz}_parte{len(self.arquivos) + 1}{extensao}"
+        else:
+            caminho = self.caminho_base
+        self._arquivo = open(caminho, 'w', newline='', encoding='utf-8')
+        self._escritor = csv.writer(self._arquivo)
+        self._escritor.writerow(self.colunas)
+        self._linhas_no_arquivo = 0
+        self.arquivos.append(caminho)
+
+    def escrever(self, registro):
+        if self._arquivo is None or (self.linhas_por_arquivo and self._linhas_no_arquivo >= self.linhas_por_arquivo):
+            self._abrir_proximo()
+        self._escritor.writerow([_formatar(coluna, registro.get(coluna)) for coluna in self.colunas])
+        self._arquivo.flush()
+        self._linhas_no_arquivo += 1
+        self.total_linhas += 1
+
+    def fechar(self):
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
+
+class EscritorParquetIncremental:
+    """
+    Grava um dataset Parquet: uma pasta com um arquivo fechado por grupo de
+    `linhas_por_grupo` registros (`parte_00001.parquet`, ...), legível com
+    pd.read_parquet(pasta) mesmo que a coleta pare no meio.
+
+    Enquanto o grupo não fecha, cada registro também vai (com flush) para
+    `_pendentes.jsonl` na mesma pasta: uma queda perde no máximo o registro que
+    estava sendo escrito. Ao reabrir a pasta, os pendentes viram a próxima parte.
+    """
+
+    NOME_PENDENTES = '_pendentes.jsonl'  # Começa com '_': o leitor de datasets ignora
+
+    def __init__(self, caminho, colunas=COLUNAS_MUSICA, linhas_por_grupo=100):
+        import pyarrow as pa  # Dependência opcional, só para o formato Parquet
+        import pyarrow.parquet as pq
+        self._pa = pa
+        self._pq = pq
+        self.caminho = caminho
+        self.colunas = colunas
+        self.linhas_por_grupo = linhas_por_grupo
+        self.arquivos = [caminho]
+        self.total_linhas = 0
+        self._esquema = pa.schema([
+            (coluna, pa.int64() if coluna in COLUNAS_INTEIRAS else pa.string())
+            for coluna in colunas
+        ])
+        os.makedirs(caminho, exist_ok=True)
+        partes = glob.glob(os.path.join(caminho, "parte_*.parquet"))
+        self._numero_parte = max((int(os.path.basename(p)[6:11]) for p in partes), default=0) + 1
+        self._caminho_pendentes = os.path.join(caminho, self.NOME_PENDENTES)
+        self._buffer = self._ler_pendentes()
+        self._pendentes = None
+        self._iniciar_pendentes()
+
+    def _ler_pendentes(self):
+        """Registros de uma execução interrompida antes de fechar o grupo."""
+        if not os.path.exists(self._caminho_pendentes):
+            return []
+        with open(self._caminho_pendentes, 'r', encoding='utf-8') as f:
+            linhas = f.read().split('\n')
+        try:
+            cabecalho = json.loads(linhas[0])
+        except ValueError:
+            return []
+        if os.path.exists(self._caminho_parte(cabecalho['parte'])):
+            return []  # A parte foi gravada; só faltou zerar os pendentes
+        registros = []
+        for linha in linhas[1:]:
+            try:
+                registros.append(self._linha(json.loads(linha)))
+            except ValueError:
+                break  # Última linha cortada no meio (ou a linha vazia do fim)
+        return registros
+
+    def _caminho_parte(self, numero):
+        return os.path.join(self.caminho, f"parte_{numero:05d}.parquet")
+
+    def _iniciar_pendentes(self):
+        """Recomeça o arquivo de pendentes com o grupo atual (temporário + os.replace)."""
+        if self._pendentes is not None:
+            self._pendentes.close()
+        temporario = self._caminho_pendentes + '.tmp'
+        with open(temporario, 'w', encoding='utf-8') as f:
+            # O cabeçalho diz a que parte os pendentes pertencem (ver _ler_pendentes)
+            f.write(json.dumps({'parte': self._numero_parte}) + '\n')
+            for registro in self._buffer:
+                f.write(json.dumps(registro, ensure_ascii=False) + '\n')
+        os.replace(temporario, self._caminho_pendentes)
+        self._pendentes = open(self._caminho_pendentes, 'a', encoding='utf-8')
+
+    def _linha(self, registro):
+        return {coluna: registro.get(coluna) for coluna in self.colunas}
+
+    def escrever(self, registro):
+        linha = self._linha(registro)
+        self._pendentes.write(json.dumps(linha, ensure_ascii=False) + '\n')
+        self._pendentes.flush()
+        self._buffer.append(linha)
+        self.total_linhas += 1
+        if len(self._buffer) >= self.linhas_por_grupo:
+            self._descarregar()
+
+    def _descarregar(self):
+        if not self._buffer:
+            return
+        tabela = self._pa.Table.from_pylist(self._buffer, schema=self._esquema)
+        caminho = self._caminho_parte(self._numero_parte)
+        # Temporário + os.replace: a parte só aparece completa, com o rodapé Parquet
+        self._pq.write_table(tabela, caminho + '.tmp')
+        os.replace(caminho + '.tmp', caminho)
+        self._numero_parte += 1
+        self._buffer = []
+        self._iniciar_pendentes()
+
+    def fechar(self):
+        if self._pendentes is None:
+            return
+        self._descarregar()
+        self._pendentes.close()
+        self._pendentes = None
+        os.remove(self._caminho_pendentes)
+
+def criar_escritor(pasta, base_nome, formato='csv', linhas_por_arquivo=None):
+    """Escolhe o próximo nome livre e devolve o escritor do formato pedido."""
+    if formato == 'parquet':
+        # Datasets de coletas interrompidas: os registros pendentes viram a última parte
+        for pendentes in glob.glob(os.path.join(pasta, f"{glob.escape(base_nome)}_*.parquet",
+                                                EscritorParquetIncremental.NOME_PENDENTES)):
+            EscritorParquetIncremental(os.path.dirname(pendentes)).fechar()
+        return EscritorParquetIncremental(proximo_caminho_livre(pasta, base_nome, '.parquet'))
+    if formato == 'csv':
+        return EscritorCSVIncremental(proximo_caminho_livre(pasta, base_nome, '.csv'),
+                                      linhas_por_arquivo=linhas_por_arquivo)
+    raise ValueError(f"Formato desconhecido: {formato} (use 'csv' ou 'parquet')")
+
+class SaidaColeta:
+    """
+    Destino das músicas coletadas: repassa cada registro ao escritor e guarda
+    só os contadores usados no resumo final, nunca os registros em si.
+    """
+
+    def __init__(self, escritor):
+        self.escritor = escritor
+        self.quantidade = 0
+        self.total_palavras = 0
+        self.anos = Counter()
+
+    def adicionar(self, dados):
+        self.escritor.escrever(dados)
+        self.quantidade += 1
+        self.total_palavras += dados.get('contagem_palavras') or 0
+        if dados.get('ano') is not None:
+            self.anos[dados['ano']] += 1
+
+    @property
+    def arquivos(self):
+        return self.escritor.arquivos
+
+    def fechar(self):
+        self.escritor.fechar()
+
+    def __len__(self):
+        return self.quantidade
+
+class SaidaParticionada:
+    """
+    Uma SaidaColeta por partição (ex.: gênero), aberta na primeira música
+    daquela partição. Expõe os mesmos contadores somados de todas elas.
+    """
+
+    def __init__(self, abrir_particao, particao_de):
+        self.abrir_particao = abrir_particao
+        self.particao_de = particao_de
+        self.particoes = {}
+
+    def adicionar(self, dados):
+        particao = self.particao_de(dados)
+        if particao not in self.particoes:
+            self.particoes[particao] = self.abrir_particao(particao)
+        self.particoes[particao].adicionar(dados)
+
+    @property
+    def quantidade(self):
+        return sum(len(saida) for saida in self.particoes.values())
+
+    @property
+    def total_palavras(self):
+        return sum(saida.total_palavras for saida in self.particoes.values())
+
+    @property
+    def anos(self):
+        return sum((saida.anos for saida in self.particoes.values()), Counter())
+
+    @property
+    def arquivos(self):
+        return [arquivo for saida in self.particoes.values() for arquivo in saida.arquivos]
+
+    def fechar(self):
+        for saida in self.particoes.values():
+            saida.fechar()
+
+    def __len__(self):
+        return self.quantidade
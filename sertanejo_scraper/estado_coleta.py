@@ -0,0 +1,90 @@
+# ================================================================================
+# DIÁRIO DA COLETA (SQLite)
+# Estado por música (pendente/concluida/falha) para retomar coletas interrompidas
+# ================================================================================
+
+import json
+import sqlite3
+from collections import Counter
+from datetime import datetime
+
+CAMINHO_DIARIO_PADRAO = "../base_de_dados/estado_coleta.sqlite"
+
+PENDENTE = 'pendente'
+CONCLUIDA = 'concluida'
+FALHA = 'falha'
+
+class DiarioColeta:
+    """Registro durável do estado de cada música, indexado pela URL."""
+
+    def __init__(self, caminho=CAMINHO_DIARIO_PADRAO):
+        self.caminho = caminho
+        self.conexao = sqlite3.connect(caminho)
+        # WAL: cada atualização é um append no log, sem reescrever o banco
+        self.conexao.execute("PRAGMA journal_mode=WAL")
+        self.conexao.execute("PRAGMA synchronous=NORMAL")
+        self.conexao.execute("""
+            CREATE TABLE IF NOT EXISTS musicas (
+                url TEXT PRIMARY KEY,
+                posicao INTEGER,
+                titulo TEXT,
+                artista TEXT,
+                status TEXT NOT NULL,
+                tentativas INTEGER NOT NULL DEFAULT 0,
+                motivo TEXT,
+                dados TEXT,
+                atualizado_em TEXT
+            )
+        """)
+        self.conexao.commit()
+
+    def registrar_pendentes(self, itens):
+        """Registra (url, posicao, titulo, artista) ainda desconhecidos como pendentes."""
+        agora = datetime.now().isoformat()
+        self.conexao.executemany(
+            "INSERT OR IGNORE INTO musicas (url, posicao, titulo, artista, status, atualizado_em) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(url, posicao, titulo, artista, PENDENTE, agora) for url, posicao, titulo, artista in itens]
+        )
+        self.conexao.commit()
+
+    def urls_concluidas(self):
+        """Conjunto das URLs já concluídas (só as chaves, sem os dados)."""
+        return {url for url, in self.conexao.execute("SELECT url FROM musicas WHERE status = ?", (CONCLUIDA,))}
+
+    def iterar_concluidas(self, urls=None):
+        """Gera (url, dados_musica) das concluídas lendo o cursor aos poucos (opcionalmente filtradas)."""
+        cursor = self.conexao.execute("SELECT url, dados FROM musicas WHERE status = ?", (CONCLUIDA,))
+        filtro = set(urls) if urls is not None else None
+        for url, dados in cursor:
+            if filtro is None or url in filtro:
+                yield url, json.loads(dados)
+
+    def obter_concluida(self, url):
+        """Retorna os dados_musica da URL se ela já foi concluída, senão None."""
+        linha = self.conexao.execute(
+            "SELECT dados FROM musicas WHERE url = ? AND status = ?", (url, CONCLUIDA)
+        ).fetchone()
+        return json.loads(linha[0]) if linha else None
+
+    def marcar_concluida(self, url, dados):
+        self._atualizar(url, CONCLUIDA, None, json.dumps(dados, ensure_ascii=False))
+
+    def marcar_falha(self, url, motivo):
+        self._atualizar(url, FALHA, motivo, None)
+
+    def _atualizar(self, url, status, motivo, dados):
+        """Atualiza uma única linha: custo constante por música."""
+        self.conexao.execute(
+            "UPDATE musicas SET status = ?, motivo = ?, dados = ?, tentativas = tentativas + 1, "
+            "atualizado_em = ? WHERE url = ?",
+            (status, motivo, dados, datetime.now().isoformat(), url)
+        )
+        self.conexao.commit()
+
+    def resumo(self):
+        """Contagem de músicas por status."""
+        return Counter(dict(self.conexao.execute("SELECT status, COUNT(*) FROM musicas GROUP BY status")))
+
+    def fechar(self):
+        self.conexao.close()
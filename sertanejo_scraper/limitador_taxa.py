@@ -0,0 +1,136 @@
+# ================================================================================
+# LIMITADOR DE TAXA POR HOST
+# Garante o orçamento de requisições por segundo na coleta concorrente
+# ================================================================================
+
+import asyncio
+import threading
+import time
+from urllib.parse import urlparse
+
+from metricas import metricas
+
+class LimitadorTaxa:
+    """Espaça as requisições de cada host para respeitar um limite de req/s."""
+
+    def __init__(self, requisicoes_por_segundo=2.0):
+        self.requisicoes_por_segundo = requisicoes_por_segundo
+        self._proxima_liberacao = {}  # host -> instante (monotonic) da próxima vaga
+        self._lock_vagas = threading.Lock()  # aguardar_sincrono roda nas threads de download
+
+    def taxa(self, host):
+        """Limite de req/s em vigor para o host."""
+        return self.requisicoes_por_segundo
+
+    def _reservar(self, url):
+        """Reserva a próxima vaga do host e retorna quantos segundos faltam para ela."""
+        host = urlparse(url).netloc
+        with self._lock_vagas:
+            agora = time.monotonic()
+            liberacao = max(agora, self._proxima_liberacao.get(host, agora))
+            # Reserva a vaga antes de dormir, assim tarefas concorrentes entram em fila
+            self._proxima_liberacao[host] = liberacao + 1.0 / self.taxa(host)
+        return liberacao - agora
+
+    async def aguardar(self, url):
+        """Aguarda até que exista vaga no orçamento do host da URL."""
+        espera = self._reservar(url)
+        if espera > 0:
+            await asyncio.sleep(espera)
+
+    def aguardar_sincrono(self, url):
+        """Mesmo espaçamento de `aguardar`, para código bloqueante (baixar_pagina, nas threads)."""
+        espera = self._reservar(url)
+        if espera > 0:
+            time.sleep(espera)
+
+    def registrar(self, url, latencia=None, status=None):
+        """
+        Resultado de uma requisição que este limitador espaçou (cada tentativa, inclusive
+        as refeitas). `status` None indica erro de rede. A taxa fixa ignora.
+        """
+
+    def descricao(self):
+        return f"{self.requisicoes_por_segundo:.2f} req/s"
+
+def _congestionado(status):
+    return status is None or status == 429 or status >= 500
+
+class LimitadorAdaptativo(LimitadorTaxa):
+    """
+    Limite de req/s por host ajustado em AIMD (como o controle de congestionamento do TCP):
+    - aumento aditivo: +`incremento` req/s a cada rodada de respostas saudáveis;
+    - redução multiplicativa: taxa * `fator_reducao` em 429, 5xx, erro de rede
+      ou latência acima de `tolerancia_latencia` vezes a melhor latência vista
+      (latências abaixo de `latencia_aceitavel` segundos nunca contam como lentidão).
+    Depois de uma redução, espera `intervalo_reducao` segundos antes de reduzir de
+    novo, para que as requisições que já estavam em voo não derrubem a taxa em cascata.
+    """
+
+    def __init__(self, requisicoes_por_segundo=2.0, taxa_minima=0.2, taxa_maxima=10.0,
+                 incremento=0.25, fator_reducao=0.5, tolerancia_latencia=3.0, latencia_aceitavel=1.0,
+                 intervalo_reducao=5.0):
+        super().__init__(requisicoes_por_segundo)
+        self.taxa_minima = taxa_minima
+        self.taxa_maxima = taxa_maxima
+        self.incremento = incremento
+        self.fator_reducao = fator_reducao
+        self.tolerancia_latencia = tolerancia_latencia
+        self.latencia_aceitavel = latencia_aceitavel
+        self.intervalo_reducao = intervalo_reducao
+
+        self._lock = threading.Lock()  # registrar() roda nas threads de download
+        self._taxas = {}                # host -> req/s atual
+        self._latencia_media = {}       # host -> média móvel exponencial da latência
+        self._latencia_base = {}        # host -> menor média móvel observada
+        self._saudaveis = {}            # host -> respostas saudáveis desde o último ajuste
+        self._ultima_reducao = {}       # host -> instante (monotonic) da última redução
+        self.reducoes = 0
+
+    def taxa(self, host):
+        return self._taxas.get(host, self.requisicoes_por_segundo)
+
+    def registrar(self, url, latencia=None, status=None):
+        host = urlparse(url).netloc
+        with self._lock:
+            taxa = self.taxa(host)
+            if _congestionado(status):
+                self._reduzir(host, taxa)
+                return
+
+            if latencia is not None:
+                media = self._latencia_media.get(host)
+                media = latencia if media is None else 0.8 * media + 0.2 * latencia
+                self._latencia_media[host] = media
+                base = min(self._latencia_base.get(host, media), media)
+                self._latencia_base[host] = base
+                if media > max(base * self.tolerancia_latencia, self.latencia_aceitavel):
+                    self._reduzir(host, taxa)
+                    return
+
+            # Uma "rodada" = tantas respostas quanto a taxa atual (~1 s de tráfego)
+            self._saudaveis[host] = self._saudaveis.get(host, 0) + 1
+            if self._saudaveis[host] >= max(1, int(taxa)):
+                self._saudaveis[host] = 0
+                self._taxas[host] = min(self.taxa_maxima, taxa + self.incremento)
+                metricas.definir('taxa_req_s', self._taxas[host], rotulo=host)
+
+    def _reduzir(self, host, taxa):
+        agora = time.monotonic()
+        if agora - self._ultima_reducao.get(host, float('-inf')) < self.intervalo_reducao:
+            return
+        self._ultima_reducao[host] = agora
+        self._saudaveis[host] = 0
+        self._taxas[host] = max(self.taxa_minima, taxa * self.fator_reducao)
+        metricas.definir('taxa_req_s', self._taxas[host], rotulo=host)
+        metricas.incrementar('reducoes_taxa', rotulo=host)
+        # A latência de referência recomeça da média atual, senão a taxa nunca volta a subir
+        if host in self._latencia_media:
+            self._latencia_base[host] = self._latencia_media[host]
+        self.reducoes += 1
+
+    def descricao(self):
+        if not self._taxas:
+            return f"{self.requisicoes_por_segundo:.2f} req/s (adaptativo)"
+        taxas = ', '.join(f"{taxa:.2f}" for taxa in self._taxas.values())
+        return f"{taxas} req/s (adaptativo, {self.reducoes} reduções)"
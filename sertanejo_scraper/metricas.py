@@ -0,0 +1,197 @@
+# ================================================================================
+# MÉTRICAS DA COLETA
+# Histogramas de latência por etapa, contadores de bytes/falhas e endpoint local
+# ================================================================================
+
+import bisect
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Limites dos buckets em segundos (mesmo esquema cumulativo do Prometheus)
+BUCKETS_PADRAO = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Etapas medidas. DNS, TCP e TLS ficam dentro de 'rede_ttfb': o requests não
+# expõe esses tempos separados, e com keep-alive só a primeira requisição de
+# cada conexão paga por eles.
+ETAPAS = {
+    'espera_limitador': 'Espera por vaga no limite de req/s do host',
+    'cache_leitura': 'Leitura da página no cache em disco',
+    'rede_ttfb': 'Envio da requisição até os headers da resposta (inclui DNS/TLS)',
+    'rede_download': 'Download do corpo da resposta',
+    'parse_html': 'Extração de título, letra e JSON-LD do HTML',
+    'parse_bs4': 'Montagem da árvore BeautifulSoup em fazer_request',
+    'limpar_letra': 'Normalização do texto da letra',
+    'extrair_ano': 'Leitura do ano no JSON-LD',
+    'musica_total': 'Tempo total de extrair_letra_completa_corrigida',
+}
+
+class Histograma:
+    """Contagem por bucket, soma e total de observações."""
+
+    def __init__(self, limites=BUCKETS_PADRAO):
+        self.limites = limites
+        self.contagens = [0] * (len(limites) + 1)  # Último bucket: +Inf
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        self.contagens[bisect.bisect_left(self.limites, valor)] += 1
+        self.soma += valor
+        self.total += 1
+
+    def percentil(self, p):
+        """Estimativa pelo limite superior do bucket que contém o percentil."""
+        if not self.total:
+            return 0.0
+        alvo = p / 100 * self.total
+        acumulado = 0
+        for limite, contagem in zip(self.limites + (float('inf'),), self.contagens):
+            acumulado += contagem
+            if acumulado >= alvo:
+                return limite
+        return float('inf')
+
+    def resumo(self):
+        return {
+            'total': self.total,
+            'soma_s': round(self.soma, 4),
+            'media_s': round(self.soma / self.total, 4) if self.total else 0.0,
+            'p50_s': self.percentil(50),
+            'p95_s': self.percentil(95),
+            'p99_s': self.percentil(99),
+        }
+
+def _agrupar_por_nome(valores):
+    """{(nome, rotulo): v} -> {nome: v} sem rótulo ou {nome: {rotulo: v}}."""
+    agrupados = {}
+    for (nome, rotulo), valor in sorted(valores.items(), key=lambda x: (x[0][0], str(x[0][1]))):
+        if rotulo is None:
+            agrupados[nome] = valor
+        else:
+            agrupados.setdefault(nome, {})[rotulo] = valor
+    return agrupados
+
+class Metricas:
+    """Registro de métricas seguro entre threads (uma instância global por coleta)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.inicio = time.time()
+        self.histogramas = {}
+        self.contadores = {}  # (nome, rotulo) -> valor
+        self.medidores = {}   # (nome, rotulo) -> último valor (ex.: taxa atual de req/s)
+
+    def observar(self, etapa, segundos):
+        with self._lock:
+            if etapa not in self.histogramas:
+                self.histogramas[etapa] = Histograma()
+            self.histogramas[etapa].observar(segundos)
+
+    @contextmanager
+    def cronometrar(self, etapa):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(etapa, time.perf_counter() - inicio)
+
+    def incrementar(self, nome, valor=1, rotulo=None):
+        with self._lock:
+            chave = (nome, rotulo)
+            self.contadores[chave] = self.contadores.get(chave, 0) + valor
+
+    def definir(self, nome, valor, rotulo=None):
+        with self._lock:
+            self.medidores[(nome, rotulo)] = valor
+
+    def contador(self, nome, rotulo=None):
+        return self.contadores.get((nome, rotulo), 0)
+
+    def resumo(self):
+        """Dicionário pronto para JSON: histogramas por etapa e contadores por rótulo."""
+        with self._lock:
+            return {
+                'duracao_s': round(time.time() - self.inicio, 2),
+                'etapas': {etapa: h.resumo() for etapa, h in self.histogramas.items()},
+                'contadores': _agrupar_por_nome(self.contadores),
+                'medidores': _agrupar_por_nome(self.medidores),
+            }
+
+    def linha_progresso(self):
+        """Mediana das etapas principais, para a linha de progresso."""
+        partes = []
+        for etapa in ('espera_limitador', 'rede_ttfb', 'rede_download', 'parse_html', 'limpar_letra'):
+            histograma = self.histogramas.get(etapa)
+            if histograma and histograma.total:
+                partes.append(f"{etapa} p50={histograma.percentil(50)*1000:.0f}ms")
+        return ' | '.join(partes)
+
+    def formato_prometheus(self):
+        """Texto no formato de exposição do Prometheus."""
+        linhas = []
+        with self._lock:
+            linhas.append('# TYPE coleta_etapa_segundos histogram')
+            for etapa, h in self.histogramas.items():
+                acumulado = 0
+                for limite, contagem in zip(h.limites + (float('inf'),), h.contagens):
+                    acumulado += contagem
+                    le = '+Inf' if limite == float('inf') else repr(limite)
+                    linhas.append(f'coleta_etapa_segundos_bucket{{etapa="{etapa}",le="{le}"}} {acumulado}')
+                linhas.append(f'coleta_etapa_segundos_sum{{etapa="{etapa}"}} {h.soma}')
+                linhas.append(f'coleta_etapa_segundos_count{{etapa="{etapa}"}} {h.total}')
+            for tipo, valores in (('counter', self.contadores), ('gauge', self.medidores)):
+                for nome in sorted({nome for nome, _ in valores}):
+                    linhas.append(f'# TYPE coleta_{nome} {tipo}')
+                    for (n, rotulo), valor in valores.items():
+                        if n != nome:
+                            continue
+                        sufixo = f'{{rotulo="{rotulo}"}}' if rotulo is not None else ''
+                        linhas.append(f'coleta_{nome}{sufixo} {valor}')
+        return '\n'.join(linhas) + '\n'
+
+    def salvar_resumo(self, caminho, extras=None):
+        dados = self.resumo()
+        dados.update(extras or {})
+        with open(caminho, 'w', encoding='utf-8') as f:
+            json.dump(dados, f, ensure_ascii=False, indent=2)
+        return caminho
+
+    def imprimir_tabela(self):
+        """Tabela das etapas ordenada pelo tempo total gasto."""
+        etapas = sorted(self.histogramas.items(), key=lambda x: -x[1].soma)
+        if not etapas:
+            return
+        print(f"\n⏱️  TEMPO POR ETAPA:")
+        print(f"   {'etapa':<18} {'n':>6} {'total':>9} {'média':>9} {'p50':>8} {'p95':>8}")
+        for etapa, h in etapas:
+            r = h.resumo()
+            print(f"   {etapa:<18} {r['total']:>6} {r['soma_s']:>8.1f}s {r['media_s']*1000:>7.0f}ms "
+                  f"{r['p50_s']*1000:>6.0f}ms {r['p95_s']*1000:>6.0f}ms")
+
+metricas = Metricas()
+
+class _TratadorMetricas(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip('/') not in ('', '/metrics'):
+            self.send_response(404)
+            self.end_headers()
+            return
+        corpo = metricas.formato_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass  # Sem log de acesso no meio do progresso da coleta
+
+def iniciar_servidor_metricas(porta=9108, endereco='127.0.0.1'):
+    """Serve /metrics numa thread daemon enquanto a coleta roda. Retorna o servidor."""
+    servidor = ThreadingHTTPServer((endereco, porta), _TratadorMetricas)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    print(f"📡 Métricas em http://{endereco}:{servidor.server_port}/metrics")
+    return servidor
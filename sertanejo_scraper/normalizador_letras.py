@@ -0,0 +1,40 @@
+# ================================================================================
+# NORMALIZADOR DE LETRAS
+# Regex única pré-compilada no lugar da cadeia de re.sub do limpar_letra
+# ================================================================================
+
+import re
+
+MINUSCULAS = 'a-záéíóúçãõâêôà'
+MAIUSCULAS = 'A-ZÁÉÍÓÚÇÃÕÂÊÔÀ'
+
+# Pontos onde entra um espaço entre palavras grudadas (passos 1 a 5 do limpar_letra antigo):
+# - minúscula + maiúscula ("amorQue" -> "amor Que")
+# - pontuação + maiúscula ("fim.Começo" -> "fim. Começo")
+# - sigla/número + palavra ("IPVAQuem" -> "IPVA Quem", "2024Amor" -> "2024 Amor")
+# O lookahead da maiúscula vem primeiro: nas demais posições a regex desiste logo.
+PADRAO_JUNCAO = re.compile(
+    rf'(?=[{MAIUSCULAS}])'
+    rf'(?:(?<=[{MINUSCULAS}.!?;:])'
+    rf'|(?<=[0-9{MAIUSCULAS}]{{2}})(?=[{MAIUSCULAS}][{MINUSCULAS}]))'
+)
+
+def _normalizar_espacos(texto):
+    """Um verso por linha, sem linhas vazias e com espaços simples (split/join em C)."""
+    versos = (' '.join(linha.split()) for linha in texto.split('\n'))
+    return '\n'.join(verso for verso in versos if verso)
+
+def normalizar_letra(letra_bruta):
+    """
+    Limpa o texto da letra em uma passada de regex, mantendo um verso por linha.
+
+    Equivale ao limpar_letra antigo, exceto que as quebras de linha são
+    preservadas (o antigo transformava tudo em uma linha só).
+    """
+    if not letra_bruta:
+        return ""
+    return _normalizar_espacos(PADRAO_JUNCAO.sub(' ', letra_bruta))
+
+def normalizar_letras(serie):
+    """Versão em lote para uma Series do pandas (valores nulos viram "")."""
+    return serie.fillna('').astype(str).str.replace(PADRAO_JUNCAO, ' ', regex=True).map(_normalizar_espacos)
@@ -0,0 +1,131 @@
+# ================================================================================
+# PARSER DAS PÁGINAS DE LETRA
+# Backend em C (selectolax) com BeautifulSoup como alternativa
+# ================================================================================
+
+from bs4 import BeautifulSoup
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # selectolax é opcional
+    LexborHTMLParser = None
+
+try:
+    import lxml  # noqa: F401 - só para saber se o BeautifulSoup pode usar o parser em C
+    PARSER_BS4 = 'lxml'
+except ImportError:
+    PARSER_BS4 = 'html.parser'
+
+BACKENDS = ('selectolax', 'bs4')
+BACKEND_PADRAO = 'selectolax' if LexborHTMLParser is not None else 'bs4'
+
+# Seletores da letra em ordem de preferência
+SELETORES_LETRA = [
+    '.lyric-original',
+    '[class*="lyric"]',
+    'div.lyric',
+    '.letra'
+]
+
+SELETOR_JSONLD = 'script[type="application/ld+json"]'
+
+def extrair_campos_pagina(html, backend=None):
+    """
+    Extrai de uma vez tudo o que o scraper usa da página de uma letra.
+
+    Retorna um dict com 'titulo', 'artista_href', 'artista_texto', 'letra_bruta'
+    e 'jsonld' (lista com o texto de cada script JSON-LD). Campos não
+    encontrados ficam como None.
+    """
+    backend = backend or BACKEND_PADRAO
+    if backend == 'selectolax':
+        if LexborHTMLParser is None:
+            raise ImportError("selectolax não está instalado (pip install selectolax)")
+        return _extrair_selectolax(html)
+    if backend == 'bs4':
+        return _extrair_bs4(html)
+    raise ValueError(f"Backend desconhecido: {backend} (opções: {', '.join(BACKENDS)})")
+
+def _campos_vazios():
+    return {'titulo': None, 'artista_href': None, 'artista_texto': None, 'letra_bruta': None, 'jsonld': []}
+
+def _extrair_bs4(html):
+    """Caminho original: árvore completa do BeautifulSoup."""
+    soup = BeautifulSoup(html, PARSER_BS4)
+    campos = _campos_vazios()
+
+    titulo_elem = soup.find('h1', class_='textStyle-primary') or soup.find('h1')
+    if titulo_elem:
+        campos['titulo'] = titulo_elem.get_text(strip=True)
+        artista_elem = titulo_elem.find_next('a')
+        if artista_elem:
+            campos['artista_href'] = artista_elem.get('href', '')
+            campos['artista_texto'] = artista_elem.get_text(strip=True)
+
+    letra_elem = None
+    for seletor in SELETORES_LETRA:
+        letra_elem = soup.select_one(seletor)
+        if letra_elem and len(letra_elem.get_text().strip()) > 100:
+            break
+    if letra_elem:
+        campos['letra_bruta'] = letra_elem.get_text()
+
+    campos['jsonld'] = [script.string for script in soup.select(SELETOR_JSONLD) if script.string]
+    return campos
+
+def _extrair_selectolax(html):
+    """Parser lexbor (C): uma única análise do HTML e seletores CSS nativos."""
+    arvore = LexborHTMLParser(html)
+    campos = _campos_vazios()
+
+    titulo_elem = arvore.css_first('h1.textStyle-primary') or arvore.css_first('h1')
+    if titulo_elem:
+        campos['titulo'] = _texto_strip(titulo_elem)
+        artista_elem = _proximo_link(titulo_elem)
+        if artista_elem:
+            campos['artista_href'] = artista_elem.attributes.get('href') or ''
+            campos['artista_texto'] = _texto_strip(artista_elem)
+
+    letra_elem = None
+    for seletor in SELETORES_LETRA:
+        letra_elem = arvore.css_first(seletor)
+        if letra_elem and len(letra_elem.text().strip()) > 100:
+            break
+    if letra_elem:
+        campos['letra_bruta'] = letra_elem.text()
+
+    campos['jsonld'] = [script.text() for script in arvore.css(SELETOR_JSONLD) if script.text()]
+    return campos
+
+def _texto_strip(node):
+    """Equivalente ao get_text(strip=True) do BeautifulSoup."""
+    return ''.join(parte.strip() for parte in node.text(deep=True, separator='\x00').split('\x00'))
+
+def _proximo_link(node):
+    """Equivalente ao find_next('a'): primeiro <a> depois do nó em ordem de documento."""
+    # Descendentes do próprio nó vêm primeiro
+    for filho in node.traverse(include_text=False):
+        if filho.tag == 'a' and filho.mem_id != node.mem_id:
+            return filho
+    atual = node
+    while atual is not None:
+        irmao = atual.next
+        while irmao is not None:
+            if irmao.tag == 'a':
+                return irmao
+            if irmao.tag != '-text':
+                encontrado = irmao.css_first('a')
+                if encontrado:
+                    return encontrado
+            irmao = irmao.next
+        atual = atual.parent
+    return None
+
+def extrair_links(html, backend=None):
+    """Retorna a lista de (href, texto) de todos os links <a href> da página."""
+    backend = backend or BACKEND_PADRAO
+    if backend == 'selectolax' and LexborHTMLParser is not None:
+        arvore = LexborHTMLParser(html)
+        return [(link.attributes.get('href') or '', _texto_strip(link)) for link in arvore.css('a[href]')]
+    soup = BeautifulSoup(html, PARSER_BS4)
+    return [(link.get('href', ''), link.get_text(strip=True)) for link in soup.find_all('a', href=True)]
@@ -0,0 +1,220 @@
+# ================================================================================
+# FIXTURES HTML E SERVIDOR DE REPLAY
+# Páginas salvas servidas localmente, com latência e erros configuráveis
+# ================================================================================
+
+import gzip
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from cache_http import PASTA_CACHE_PADRAO
+
+PASTA_FIXTURES_PADRAO = "../base_de_dados/fixtures_html"
+
+def caminho_da_url(url):
+    """Parte da URL usada como chave da fixture (sem esquema e host)."""
+    partes = urlparse(url)
+    return partes.path + (f"?{partes.query}" if partes.query else '')
+
+class FixturesHTML:
+    """
+    Páginas HTML gravadas em disco (gzip), indexadas pelo caminho da URL.
+    O host fica de fora da chave: as mesmas páginas servem para o site real
+    e para o servidor local de replay.
+    """
+
+    def __init__(self, pasta=PASTA_FIXTURES_PADRAO):
+        self.pasta = pasta
+        self.caminho_indice = os.path.join(pasta, 'indice.json')
+        os.makedirs(os.path.join(pasta, 'paginas'), exist_ok=True)
+        self.indice = {}
+        if os.path.exists(self.caminho_indice):
+            with open(self.caminho_indice, 'r', encoding='utf-8') as f:
+                self.indice = json.load(f)
+
+    def __len__(self):
+        return len(self.indice)
+
+    def caminhos(self):
+        return list(self.indice)
+
+    def gravar(self, url, corpo, salvar_indice=True):
+        caminho = caminho_da_url(url)
+        arquivo = hashlib.sha256(caminho.encode('utf-8')).hexdigest() + '.html.gz'
+        with open(os.path.join(self.pasta, 'paginas', arquivo), 'wb') as f:
+            f.write(gzip.compress(corpo, compresslevel=6))
+        self.indice[caminho] = {'arquivo': arquivo, 'url': url}
+        if salvar_indice:
+            self.salvar_indice()
+
+    def ler(self, caminho):
+        """Corpo da página pelo caminho ('/artista/musica/'), ou None."""
+        item = self.indice.get(caminho)
+        if item is None:
+            return None
+        with open(os.path.join(self.pasta, 'paginas', item['arquivo']), 'rb') as f:
+            return gzip.decompress(f.read())
+
+    def salvar_indice(self):
+        temporario = self.caminho_indice + '.tmp'
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(self.indice, f, ensure_ascii=False, indent=1)
+        os.replace(temporario, self.caminho_indice)
+
+    def importar_do_cache(self, pasta_cache=PASTA_CACHE_PADRAO):
+        """Copia para as fixtures as páginas que o cache HTTP já guardou numa coleta real."""
+        importadas = 0
+        for raiz, _, arquivos in os.walk(pasta_cache):
+            for nome in arquivos:
+                if not nome.endswith('.json'):
+                    continue
+                with open(os.path.join(raiz, nome), 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+                caminho_html = os.path.join(raiz, nome[:-len('.json')] + '.html.gz')
+                if 'url' not in meta or not os.path.exists(caminho_html):
+                    continue
+                with open(caminho_html, 'rb') as f:
+                    self.gravar(meta['url'], gzip.decompress(f.read()), salvar_indice=False)
+                importadas += 1
+        self.salvar_indice()
+        return importadas
+
+    def gravar_urls(self, urls, baixar):
+        """Modo gravação: baixa cada URL com `baixar(url)` (ex.: baixar_pagina) e guarda o HTML."""
+        gravadas = 0
+        for url in urls:
+            corpo = baixar(url)
+            if corpo:
+                self.gravar(url, corpo, salvar_indice=False)
+                gravadas += 1
+        self.salvar_indice()
+        return gravadas
+
+def gerar_fixtures_sinteticas(fixtures, quantidade=200, por_pagina=50, genero='sertanejo', semente=42):
+    """
+    Gera um ranking paginado e `quantidade` páginas de letra com a mesma
+    estrutura do Letras.mus.br (h1, link do artista, div.lyric-original,
+    JSON-LD e ~100 KB de marcação ao redor). Útil quando não há páginas reais gravadas.
+    """
+    aleatorio = random.Random(semente)
+    palavras = ("amor saudade coração noite cerveja viola estrada boteco paixão lua "
+                "sofrência mágoa beijo abraço volta tempo vida você comigo sozinho").split()
+    enchimento = ''.join(
+        f'<div class="menu-item"><a href="/estilos/outro-{i}/">Estilo {i}</a><span>{"x" * 80}</span></div>'
+        for i in range(500)
+    )
+    musicas = [(f"artista-{i % 40}", f"musica-sintetica-{i}") for i in range(quantidade)]
+
+    for inicio in range(0, quantidade, por_pagina):
+        numero = inicio // por_pagina + 1
+        links = ''.join(
+            f'<li><a href="/{artista}/{titulo}/">{titulo}</a></li>'
+            for artista, titulo in musicas[inicio:inicio + por_pagina]
+        )
+        proxima = f'<a href="/mais-acessadas/{genero}/{numero + 1}/">Próxima</a>' if inicio + por_pagina < quantidade else ''
+        caminho = f"/mais-acessadas/{genero}/" + (f"{numero}/" if numero > 1 else '')
+        html = f'<html><body>{enchimento}<ol>{links}</ol>{proxima}</body></html>'
+        fixtures.gravar(caminho, html.encode('utf-8'), salvar_indice=False)
+
+    for artista, titulo in musicas:
+        versos = '<br>'.join(
+            ' '.join(aleatorio.choice(palavras) for _ in range(aleatorio.randint(4, 9))).capitalize()
+            for _ in range(aleatorio.randint(16, 40))
+        )
+        jsonld = json.dumps({'@type': 'MusicRecording', 'datePublished': str(aleatorio.randint(1990, 2025))})
+        html = (
+            f'<html><head><script type="application/ld+json">{jsonld}</script></head><body>{enchimento}'
+            f'<h1 class="textStyle-primary">{titulo.replace("-", " ").title()}</h1>'
+            f'<a href="/{artista}/">{artista.replace("-", " ").title()}</a>'
+            f'<div class="lyric-original"><p>{versos}</p></div></body></html>'
+        )
+        fixtures.gravar(f"/{artista}/{titulo}/", html.encode('utf-8'), salvar_indice=False)
+
+    fixtures.salvar_indice()
+    return musicas
+
+class ServidorReplay:
+    """
+    Servidor HTTP local que responde com as fixtures. Latência sorteada entre
+    `latencia_ms` (mín, máx) por requisição; com probabilidade `taxa_erro` responde
+    `status_erro` (503 por padrão) e com `taxa_429` responde 429 com Retry-After.
+    """
+
+    def __init__(self, fixtures, latencia_ms=(0, 0), taxa_erro=0.0, status_erro=503, taxa_429=0.0,
+                 retry_after=1, semente=None):
+        self.fixtures = fixtures
+        self.latencia_ms = latencia_ms
+        self.taxa_erro = taxa_erro
+        self.status_erro = status_erro
+        self.taxa_429 = taxa_429
+        self.retry_after = retry_after
+        self._aleatorio = random.Random(semente)
+        self._lock = threading.Lock()
+        self.requisicoes = 0
+        self.erros_injetados = 0
+        self._servidor = None
+
+    @property
+    def url_base(self):
+        return f"http://127.0.0.1:{self._servidor.server_port}"
+
+    def _sortear(self):
+        with self._lock:
+            self.requisicoes += 1
+            latencia = self._aleatorio.uniform(*self.latencia_ms) / 1000
+            sorteio = self._aleatorio.random()
+        if sorteio < self.taxa_429:
+            return latencia, 429
+        if sorteio < self.taxa_429 + self.taxa_erro:
+            return latencia, self.status_erro
+        return latencia, 200
+
+    def iniciar(self):
+        servidor_replay = self
+
+        class Tratador(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # Keep-alive, como no site real
+
+            def do_GET(self):
+                latencia, status = servidor_replay._sortear()
+                if latencia:
+                    time.sleep(latencia)
+                corpo = servidor_replay.fixtures.ler(self.path) if status == 200 else b''
+                if status == 200 and corpo is None:
+                    status, corpo = 404, b''
+                if status not in (200, 404):
+                    with servidor_replay._lock:
+                        servidor_replay.erros_injetados += 1
+                self.send_response(status)
+                if status == 429:
+                    self.send_header('Retry-After', str(servidor_replay.retry_after))
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, *args):
+                pass
+
+        self._servidor = ThreadingHTTPServer(('127.0.0.1', 0), Tratador)
+        self._servidor.daemon_threads = True
+        threading.Thread(target=self._servidor.serve_forever, daemon=True).start()
+        return self
+
+    def parar(self):
+        if self._servidor is not None:
+            self._servidor.shutdown()
+            self._servidor.server_close()
+            self._servidor = None
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *args):
+        self.parar()
@@ -0,0 +1,112 @@
+# ================================================================================
+# RESOLUÇÃO DE URLS
+# Aprende redirecionamentos e URLs inexistentes para não repetir requisições
+# ================================================================================
+
+import json
+import os
+import threading
+import time
+
+CAMINHO_RESOLUCAO_PADRAO = "../base_de_dados/resolucao_urls.json"
+TTL_INEXISTENTE = 7 * 24 * 3600  # Uma URL que deu 404 só é tentada de novo depois de 7 dias
+
+class ResolucaoUrls:
+    """
+    Mapa persistente URL pedida -> URL final, mais as URLs que deram 404/410.
+    Cada evento novo é só acrescentado a um log (`<caminho>.log`, uma linha JSON);
+    o JSON completo é regravado uma vez, em `gravar()`, no fim da coleta.
+    """
+
+    def __init__(self, caminho=CAMINHO_RESOLUCAO_PADRAO):
+        self.caminho = caminho
+        self.caminho_log = caminho + '.log'
+        self._lock = threading.Lock()
+        self._log = None
+        self._eventos = 0
+        self.redirecionamentos = {}
+        self.inexistentes = {}  # url -> instante do último 404
+        if os.path.exists(caminho):
+            with open(caminho, 'r', encoding='utf-8') as f:
+                dados = json.load(f)
+            self.redirecionamentos = dados.get('redirecionamentos', {})
+            self.inexistentes = dados.get('inexistentes', {})
+        if os.path.exists(self.caminho_log):
+            # Eventos de uma coleta que não chegou a gravar() (interrompida)
+            with open(self.caminho_log, 'r', encoding='utf-8') as f:
+                for linha in f:
+                    try:
+                        self._aplicar(json.loads(linha))
+                        self._eventos += 1
+                    except (ValueError, KeyError):
+                        continue  # Última linha cortada no meio
+
+    def _aplicar(self, evento):
+        if evento['tipo'] == 'redirecionamento':
+            self.redirecionamentos[evento['url']] = evento['url_final']
+        else:
+            self.inexistentes[evento['url']] = evento['instante']
+
+    def resolver(self, url):
+        """Retorna a URL final já conhecida (segue cadeias de redirecionamento)."""
+        vistas = set()
+        while url in self.redirecionamentos and url not in vistas:
+            vistas.add(url)
+            url = self.redirecionamentos[url]
+        return url
+
+    def sabidamente_inexistente(self, url):
+        instante = self.inexistentes.get(url)
+        return instante is not None and time.time() - instante < TTL_INEXISTENTE
+
+    def aprender_redirecionamento(self, url, url_final):
+        if url == url_final or self.redirecionamentos.get(url) == url_final:
+            return
+        self._registrar({'tipo': 'redirecionamento', 'url': url, 'url_final': url_final})
+
+    def marcar_inexistente(self, url):
+        self._registrar({'tipo': 'inexistente', 'url': url, 'instante': time.time()})
+
+    def _registrar(self, evento):
+        with self._lock:
+            self._aplicar(evento)
+            if self._log is None:
+                self._log = open(self.caminho_log, 'a', encoding='utf-8')
+            self._log.write(json.dumps(evento, ensure_ascii=False) + '\n')
+            self._log.flush()
+            self._eventos += 1
+
+    def gravar(self):
+        """Regrava o JSON com tudo o que foi aprendido e zera o log (chamado ao fim da coleta)."""
+        with self._lock:
+            if not self._eventos:
+                return
+            temporario = self.caminho + '.tmp'
+            with open(temporario, 'w', encoding='utf-8') as f:
+                json.dump({'redirecionamentos': self.redirecionamentos, 'inexistentes': self.inexistentes},
+                          f, ensure_ascii=False, indent=1)
+            os.replace(temporario, self.caminho)
+            # O log só sai depois do JSON completo: se parar antes, os eventos são reaplicados
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+            os.remove(self.caminho_log)
+            self._eventos = 0
+
+_resolucao = None
+_lock_global = threading.Lock()
+
+def configurar_resolucao(caminho=CAMINHO_RESOLUCAO_PADRAO):
+    """Troca a instância global (ex.: um arquivo temporário nos benchmarks)."""
+    global _resolucao
+    with _lock_global:
+        _resolucao = ResolucaoUrls(caminho)
+        return _resolucao
+
+def obter_resolucao():
+    """Retorna a instância global, carregada do disco na primeira chamada."""
+    global _resolucao
+    with _lock_global:
+        if _resolucao is None:
+            _resolucao = ResolucaoUrls()
+        return _resolucao
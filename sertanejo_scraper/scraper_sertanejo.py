@@ -3,143 +3,231 @@
 # Baseado na análise da estrutura real das páginas
 # ================================================================================
 
+import asyncio
 import requests
 from bs4 import BeautifulSoup
-import pandas as pd
 import time
-import random
 import re
 import json
+import os
+import sys
 from datetime import datetime
 from urllib.parse import urljoin, quote
+from concurrent.futures import ThreadPoolExecutor
 import unidecode
 
-def fazer_request(url):
-    """Faz uma requisição HTTP e retorna o soup."""
+from limitador_taxa import LimitadorAdaptativo
+from cache_http import obter_cache
+from resolucao_urls import obter_resolucao
+from parser_letras import extrair_campos_pagina
+from normalizador_letras import normalizar_letra
+from descoberta import DescobertaMusicas
+from estado_coleta import DiarioColeta, CONCLUIDA, FALHA, PENDENTE
+from escrita_incremental import SaidaColeta, criar_escritor
+from deduplicacao_letras import DetectorDuplicatas, FiltroDuplicatas
+from sessao_http import (obter_sessao, registrar_falha, classificar_erro, motivo_falha, motivos_falha,
+                         espera_retry, STATUS_RETRY, TENTATIVAS_EXTRAS)
+from metricas import metricas, iniciar_servidor_metricas
+
+# Saída da coleta: gravada música a música em ../base_de_dados/<base>_N.csv
+PASTA_SAIDA = "../base_de_dados"
+BASE_NOME_SAIDA = "sertanejo_mais_acessadas_todos_anos"
+FORMATO_SAIDA = 'csv'        # 'csv' ou 'parquet' (pasta <base>_N.parquet/ com uma parte por grupo; requer pyarrow)
+LINHAS_POR_ARQUIVO = None    # Ex.: 500 para rodar um CSV novo a cada 500 músicas
+
+# Letras quase iguais já coletadas em outra URL ("ao vivo", reuploads):
+# 'pular' não grava a variante, 'marcar' grava com duplicata_de, None desliga
+MODO_DUPLICATAS = 'pular'
+
+# Métricas: resumo JSON ao final e, se PORTA_METRICAS for definida, endpoint /metrics local
+PORTA_METRICAS = None        # Ex.: 9108
+
+def baixar_pagina(url, ttl=None, limitador=None):
+    """
+    Baixa o HTML da URL, passando pelo cache em disco. Retorna bytes ou None.
+    Só as idas à rede esperam vaga no `limitador` (uma por tentativa): acertos
+    de cache saem na hora, sem gastar o orçamento de req/s do host.
+    """
+    resolucao = obter_resolucao()
+    if resolucao.sabidamente_inexistente(url):
+        registrar_falha(url, 'inexistente_conhecida')
+        return None
+    # Vai direto ao destino de redirecionamentos já aprendidos
+    url_real = resolucao.resolver(url)
+    
+    cache = obter_cache()
+    with metricas.cronometrar('cache_leitura'):
+        entrada = cache.obter(url_real) if cache else None
+    
+    if entrada and (cache.somente_cache or cache.esta_fresca(entrada, ttl)):
+        metricas.incrementar('cache', rotulo='acerto')
+        metricas.incrementar('bytes_cache', len(entrada.corpo))
+        return entrada.corpo
+    if cache and cache.somente_cache:
+        registrar_falha(url, 'fora_do_cache')
+        return None
+    
+    # Entrada vencida: pede ao servidor só se mudou (ETag/Last-Modified)
+    headers = cache.headers_condicionais(entrada) if entrada else {}
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=10)
+        response = _get_com_retries(url_real, headers, limitador)
+        if response.status_code == 304 and entrada:
+            metricas.incrementar('cache', rotulo='revalidada')
+            cache.renovar(url_real, entrada)
+            return entrada.corpo
         response.raise_for_status()
-        return BeautifulSoup(response.content, 'html.parser')
     except Exception as e:
+        motivo = classificar_erro(e)
+        if motivo in ('http_404', 'http_410'):
+            resolucao.marcar_inexistente(url)
+        registrar_falha(url, motivo)
         return None
+    
+    if response.history and response.url != url_real:
+        resolucao.aprender_redirecionamento(url, response.url)
+        url_real = response.url
+    
+    if cache:
+        cache.salvar(url_real, response.content, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+    return response.content
+
+def _get_com_retries(url, headers, limitador):
+    """
+    GET com até TENTATIVAS_EXTRAS novas tentativas em 429/5xx, timeout ou erro de conexão.
+    Cada tentativa pega a sua vaga no `limitador` e informa o resultado a ele (e só a ele),
+    sempre pelo host da URL pedida, mesmo que a resposta venha de um redirecionamento.
+    """
+    for tentativa in range(TENTATIVAS_EXTRAS + 1):
+        if tentativa:
+            metricas.incrementar('retries')
+        if limitador:
+            with metricas.cronometrar('espera_limitador'):
+                limitador.aguardar_sincrono(url)
+        try:
+            inicio = time.perf_counter()
+            response = obter_sessao().get(url, timeout=10, headers=headers)
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
+            if limitador:
+                limitador.registrar(url)  # Timeout/conexão também é sinal de sobrecarga
+            if tentativa == TENTATIVAS_EXTRAS:
+                raise
+            time.sleep(espera_retry(tentativa))
+            continue
+        ttfb = _medir_resposta(response, time.perf_counter() - inicio)
+        if limitador:
+            limitador.registrar(url, ttfb, response.status_code)
+        if response.status_code not in STATUS_RETRY or tentativa == TENTATIVAS_EXTRAS:
+            return response
+        time.sleep(espera_retry(tentativa, response))
+
+def _medir_resposta(response, duracao):
+    """Separa o tempo até os headers (elapsed) do download do corpo e conta bytes. Retorna o TTFB."""
+    ttfb = response.elapsed.total_seconds()
+    metricas.observar('rede_ttfb', ttfb)
+    metricas.observar('rede_download', max(duracao - ttfb, 0.0))
+    metricas.incrementar('bytes_baixados', len(response.content))
+    metricas.incrementar('respostas_http', rotulo=str(response.status_code))
+    return ttfb
+
+def fazer_request(url, ttl=None, limitador=None):
+    """Faz uma requisição HTTP (sessão compartilhada + cache) e retorna o soup."""
+    conteudo = baixar_pagina(url, ttl, limitador)
+    if conteudo is None:
+        return None
+    
+    try:
+        with metricas.cronometrar('parse_bs4'):
+            return BeautifulSoup(conteudo, 'html.parser')
+    except Exception:
+        registrar_falha(url, 'parse_html')
+        return None
+
+def extrair_ano_de_jsonld(scripts_jsonld):
+    """Extrai o ano da música a partir dos textos dos scripts JSON-LD."""
+    for texto in scripts_jsonld:
+        try:
+            data = json.loads(texto)
+            if isinstance(data, dict):
+                for campo in ['datePublished', 'releaseDate', 'dateCreated', 'uploadDate']:
+                    if campo in data:
+                        ano_match = re.search(r'\b(19|20)\d{2}\b', str(data[campo]))
+                        if ano_match:
+                            return int(ano_match.group())
+                
+                if data.get('@type') == 'MusicRecording' and 'inAlbum' in data:
+                    album = data['inAlbum']
+                    if isinstance(album, dict) and 'datePublished' in album:
+                        ano_match = re.search(r'\b(19|20)\d{2}\b', str(album['datePublished']))
+                        if ano_match:
+                            return int(ano_match.group())
+        except:
+            continue
+    return None
 
 def extrair_ano_melhorado(soup):
     """Extrai o ano da música usando JSON-LD."""
     try:
         scripts_json = soup.find_all('script', type='application/ld+json')
-        for script in scripts_json:
-            try:
-                data = json.loads(script.string)
-                if isinstance(data, dict):
-                    for campo in ['datePublished', 'releaseDate', 'dateCreated', 'uploadDate']:
-                        if campo in data:
-                            ano_match = re.search(r'\b(19|20)\d{2}\b', str(data[campo]))
-                            if ano_match:
-                                return int(ano_match.group())
-                    
-                    if data.get('@type') == 'MusicRecording' and 'inAlbum' in data:
-                        album = data['inAlbum']
-                        if isinstance(album, dict) and 'datePublished' in album:
-                            ano_match = re.search(r'\b(19|20)\d{2}\b', str(album['datePublished']))
-                            if ano_match:
-                                return int(ano_match.group())
-            except:
-                continue
-        return None
+        return extrair_ano_de_jsonld(script.string for script in scripts_json)
     except:
         return None
 
 def limpar_letra(letra_bruta):
-    """Limpa e formata o texto da letra."""
-    if not letra_bruta:
-        return ""
-    
-    # 1. Separar palavras grudadas - minúscula seguida de maiúscula
-    texto_limpo = re.sub(r'([a-záéíóúçãõâêôà])([A-ZÁÉÍÓÚÇÃÕÂÊÔÀ])', r'\1 \2', letra_bruta)
-    
-    # 2. Separar número seguido de letra maiúscula (ex: "IPVAQuem" -> "IPVA Quem")
-    texto_limpo = re.sub(r'([0-9A-ZÁÉÍÓÚÇÃÕÂÊÔÀ]{2,})([A-ZÁÉÍÓÚÇÃÕÂÊÔÀ][a-záéíóúçãõâêôà])', r'\1 \2', texto_limpo)
-    
-    # 3. Separar siglas grudadas em palavras (ex: "IPVAQuem" -> "IPVA Quem")
-    texto_limpo = re.sub(r'([A-ZÁÉÍÓÚÇÃÕÂÊÔÀ]{2,})([A-ZÁÉÍÓÚÇÃÕÂÊÔÀ][a-záéíóúçãõâêôà]+)', r'\1 \2', texto_limpo)
-    
-    # 4. Separar palavra terminada seguida de palavra começada com maiúscula
-    texto_limpo = re.sub(r'([a-záéíóúçãõâêôà])([A-ZÁÉÍÓÚÇÃÕÂÊÔÀ][a-záéíóúçãõâêôà])', r'\1 \2', texto_limpo)
-    
-    # 5. Adicionar espaços após pontuação quando necessário
-    texto_limpo = re.sub(r'([.!?;:])([A-ZÁÉÍÓÚÇÃÕÂÊÔÀ])', r'\1 \2', texto_limpo)
-    
-    # 6. Limpar espaços extras e quebras de linha
-    linhas = [linha.strip() for linha in texto_limpo.split('\n') if linha.strip()]
-    texto_final = '\n'.join(linhas)
-    
-    # 7. Remover espaços duplicados
-    texto_final = re.sub(r'\s+', ' ', texto_final)
-    
-    return texto_final
+    """Limpa e formata o texto da letra (um verso por linha)."""
+    return normalizar_letra(letra_bruta)
 
-def extrair_letra_completa_corrigida(url_musica, titulo_original, artista_original, ranking_pos):
+def extrair_letra_completa_corrigida(url_musica, titulo_original, artista_original, ranking_pos, limitador=None):
     """Extrai letra completa usando seletores atualizados."""
+    with metricas.cronometrar('musica_total'):
+        dados = _extrair_letra(url_musica, titulo_original, artista_original, ranking_pos, limitador)
+    metricas.incrementar('musicas', rotulo='sucesso' if dados else 'falha')
+    return dados
+
+def _extrair_letra(url_musica, titulo_original, artista_original, ranking_pos, limitador=None):
     
     print(f"[{ranking_pos:3}] 🎵 {artista_original} - {titulo_original}")
     
-    soup = fazer_request(url_musica)
-    if not soup:
-        print(f"      ❌ Erro ao acessar URL")
+    html = baixar_pagina(url_musica, limitador=limitador)
+    if html is None:
+        print(f"      ❌ Erro ao acessar URL ({motivo_falha(url_musica)})")
         return None
     
     try:
-        # Novos seletores baseados na análise
-        # Título: h1 dentro de textStyle-primary
-        titulo_elem = soup.find('h1', class_='textStyle-primary')
-        if not titulo_elem:
-            # Fallback para outros seletores
-            titulo_elem = soup.find('h1')
+        # Título, artista, letra e JSON-LD saem de uma única análise do HTML
+        with metricas.cronometrar('parse_html'):
+            campos = extrair_campos_pagina(html)
         
-        if not titulo_elem:
+        if not campos['titulo']:
             print(f"      ❌ Título não encontrado")
+            registrar_falha(url_musica, 'parse_titulo')
             return None
         
-        titulo = titulo_elem.get_text(strip=True)
+        titulo = campos['titulo']
         
         # Artista: link para artista (geralmente próximo ao título)
-        artista_elem = titulo_elem.find_next('a')
-        if artista_elem and '/henrique-e-juliano/' in artista_elem.get('href', ''):
-            artista = artista_elem.get_text(strip=True)
+        if campos['artista_href'] and '/henrique-e-juliano/' in campos['artista_href']:
+            artista = campos['artista_texto']
         else:
             # Fallback para artista original
             artista = artista_original
         
-        # Letra: procurar diferentes classes
-        seletores_letra = [
-            '.lyric-original',
-            '[class*="lyric"]',
-            'div.lyric',
-            '.letra'
-        ]
-        
-        letra_elem = None
-        for seletor in seletores_letra:
-            letra_elem = soup.select_one(seletor)
-            if letra_elem and len(letra_elem.get_text().strip()) > 100:
-                break
-        
-        if not letra_elem:
+        if not campos['letra_bruta']:
             print(f"      ❌ Letra não encontrada")
+            registrar_falha(url_musica, 'parse_letra')
             return None
         
-        letra_bruta = letra_elem.get_text()
-        letra_limpa = limpar_letra(letra_bruta)
+        letra_bruta = campos['letra_bruta']
+        with metricas.cronometrar('limpar_letra'):
+            letra_limpa = limpar_letra(letra_bruta)
         
         if len(letra_limpa.split()) < 10:
             print(f"      ⚠️ Letra muito curta")
+            registrar_falha(url_musica, 'letra_curta')
             return None
         
         # Extrair ano
-        ano = extrair_ano_melhorado(soup)
+        with metricas.cronometrar('extrair_ano'):
+            ano = extrair_ano_de_jsonld(campos['jsonld'])
         
         # FILTRO REMOVIDO: Coletando músicas de todos os anos
         # if ano and ano < 2023:
@@ -171,6 +259,7 @@ def extrair_letra_completa_corrigida(url_musica, titulo_original, artista_origin
         
     except Exception as e:
         print(f"      ❌ Erro: {str(e)}")
+        registrar_falha(url_musica, 'parse_erro')
         return None
 
 def normalizar_nome_url(texto):
@@ -197,133 +286,57 @@ def construir_url_musica(titulo, artista):
     titulo_url = normalizar_nome_url(titulo)
     return f"https://www.letras.mus.br/{artista_url}/{titulo_url}/"
 
-def buscar_musicas_mais_acessadas(limite=1000):
-    """Busca a lista real de músicas mais acessadas do sertanejo no site."""
+def buscar_musicas_mais_acessadas(limite=1000, paginas_iniciais=None, requisicoes_por_segundo=2.0,
+                                  seguir_artistas=True, max_paginas=200):
+    """
+    Busca a lista real de músicas mais acessadas do sertanejo no site.
+    Com seguir_artistas=False, fica só nas listagens (e na paginação delas).
+    """
     
     print(f"🔍 Buscando músicas mais acessadas do sertanejo (limite: {limite})...")
     print(f"⏱️  EXECUÇÃO LONGA: Preparado para coleta extensiva...")
-    url_ranking = "https://www.letras.mus.br/mais-acessadas/sertanejo/"
     
-    soup = fazer_request(url_ranking)
-    if not soup:
-        print(f"❌ Erro ao acessar página de ranking")
-        return []
-    
-    musicas_encontradas = []
-    urls_processadas = set()  # Evitar duplicatas
+    async def listar():
+        descoberta = DescobertaMusicas(baixar_pagina, LimitadorAdaptativo(requisicoes_por_segundo),
+                                       limite, paginas_iniciais, seguir_artistas=seguir_artistas,
+                                       max_paginas=max_paginas)
+        musicas = [item async for item in descoberta.musicas()]
+        return musicas, descoberta.paginas_baixadas
     
     try:
-        # Procurar pela lista de músicas na página
-        # Vamos tentar diferentes seletores baseados na estrutura comum do site
-        
-        # Seletor 1: Links que contêm títulos de músicas
-        links_musicas = soup.find_all('a', href=True)
-        
-        contador = 0
-        for link in links_musicas:
-            if contador >= limite:
-                break
-                
-            href = link.get('href', '')
-            texto = link.get_text(strip=True)
-            
-            # Filtrar apenas links que parecem ser de músicas
-            # Links de músicas geralmente têm o padrão: /artista/titulo/
-            if (href.count('/') >= 3 and 
-                not any(x in href.lower() for x in ['mais-acessadas', 'artista', 'album', 'biografia', 'playlists', 'estilos']) and
-                href not in urls_processadas and
-                href.startswith('/') and
-                len(href.split('/')) >= 3):
-                
-                # Extrair artista e título do link ou texto
-                if texto and len(texto) > 3:  # Evitar textos muito curtos
-                    # Tentar extrair informações do próprio link
-                    partes_url = href.strip('/').split('/')
-                    if len(partes_url) >= 2:
-                        artista_url = partes_url[-2]
-                        titulo_url = partes_url[-1]
-                        
-                        # Filtrar URLs que não parecem ser de música
-                        if any(x in titulo_url.lower() for x in ['biografia', 'discografia', 'fotos']):
-                            continue
-                        
-                        # Converter de volta para texto legível
-                        artista = artista_url.replace('-', ' ').title()
-                        titulo = titulo_url.replace('-', ' ').title()
-                        
-                        # Evitar títulos muito curtos ou suspeitos
-                        if len(titulo) < 2 or titulo.isdigit():
-                            continue
-                        
-                        urls_processadas.add(href)
-                        contador += 1
-                        musicas_encontradas.append((contador, titulo, artista))
-                        
-                        if contador <= 15:  # Mostrar os primeiros 15
-                            print(f"   {contador:2d}. {artista} - {titulo}")
-        
-        if contador > 15:
-            print(f"   ... e mais {contador-15} músicas encontradas")
-        
-        # Para listas grandes, sempre tentar estratégia expandida
-        if len(musicas_encontradas) < limite * 0.8:  # Se não conseguiu 80% do limite
-            print(f"🔍 Expandindo busca... ({len(musicas_encontradas)} encontradas, buscando mais)")
-            
-            # Buscar em múltiplas páginas de sertanejo
-            urls_adicionais = [
-                "https://www.letras.mus.br/estilos/sertanejo/",
-                "https://www.letras.mus.br/top100/sertanejo/",
-                "https://www.letras.mus.br/estilos/sertanejo-universitario/",
-                "https://www.letras.mus.br/estilos/sertanejo-raiz/",
-            ]
-            
-            for url_adicional in urls_adicionais:
-                if len(musicas_encontradas) >= limite:
-                    break
-                    
-                print(f"🔍 Buscando em: {url_adicional}")
-                soup_adicional = fazer_request(url_adicional)
-                if soup_adicional:
-                    links_adicionais = soup_adicional.find_all('a', href=True)
-                    
-                    for link in links_adicionais:
-                        if len(musicas_encontradas) >= limite:
-                            break
-                            
-                        href = link.get('href', '')
-                        if (href.count('/') >= 3 and 
-                            href not in urls_processadas and
-                            not any(x in href.lower() for x in ['mais-acessadas', 'artista', 'album', 'biografia'])):
-                            
-                            partes_url = href.strip('/').split('/')
-                            if len(partes_url) >= 2:
-                                artista_url = partes_url[-2]
-                                titulo_url = partes_url[-1]
-                                
-                                if not titulo_url.isdigit() and len(titulo_url) > 2:
-                                    artista = artista_url.replace('-', ' ').title()
-                                    titulo = titulo_url.replace('-', ' ').title()
-                                    
-                                    urls_processadas.add(href)
-                                    musicas_encontradas.append((len(musicas_encontradas) + 1, titulo, artista))
-            
-        print(f"✅ Total encontrado: {len(musicas_encontradas)} músicas")
-        
+        musicas_encontradas, paginas = asyncio.run(listar())
     except Exception as e:
         print(f"❌ Erro ao extrair lista: {str(e)}")
         return []
     
+    for posicao, titulo, artista, _ in musicas_encontradas[:15]:  # Mostrar os primeiros 15
+        print(f"   {posicao:2d}. {artista} - {titulo}")
+    if len(musicas_encontradas) > 15:
+        print(f"   ... e mais {len(musicas_encontradas)-15} músicas encontradas")
+    
+    print(f"✅ Total encontrado: {len(musicas_encontradas)} músicas ({paginas} páginas de listagem)")
     return musicas_encontradas
 
-def coletar_hits_automatico(limite=1000):
+def coletar_hits_automatico(limite=1000, concorrente=True, concorrencia=8, requisicoes_por_segundo=2.0):
     """Coleta hits automaticamente da página mais acessadas."""
     
     print(f"🚀 COLETA AUTOMÁTICA MEGA - SERTANEJO MAIS ACESSADO")
     print("=" * 70)
     print(f"🎯 META AMBICIOSA: {limite} músicas")
-    print(f"⏱️  Tempo estimado: {limite * 2.5 / 60:.0f} minutos (~{limite * 2.5 / 3600:.1f} horas)")
+    segundos_por_musica = 1 / requisicoes_por_segundo if concorrente else 2.0  # Sequencial começa em 0.5 req/s
+    print(f"⏱️  Tempo estimado: {limite * segundos_por_musica / 60:.0f} minutos (~{limite * segundos_por_musica / 3600:.1f} horas)")
     print(f"💤 EXECUÇÃO LONGA: Pode deixar rodando...")
     
+    if concorrente:
+        # Descoberta e coleta no mesmo event loop: as letras começam a ser
+        # baixadas assim que as primeiras músicas aparecem no ranking
+        musicas = coletar_letras_em_fluxo(limite, concorrencia=concorrencia,
+                                          requisicoes_por_segundo=requisicoes_por_segundo)
+        if not musicas:
+            print("❌ Nenhuma música coletada a partir do ranking. Usando lista manual de backup...")
+            return coletar_hits_corrigido()
+        return musicas
+    
     # Buscar lista real do site
     musicas_lista = buscar_musicas_mais_acessadas(limite)
     
@@ -363,90 +376,284 @@ def coletar_hits_corrigido():
         (10, "Tocando Em Frente", "Almir Sater"),   # 1991
     ]
     
+    # Única lista sem URL de origem: aqui a URL precisa ser montada a partir dos nomes
+    musicas_teste = [
+        (posicao, titulo, artista, construir_url_musica(titulo, artista))
+        for posicao, titulo, artista in musicas_teste
+    ]
+    
     return coletar_letras_da_lista(musicas_teste)
 
-def salvar_dados_parciais(musicas_coletadas, posicao_atual):
-    """Salva dados parciais para evitar perda em execuções longas."""
-    if musicas_coletadas:
-        import os
-        df = pd.DataFrame(musicas_coletadas)
-        
-        # Criar nome do arquivo parcial
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        arquivo_parcial = f"../base_de_dados/sertanejo_parcial_{timestamp}_pos{posicao_atual}.csv"
+def _intervalo_checkpoint(total):
+    """Define a cada quantas músicas o progresso é exibido."""
+    # Progresso visual otimizado para listas grandes
+    if total > 500:
+        return 50  # A cada 50 músicas para listas muito grandes
+    elif total > 200:
+        return 25  # A cada 25 músicas para listas grandes
+    else:
+        return 10  # A cada 10 músicas para listas pequenas
+
+def _mostrar_progresso(i, total, sucessos, falhas, inicio_tempo, checkpoint, limitador=None):
+    """Mostra o progresso da coleta (e a taxa atual do limitador, se houver)."""
+    if i % checkpoint == 0 or i == total:
+        progresso = (i / total) * 100
+        tempo_decorrido = time.time() - inicio_tempo
+        tempo_por_musica = tempo_decorrido / i
+        tempo_restante = (total - i) * tempo_por_musica
+        taxa = sucessos / (sucessos + falhas) * 100 if sucessos + falhas else 0.0
         
-        df.to_csv(arquivo_parcial, index=False, encoding='utf-8')
-        print(f"     📁 Backup salvo: {os.path.basename(arquivo_parcial)}")
+        print(f"\n📊 PROGRESSO: {progresso:.1f}% ({i}/{total})")
+        print(f"   ✅ Sucessos: {sucessos} | ❌ Falhas: {falhas} | 📈 Taxa: {taxa:.1f}%")
+        print(f"   ⏱️  Tempo decorrido: {tempo_decorrido/60:.1f}min | Restante: ~{tempo_restante/60:.0f}min")
+        if limitador:
+            print(f"   🚦 Taxa atual: {limitador.descricao()}")
+        etapas = metricas.linha_progresso()
+        if etapas:
+            print(f"   🔬 {etapas}")
+
+def _item_com_url(item):
+    """Reordena (posicao, titulo, artista, url) para (url, posicao, titulo, artista)."""
+    posicao, titulo, artista, url = item
+    return url, posicao, titulo, artista
+
+def _abrir_saida(pasta=PASTA_SAIDA, base_nome=BASE_NOME_SAIDA):
+    """Escritor incremental no próximo arquivo livre da pasta (../base_de_dados/ por padrão)."""
+    return SaidaColeta(criar_escritor(pasta, base_nome, FORMATO_SAIDA, LINHAS_POR_ARQUIVO))
 
-def coletar_letras_da_lista(musicas_lista):
-    """Coleta letras de uma lista de músicas de todos os anos."""
+def _filtrar_duplicatas(saida):
+    """Passa a saída pelo detector de letras quase duplicadas, conforme MODO_DUPLICATAS."""
+    if not MODO_DUPLICATAS:
+        return saida
+    return FiltroDuplicatas(saida, DetectorDuplicatas(MODO_DUPLICATAS))
+
+def _preparar_diario(musicas_lista, diario, saida):
+    """
+    Registra a lista no diário e devolve só as pendentes. As já concluídas em
+    execuções anteriores vão direto do diário para a saída, uma a uma.
+    """
+    itens = [_item_com_url(item) for item in musicas_lista]
+    diario.registrar_pendentes(itens)
+    
+    for _, dados in diario.iterar_concluidas(url for url, _, _, _ in itens):
+        saida.adicionar(dados)
+    
+    if len(saida):
+        print(f"♻️  Retomando coleta: {len(saida)} músicas já concluídas serão puladas")
+    
+    concluidas = diario.urls_concluidas()
+    return [item for item in itens if item[0] not in concluidas]
+
+def _registrar_resultado(diario, url, dados):
+    """Grava o resultado de uma música no diário (uma linha por música)."""
+    if dados:
+        diario.marcar_concluida(url, dados)
+    else:
+        diario.marcar_falha(url, motivo_falha(url))
+
+def coletar_letras_da_lista(musicas_lista, diario=None, requisicoes_por_segundo=0.5):
+    """Coleta letras de uma lista de (posicao, titulo, artista, url) de todos os anos."""
     
     print(f"🎵 Coletando {len(musicas_lista)} músicas sertanejas populares...")
     print(f"📅 SEM FILTRO: Coletando músicas de todos os anos!")
     print(f"💾 Dados serão salvos em: ../base_de_dados/")
-    print(f"⏱️  Tempo estimado: {(len(musicas_lista) * 3 / 60):.1f} minutos")
+    print(f"🚦 Taxa inicial: {requisicoes_por_segundo:.1f} req/s (ajustada conforme a resposta do site)")
+    print(f"⏱️  Tempo estimado: {(len(musicas_lista) / requisicoes_por_segundo / 60):.1f} minutos")
     
-    musicas_coletadas = []
+    diario = diario or DiarioColeta()
+    saida = _filtrar_duplicatas(_abrir_saida())
+    try:
+        sucessos, falhas = _coletar_pendentes(musicas_lista, diario, saida,
+                                              LimitadorAdaptativo(requisicoes_por_segundo))
+    finally:
+        saida.fechar()
+    
+    _finalizar_coleta(saida, len(musicas_lista), sucessos, falhas, diario)
+    return saida
+
+def _coletar_pendentes(musicas_lista, diario, saida, limitador):
+    """Laço sequencial: cada música vai para a saída assim que é coletada."""
+    pendentes = _preparar_diario(musicas_lista, diario, saida)
     sucessos = 0
     falhas = 0
-    filtradas = 0
-    
-    # Progresso visual otimizado para listas grandes
-    if len(musicas_lista) > 500:
-        checkpoint = 50  # A cada 50 músicas para listas muito grandes
-    elif len(musicas_lista) > 200:
-        checkpoint = 25  # A cada 25 músicas para listas grandes
-    else:
-        checkpoint = 10  # A cada 10 músicas para listas pequenas
     
+    checkpoint = _intervalo_checkpoint(len(pendentes))
     inicio_tempo = time.time()
     
-    for i, (posicao, titulo, artista) in enumerate(musicas_lista, 1):
-        # Mostrar progresso detalhado
-        if i % checkpoint == 0 or i == len(musicas_lista):
-            progresso = (i / len(musicas_lista)) * 100
-            tempo_decorrido = time.time() - inicio_tempo
-            tempo_por_musica = tempo_decorrido / i
-            tempo_restante = (len(musicas_lista) - i) * tempo_por_musica
-            
-            print(f"\n📊 PROGRESSO: {progresso:.1f}% ({i}/{len(musicas_lista)})")
-            print(f"   ✅ Sucessos: {sucessos} | ❌ Falhas: {falhas} | 📈 Taxa: {sucessos/i*100:.1f}%")
-            print(f"   ⏱️  Tempo decorrido: {tempo_decorrido/60:.1f}min | Restante: ~{tempo_restante/60:.0f}min")
-            
-            # Salvar progresso parcial a cada checkpoint
-            if sucessos > 0 and i % (checkpoint * 2) == 0:
-                print(f"   💾 Salvando progresso parcial...")
-                salvar_dados_parciais(musicas_coletadas, i)
-        
-        url = construir_url_musica(titulo, artista)
-        
+    for i, (url, posicao, titulo, artista) in enumerate(pendentes, 1):
         try:
-            dados = extrair_letra_completa_corrigida(url, titulo, artista, posicao)
+            # Pausa definida pelo limitador adaptativo (sobe com o site saudável, cai em 429/5xx),
+            # só quando a página não vem do cache
+            dados = extrair_letra_completa_corrigida(url, titulo, artista, posicao, limitador)
             
             if dados:
-                musicas_coletadas.append(dados)
+                saida.adicionar(dados)
                 sucessos += 1
             else:
                 falhas += 1
         except Exception as e:
             print(f"      ❌ Erro inesperado: {str(e)}")
+            registrar_falha(url, 'erro_inesperado')
+            dados = None
             falhas += 1
         
-        # Delay otimizado para execuções longas
-        if len(musicas_lista) > 500:
-            time.sleep(random.uniform(1.0, 2.0))  # Delay mais rápido para listas muito grandes
-        elif len(musicas_lista) > 100:
-            time.sleep(random.uniform(1.5, 2.5))  # Delay moderado para listas grandes
+        _registrar_resultado(diario, url, dados)
+        
+        # Mostrar progresso detalhado
+        _mostrar_progresso(i, len(pendentes), sucessos, falhas, inicio_tempo, checkpoint, limitador)
+    
+    return sucessos, falhas
+
+async def _iterar_lista(musicas_lista):
+    for item in musicas_lista:
+        yield item
+
+async def _coletar_letras_async(fonte, total, concorrencia, limitador, diario, saida):
+    """
+    Consome músicas de um iterador assíncrono (lista ou descoberta em andamento)
+    mantendo até `concorrencia` em andamento e respeitando o limite do host.
+    Cada música vai para a saída na ordem em que termina.
+    """
+    
+    obter_sessao(tamanho_pool=concorrencia)  # Uma conexão keep-alive por tarefa em voo
+    obter_cache()  # Inicializa cache e resolução de URLs antes das threads
+    obter_resolucao()
+    semaforo = asyncio.Semaphore(concorrencia)
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=concorrencia)
+    
+    estado = {'vistas': 0, 'sucessos': 0, 'falhas': 0, 'ja_coletadas': 0}
+    checkpoint = _intervalo_checkpoint(total)
+    inicio_tempo = time.time()
+    
+    def contabilizar(url, dados):
+        # Só roda no event loop: diário, saída e contadores sem concorrência
+        if dados:
+            saida.adicionar(dados)
+            estado['sucessos'] += 1
         else:
-            time.sleep(random.uniform(2, 4))  # Delay normal para listas pequenas
+            estado['falhas'] += 1
+        _registrar_resultado(diario, url, dados)
+        estado['vistas'] += 1
+        _mostrar_progresso(estado['vistas'], total, estado['sucessos'], estado['falhas'], inicio_tempo,
+                           checkpoint, limitador)
+    
+    async def processar(url, posicao, titulo, artista):
+        try:
+            # requests é bloqueante: roda em thread para não travar o event loop; a vaga
+            # no limitador é esperada nessa thread, e só se a página não vier do cache
+            dados = await loop.run_in_executor(
+                executor, extrair_letra_completa_corrigida, url, titulo, artista, posicao, limitador
+            )
+        except Exception as e:
+            print(f"      ❌ Erro inesperado: {str(e)}")
+            registrar_falha(url, 'erro_inesperado')
+            dados = None
+        finally:
+            semaforo.release()
+        contabilizar(url, dados)
+    
+    tarefas = []
+    try:
+        async for item in fonte:
+            url, posicao, titulo, artista = _item_com_url(item)
+            diario.registrar_pendentes([(url, posicao, titulo, artista)])
+            
+            dados = diario.obter_concluida(url)
+            if dados:
+                # Já coletada numa execução anterior
+                saida.adicionar(dados)
+                estado['ja_coletadas'] += 1
+                estado['vistas'] += 1
+            else:
+                # Contrapressão: só puxa a próxima música quando há vaga
+                await semaforo.acquire()
+                tarefas.append(asyncio.ensure_future(processar(url, posicao, titulo, artista)))
+        
+        await asyncio.gather(*tarefas)
+    finally:
+        executor.shutdown(wait=True)
+    
+    if estado['ja_coletadas']:
+        print(f"♻️  {estado['ja_coletadas']} músicas já concluídas em execuções anteriores foram puladas")
+    
+    return estado['sucessos'], estado['falhas']
+
+def coletar_letras_da_lista_async(musicas_lista, concorrencia=8, requisicoes_por_segundo=2.0, diario=None):
+    """Coleta letras com várias requisições em paralelo e limite de req/s por host."""
+    
+    print(f"🎵 Coletando {len(musicas_lista)} músicas sertanejas populares (modo concorrente)...")
+    print(f"📅 SEM FILTRO: Coletando músicas de todos os anos!")
+    print(f"💾 Dados serão salvos em: ../base_de_dados/")
+    print(f"⚡ Concorrência: {concorrencia} | Taxa inicial: {requisicoes_por_segundo:.1f} req/s por host (adaptativa)")
+    print(f"⏱️  Tempo estimado: {(len(musicas_lista) / requisicoes_por_segundo / 60):.1f} minutos")
+    
+    diario = diario or DiarioColeta()
+    saida = _filtrar_duplicatas(_abrir_saida())
+    try:
+        sucessos, falhas = asyncio.run(_coletar_letras_async(
+            _iterar_lista(musicas_lista), len(musicas_lista), concorrencia,
+            LimitadorAdaptativo(requisicoes_por_segundo), diario, saida
+        ))
+    finally:
+        saida.fechar()
+    
+    _finalizar_coleta(saida, len(musicas_lista), sucessos, falhas, diario)
+    return saida
+
+def coletar_letras_em_fluxo(limite=1000, paginas_iniciais=None, concorrencia=8,
+                            requisicoes_por_segundo=2.0, diario=None):
+    """Descobre as músicas do ranking e coleta as letras ao mesmo tempo."""
+    
+    print(f"🎵 Descobrindo e coletando até {limite} músicas sertanejas (modo concorrente)...")
+    print(f"💾 Dados serão salvos em: ../base_de_dados/")
+    print(f"⚡ Concorrência: {concorrencia} | Taxa inicial: {requisicoes_por_segundo:.1f} req/s por host (adaptativa)")
+    
+    diario = diario or DiarioColeta()
+    # Descoberta e coleta dividem o mesmo orçamento de req/s do host
+    limitador = LimitadorAdaptativo(requisicoes_por_segundo)
+    descoberta = DescobertaMusicas(baixar_pagina, limitador, limite, paginas_iniciais)
+    
+    saida = _filtrar_duplicatas(_abrir_saida())
+    try:
+        sucessos, falhas = asyncio.run(_coletar_letras_async(
+            descoberta.musicas(), limite, concorrencia, limitador, diario, saida
+        ))
+    finally:
+        saida.fechar()
+    
+    print(f"\n🔍 Descoberta: {descoberta.encontradas} músicas em {descoberta.paginas_baixadas} páginas de listagem")
+    if descoberta.encontradas == 0:
+        return saida
+    
+    _finalizar_coleta(saida, descoberta.encontradas, sucessos, falhas, diario)
+    return saida
+
+def _finalizar_coleta(saida, total, sucessos, falhas, diario):
+    """Mostra o resultado final, os arquivos gravados e as análises."""
+    
+    obter_resolucao().gravar()  # Redirecionamentos e 404 aprendidos: uma gravação só, no fim
     
     print(f"\n" + "=" * 70)
     print(f"📊 RESULTADO FINAL:")
     print(f"   ✅ Sucessos: {sucessos}")
     print(f"   ❌ Falhas: {falhas}")
-    print(f"   📈 Taxa de sucesso: {(sucessos/(sucessos+falhas)*100):.1f}%")
-    
-    if len(musicas_lista) >= 200:
+    if sucessos + falhas:
+        print(f"   📈 Taxa de sucesso: {(sucessos/(sucessos+falhas)*100):.1f}%")
+    resumo_diario = diario.resumo()
+    print(f"   📒 Diário: {resumo_diario[CONCLUIDA]} concluídas | {resumo_diario[FALHA]} com falha | {resumo_diario[PENDENTE]} pendentes")
+    
+    detector = getattr(saida, 'detector', None)
+    if detector and detector.duplicatas:
+        acao = 'não gravadas' if detector.pular else 'gravadas com duplicata_de'
+        print(f"   🪞 Variantes de letras já coletadas: {len(detector.duplicatas)} ({acao})")
+    
+    if motivos_falha:
+        print(f"   🔎 Motivos das falhas:")
+        for motivo, qtd in motivos_falha.most_common():
+            print(f"      - {motivo}: {qtd}")
+    
+    if total >= 200:
         if sucessos >= 200:
             print(f"   🎯 EXCELENTE! Meta de 200+ músicas ATINGIDA!")
         elif sucessos >= 150:
@@ -456,51 +663,47 @@ def coletar_letras_da_lista(musicas_lista):
         else:
             print(f"   ⚠️  Resultado abaixo do esperado para lista grande")
     
-    if musicas_coletadas:
-        # Salvar dados na pasta base_de_dados com numeração sequencial
-        df = pd.DataFrame(musicas_coletadas)
-        
-        # Encontrar o próximo número disponível
-        import os
-        base_nome = "sertanejo_mais_acessadas_todos_anos"
-        contador = 1
-        while os.path.exists(f"../base_de_dados/{base_nome}_{contador}.csv"):
-            contador += 1
-        
-        arquivo = f"../base_de_dados/{base_nome}_{contador}.csv"
-        df.to_csv(arquivo, index=False, encoding='utf-8')
-        
-        print(f"💾 Dados salvos em: {arquivo}")
-        
-        # Análises detalhadas
-        total_palavras = df['contagem_palavras'].sum()
-        musicas_com_ano = df[df['ano'].notna()]
+    if saida.arquivos:
+        # Os registros já foram gravados um a um durante a coleta
+        for arquivo in saida.arquivos:
+            print(f"💾 Dados salvos em: {arquivo}")
+    
+    if len(saida):
+        # Análises a partir dos contadores da saída (sem recarregar o arquivo)
+        com_ano = sum(saida.anos.values())
         
         print(f"\n📊 ANÁLISE DETALHADA:")
-        print(f"   📝 Total de palavras: {total_palavras:,}")
-        print(f"   📊 Média por música: {df['contagem_palavras'].mean():.0f} palavras")
-        print(f"   📅 Músicas com ano: {len(musicas_com_ano)}")
-        print(f"   📈 Músicas sem ano: {len(df) - len(musicas_com_ano)} (incluídas como possivelmente modernas)")
+        print(f"   📝 Total de palavras: {saida.total_palavras:,}")
+        print(f"   📊 Média por música: {saida.total_palavras / len(saida):.0f} palavras")
+        print(f"   📅 Músicas com ano: {com_ano}")
+        print(f"   📈 Músicas sem ano: {len(saida) - com_ano} (incluídas como possivelmente modernas)")
         
-        if len(musicas_com_ano) > 0:
-            anos = musicas_com_ano['ano'].value_counts().sort_index()
-            print(f"   🗓️  Anos encontrados: {list(anos.index)}")
+        if com_ano > 0:
+            print(f"   🗓️  Anos encontrados: {sorted(saida.anos)}")
             
             # Estatísticas por ano
-            for ano in sorted(anos.index):
-                qtd = anos[ano]
-                print(f"      - {ano}: {qtd} músicas")
-    
-    return musicas_coletadas
+            for ano in sorted(saida.anos):
+                print(f"      - {ano}: {saida.anos[ano]} músicas")
+    
+    # Onde o tempo foi gasto, para ajustar concorrência e req/s com dados
+    metricas.imprimir_tabela()
+    caminho_metricas = metricas.salvar_resumo(
+        f"{PASTA_SAIDA}/metricas_coleta_{datetime.now():%Y%m%d_%H%M%S}.json",
+        {'total': total, 'sucessos': sucessos, 'falhas': falhas, 'arquivos': saida.arquivos}
+    )
+    print(f"📈 Métricas salvas em: {caminho_metricas}")
 
 if __name__ == "__main__":
     print("🚀 SCRAPER MEGA - SERTANEJO DE TODOS OS ANOS")
     print("🎯 META AMBICIOSA: Coletar até 1000 músicas")
-    print("⏱️  EXECUÇÃO LONGA: Pode levar algumas horas")
-    print("💾 BACKUP AUTOMÁTICO: Salvamento periódico habilitado")
-    print("🔄 ROBUSTO: Resistente a falhas e interrupções")
+    print("⚡ MODO CONCORRENTE: Várias requisições em paralelo com limite de req/s")
+    print("💾 DIÁRIO DE COLETA: Cada música é registrada assim que termina")
+    print("🔄 RETOMÁVEL: Reexecutar pula as concluídas e tenta de novo só as falhas")
     print()
     
+    if PORTA_METRICAS:
+        iniciar_servidor_metricas(PORTA_METRICAS)
+    
     inicio_execucao = time.time()
     
     # Usar a nova função automática com limite máximo
@@ -532,4 +735,11 @@ if __name__ == "__main__":
     
     if len(musicas) > 0:
         taxa_por_minuto = len(musicas) / (tempo_total / 60)
-        print(f"📈 Velocidade média: {taxa_por_minuto:.1f} músicas/minuto")
\ No newline at end of file
+        print(f"📈 Velocidade média: {taxa_por_minuto:.1f} músicas/minuto")
+    
+    # A base nova vira a entrada 'musicas' do pré-processamento (registro na raiz do projeto)
+    if len(musicas) > 0 and len(musicas.arquivos) == 1 and FORMATO_SAIDA == 'csv':
+        sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+        from registro_artefatos import RegistroArtefatos
+        RegistroArtefatos().registrar('musicas', musicas.arquivos[0], 'coleta', parametros={'limite': 1000})
+        print(f"📒 Base registrada como artefato 'musicas': {musicas.arquivos[0]}")
@@ -0,0 +1,86 @@
+# ================================================================================
+# SESSÃO HTTP COMPARTILHADA
+# Pool de conexões com keep-alive, retries com backoff e registro de falhas
+# ================================================================================
+
+import threading
+import time
+from collections import Counter
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+
+from metricas import metricas
+
+HEADERS_PADRAO = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    # gzip/deflate sempre; br (brotli) quando o pacote brotli estiver instalado
+    'Accept-Encoding': ACCEPT_ENCODING,
+}
+
+_sessao = None
+_tamanho_pool = 0
+_lock = threading.Lock()
+
+# Motivo da última falha de cada URL e contagem geral por motivo
+falhas_por_url = {}
+motivos_falha = Counter()
+
+# Retries feitos em baixar_pagina, acima do limitador de taxa: cada tentativa espera a
+# sua vaga no orçamento do host e cada 429/5xx chega ao limitador adaptativo
+TENTATIVAS_EXTRAS = 3
+STATUS_RETRY = (429, 500, 502, 503, 504)
+BACKOFF_RETRY = 1.0          # 1s, 2s, 4s
+ESPERA_MAXIMA_RETRY = 120.0  # Teto para o Retry-After do servidor
+
+def espera_retry(tentativa, response=None):
+    """Segundos antes da próxima tentativa: o Retry-After do servidor ou o backoff exponencial."""
+    valor = response.headers.get('Retry-After') if response is not None else None
+    if valor:
+        try:
+            return min(max(float(valor), 0.0), ESPERA_MAXIMA_RETRY)
+        except ValueError:
+            try:
+                segundos = parsedate_to_datetime(valor).timestamp() - time.time()
+                return min(max(segundos, 0.0), ESPERA_MAXIMA_RETRY)
+            except (TypeError, ValueError):
+                pass
+    return BACKOFF_RETRY * 2 ** tentativa
+
+def obter_sessao(tamanho_pool=10):
+    """Retorna a sessão compartilhada, aumentando o pool se necessário."""
+    global _sessao, _tamanho_pool
+    with _lock:
+        if _sessao is None:
+            _sessao = requests.Session()
+            _sessao.headers.update(HEADERS_PADRAO)
+        if tamanho_pool > _tamanho_pool:
+            # Sem retries no urllib3: eles passariam por fora do limitador (ver TENTATIVAS_EXTRAS)
+            adaptador = HTTPAdapter(pool_connections=tamanho_pool, pool_maxsize=tamanho_pool, max_retries=0)
+            _sessao.mount('https://', adaptador)
+            _sessao.mount('http://', adaptador)
+            _tamanho_pool = tamanho_pool
+        return _sessao
+
+def classificar_erro(erro):
+    """Traduz uma exceção do requests em um motivo curto de falha."""
+    if isinstance(erro, requests.exceptions.Timeout):
+        return 'timeout'
+    if isinstance(erro, requests.exceptions.HTTPError) and erro.response is not None:
+        return f'http_{erro.response.status_code}'
+    if isinstance(erro, requests.exceptions.ConnectionError):
+        return 'conexao'
+    return type(erro).__name__
+
+def registrar_falha(url, motivo):
+    """Guarda o motivo da falha de uma URL."""
+    with _lock:
+        falhas_por_url[url] = motivo
+        motivos_falha[motivo] += 1
+    metricas.incrementar('falhas', rotulo=motivo)
+
+def motivo_falha(url):
+    """Retorna o motivo registrado para a URL (ou 'desconhecido')."""
+    return falhas_por_url.get(url, 'desconhecido')
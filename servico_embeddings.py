@@ -0,0 +1,200 @@
+# ================================================================================
+# SERVIÇO DE EMBEDDINGS EM CPU
+# Lotes por tamanho de texto, tamanho de lote ajustável, ONNX int8 opcional e vários processos
+# ================================================================================
+
+import importlib.util
+import multiprocessing
+import os
+import re
+import time
+
+import numpy as np
+
+RAIZ_PROJETO = os.path.dirname(os.path.abspath(__file__))
+PASTA_MODELOS_ONNX = os.path.join(RAIZ_PROJETO, "base_de_dados", "modelos_onnx")
+
+MODELO_PADRAO = "paraphrase-multilingual-MiniLM-L12-v2"
+
+# Configuração usada pelos scripts de análise; rode analise_bertopic/benchmark_embeddings.py
+# na máquina antes de mudar (o melhor valor depende da CPU)
+BACKEND_PADRAO = "torch"          # "torch", "onnx" ou "onnx-int8"
+PROCESSOS_PADRAO = 1              # >1: um processo por núcleo, cada um com sua cópia do modelo
+TAMANHO_LOTE_PADRAO = 128         # Trechos são curtos: lotes maiores que o padrão (32) rendem mais
+
+# Quantização dinâmica int8 do ONNX Runtime: "avx512_vnni" (Xeon recentes), "avx2" ou "arm64"
+QUANTIZACAO_ONNX = "avx2"
+TAMANHOS_LOTE_CANDIDATOS = (16, 32, 64, 128, 256)
+LOTES_POR_BLOCO = 4               # Cada tarefa do pool leva alguns lotes de textos de tamanho parecido
+
+_modelo_processo = None           # Modelo carregado em cada processo do pool
+
+def onnx_disponivel():
+    """True se o ONNX Runtime e o optimum (usados pelo backend onnx do sentence-transformers) estiverem instalados."""
+    return all(importlib.util.find_spec(pacote) for pacote in ('onnxruntime', 'optimum'))
+
+def _nome_pasta(modelo):
+    return re.sub(r'[^\w.-]+', '_', modelo)
+
+def carregar_modelo(modelo=MODELO_PADRAO, backend=BACKEND_PADRAO, threads=None):
+    """
+    SentenceTransformer em CPU com o backend pedido. No "onnx-int8", o modelo
+    quantizado é exportado uma vez para PASTA_MODELOS_ONNX e reaproveitado depois.
+    `threads` limita as threads do processo (útil com vários processos).
+    """
+    from sentence_transformers import SentenceTransformer
+
+    if backend == "torch":
+        if threads:
+            import torch
+            torch.set_num_threads(threads)
+        return SentenceTransformer(modelo, device="cpu")
+
+    if backend not in ("onnx", "onnx-int8"):
+        raise ValueError(f"Backend desconhecido: {backend}")
+    if not onnx_disponivel():
+        raise ImportError("Backend ONNX requer: pip install 'sentence-transformers[onnx]'")
+
+    opcoes_modelo = {}
+    if threads:
+        import onnxruntime
+        sessao = onnxruntime.SessionOptions()
+        sessao.intra_op_num_threads = threads
+        opcoes_modelo['session_options'] = sessao
+
+    if backend == "onnx":
+        return SentenceTransformer(modelo, device="cpu", backend="onnx", model_kwargs=opcoes_modelo)
+
+    pasta, arquivo = exportar_onnx_int8(modelo)
+    return SentenceTransformer(pasta, device="cpu", backend="onnx",
+                               model_kwargs={'file_name': arquivo, **opcoes_modelo})
+
+def _caminho_onnx_int8(modelo):
+    return os.path.join(PASTA_MODELOS_ONNX, _nome_pasta(modelo)), f"onnx/model_qint8_{QUANTIZACAO_ONNX}.onnx"
+
+def exportar_onnx_int8(modelo=MODELO_PADRAO):
+    """Exporta (uma vez) o modelo quantizado para PASTA_MODELOS_ONNX. Retorna (pasta, arquivo relativo)."""
+    pasta, arquivo = _caminho_onnx_int8(modelo)
+    if not os.path.exists(os.path.join(pasta, arquivo)):
+        from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+        print(f"📦 Exportando {modelo} para ONNX int8 ({QUANTIZACAO_ONNX})...")
+        base = SentenceTransformer(modelo, device="cpu", backend="onnx")
+        base.save(pasta)
+        export_dynamic_quantized_onnx_model(base, QUANTIZACAO_ONNX, pasta)
+    return pasta, arquivo
+
+def nome_cache(modelo=MODELO_PADRAO, backend=BACKEND_PADRAO):
+    """Identifica os vetores no cache de embeddings: int8 não gera os mesmos números que o torch."""
+    if backend == "torch":
+        return modelo
+    if backend == "onnx-int8":
+        return f"{modelo}@onnx-int8-{QUANTIZACAO_ONNX}"
+    return f"{modelo}@{backend}"
+
+def _iniciar_processo(modelo, backend, threads):
+    global _modelo_processo
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+    _modelo_processo = carregar_modelo(modelo, backend, threads)
+
+def _codificar_bloco(argumentos):
+    textos, tamanho_lote = argumentos
+    return _modelo_processo.encode(textos, batch_size=tamanho_lote, convert_to_numpy=True)
+
+class ServicoEmbeddings:
+    """
+    Codificador de textos para os scripts de tópicos. Tem o mesmo `encode` do
+    SentenceTransformer (serve para `embeddings_com_cache` e benchmarks), com:
+      - textos ordenados por tamanho antes de virar lotes, para pouco padding;
+      - tamanho de lote configurável (ou medido com `ajustar_tamanho_lote`);
+      - backend torch, onnx ou onnx-int8;
+      - pool de processos, cada um com seu modelo e uma fatia dos núcleos.
+    `modelo` é o SentenceTransformer do processo principal (para o BERTopic),
+    carregado só no primeiro uso, depois do pool já existir.
+    """
+
+    def __init__(self, modelo=MODELO_PADRAO, backend=BACKEND_PADRAO,
+                 tamanho_lote=TAMANHO_LOTE_PADRAO, processos=PROCESSOS_PADRAO):
+        self.nome_modelo = modelo
+        self.backend = backend
+        self.tamanho_lote = tamanho_lote
+        self.processos = max(1, processos)
+        self._pool = None
+        self._modelo = None
+        if self.processos > 1:
+            # Nada é carregado no processo principal antes do fork (nem modelo, nem sessão
+            # ONNX, nem threads do torch/tokenizers): cada filho carrega o próprio modelo
+            metodo = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+            contexto = multiprocessing.get_context(metodo)
+            if backend == "onnx-int8" and not os.path.exists(os.path.join(*_caminho_onnx_int8(modelo))):
+                # A exportação carrega o modelo: roda num processo à parte, que termina em seguida
+                exportacao = contexto.Process(target=exportar_onnx_int8, args=(modelo,))
+                exportacao.start()
+                exportacao.join()
+                if exportacao.exitcode != 0:
+                    raise RuntimeError(f"Falha ao exportar {modelo} para ONNX int8")
+            threads = max(1, (os.cpu_count() or 1) // self.processos)
+            self._pool = contexto.Pool(
+                self.processos, initializer=_iniciar_processo, initargs=(modelo, backend, threads)
+            )
+
+    @property
+    def modelo(self):
+        """SentenceTransformer do processo principal, carregado só quando usado (BERTopic, textos poucos)."""
+        if self._modelo is None:
+            self._modelo = carregar_modelo(self.nome_modelo, self.backend)
+        return self._modelo
+
+    @property
+    def nome(self):
+        return nome_cache(self.nome_modelo, self.backend)
+
+    def encode(self, textos, show_progress_bar=False, **opcoes):
+        """Matriz (len(textos), dim) float32, na ordem de `textos`."""
+        textos = list(textos)
+        if self._pool is None or len(textos) <= self.tamanho_lote * self.processos:
+            # Num processo só, o encode do sentence-transformers já ordena por tamanho
+            return self.modelo.encode(textos, batch_size=self.tamanho_lote, convert_to_numpy=True,
+                                      show_progress_bar=show_progress_bar, **opcoes)
+
+        # Blocos de textos com tamanho parecido; os mais longos (mais caros) saem primeiro
+        ordem = np.argsort([-len(texto) for texto in textos], kind='stable')
+        passo = self.tamanho_lote * LOTES_POR_BLOCO
+        blocos = [([textos[i] for i in ordem[inicio:inicio + passo]], self.tamanho_lote)
+                  for inicio in range(0, len(textos), passo)]
+
+        vetores = []
+        for numero, vetores_bloco in enumerate(self._pool.imap(_codificar_bloco, blocos), start=1):
+            vetores.append(vetores_bloco)
+            if show_progress_bar and (numero % 50 == 0 or numero == len(blocos)):
+                print(f"   ...bloco {numero}/{len(blocos)} codificado.")
+
+        saida = np.empty((len(textos), vetores[0].shape[1]), dtype=np.float32)
+        saida[ordem] = np.vstack(vetores)
+        return saida
+
+    def ajustar_tamanho_lote(self, amostra, candidatos=TAMANHOS_LOTE_CANDIDATOS):
+        """
+        Mede frases/s de cada tamanho de lote numa amostra de textos (no processo
+        principal) e passa a usar o mais rápido. Retorna {tamanho: frases/s}.
+        """
+        amostra = list(amostra)
+        self.modelo.encode(amostra[:max(candidatos)], batch_size=max(candidatos))  # Aquecimento
+        resultados = {}
+        for tamanho in candidatos:
+            inicio = time.perf_counter()
+            self.modelo.encode(amostra, batch_size=tamanho, convert_to_numpy=True)
+            resultados[tamanho] = len(amostra) / (time.perf_counter() - inicio)
+        self.tamanho_lote = max(resultados, key=resultados.get)
+        return resultados
+
+    def fechar(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()